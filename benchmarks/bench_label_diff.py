@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""
+Micro-benchmark of `plan_labels`, the label reconcile diff.
+
+Usage: python benchmarks/bench_label_diff.py [--sizes 100 1000 10000 50000]
+
+Diffs n desired labels against n remote ones (a third unchanged, a third
+updated, a third created/deleted) and fails if the time per label grows
+more than `--max-ratio` times from the smallest to the largest size, i.e.
+if the diff stops scaling linearly.
+"""
+
+import argparse
+import sys
+import time
+
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.label_diff import plan_labels
+
+
+def make_labels(n: int) -> tuple[list[GithubLabel], list[GithubLabel]]:
+    desired: list[GithubLabel] = []
+    remote: list[GithubLabel] = []
+    for i in range(n):
+        desired.append(
+            {"name": f"Label: {i}", "color": "ffffff", "description": f"Label {i}"}
+        )
+        if i % 3 == 0:
+            remote.append(
+                {"name": f"Label: {i}", "color": "ffffff", "description": f"Label {i}"}
+            )
+        elif i % 3 == 1:
+            remote.append(
+                {"name": f"Label: {i}", "color": "000000", "description": f"Label {i}"}
+            )
+        else:
+            remote.append({"name": f"Stale: {i}", "color": "000000", "description": ""})
+    return desired, remote
+
+
+def bench(n: int, repeat: int) -> float:
+    desired, remote = make_labels(n)
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        plan_labels(desired, remote, strict=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    per_label: list[float] = []
+    print(f"{'labels':>10} {'total (ms)':>12} {'per label (us)':>16}")
+    for n in sorted(args.sizes):
+        elapsed: float = bench(n, args.repeat)
+        per_label.append(elapsed / n)
+        print(f"{n:>10} {elapsed * 1e3:>12.2f} {elapsed / n * 1e6:>16.3f}")
+
+    ratio: float = per_label[-1] / per_label[0]
+    print(f"\nper label time ratio (largest / smallest): {ratio:.2f}")
+    if ratio > args.max_ratio:
+        print(f"FAIL: diff does not scale linearly (ratio > {args.max_ratio}).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
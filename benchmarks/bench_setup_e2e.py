@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+
+"""
+End-to-end benchmark of `SetupGithubLabel` against a local `FakeGithubServer`.
+
+Usage: python benchmarks/bench_setup_e2e.py [--labels 50 200] [--issues 0 1000]
+           [--latency 0 0.05] [--concurrency 1 8] [--backend rest graphql]
+           [--compare results/x.json]
+
+Every combination syncs a seeded repo (half its labels stale, a quarter
+recoloured, a quarter new) with `strict` removal, and times the fetch, remove
+and add phases. Results are written to `benchmarks/results/`; with
+`--compare`, any scenario slower than `--max-regression` times the baseline
+(or using more requests) fails the run.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Any
+
+from ghlabel.utils.fake_github_server import FakeGithubServer, seed_repo
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.github_graphql_api import GithubGraphqlApi
+from ghlabel.utils.rate_limit import RateLimitScheduler
+from ghlabel.utils.setup_github_label import SetupGithubLabel
+
+RESULTS_DIR: str = os.path.join(os.path.dirname(__file__), "results")
+REPO_OWNER: str = "octo"
+REPO_NAME: str = "bench"
+
+
+def desired_labels(labels: int) -> list[GithubLabel]:
+    """NOTE: keeps the 2nd half of the seeded labels, recolours half of those."""
+    kept: list[GithubLabel] = [
+        {
+            "name": f"Label: {i}",
+            "color": "000000" if i % 2 else "ffffff",
+            "description": f"Label {i}",
+        }
+        for i in range(labels // 2, labels)
+    ]
+    new: list[GithubLabel] = [
+        {"name": f"New: {i}", "color": "00ff00", "description": ""}
+        for i in range(labels // 4)
+    ]
+    return kept + new
+
+
+def run_scenario(
+    labels: int, issues: int, latency: float, concurrency: int, backend: str = "rest"
+) -> dict[str, Any]:
+    with FakeGithubServer(latency=latency) as server:
+        seed_repo(server, f"{REPO_OWNER}/{REPO_NAME}", labels=labels, issues=issues)
+        timings: dict[str, float] = {}
+
+        gh_api_cls: type[GithubApi] = (
+            GithubGraphqlApi if backend == "graphql" else GithubApi
+        )
+        with gh_api_cls(
+            "fake-token",
+            REPO_OWNER,
+            REPO_NAME,
+            pool_maxsize=max(10, concurrency),
+            rate_limiter=RateLimitScheduler(writes_per_minute=0),
+            api_url=server.url,
+        ) as gh_api:
+            start: float = time.perf_counter()
+            gh_label = SetupGithubLabel(
+                gh_api,
+                concurrency=concurrency,
+                labels=desired_labels(labels),
+                labels_to_remove=set(),
+                show_progress=False,
+            )
+            timings["fetch"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            gh_label.remove_labels(strict=True)
+            timings["remove"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            gh_label.add_labels()
+            timings["add"] = time.perf_counter() - start
+
+        return {
+            "labels": labels,
+            "issues": issues,
+            "latency": latency,
+            "concurrency": concurrency,
+            "backend": backend,
+            "seconds": {**timings, "total": sum(timings.values())},
+            "requests": dict(server.requests),
+        }
+
+
+def scenario_key(result: dict[str, Any]) -> str:
+    """NOTE: results saved before `--backend` existed are `rest` ones."""
+    return "labels={labels} issues={issues} latency={latency} concurrency={concurrency} backend={backend}".format(
+        **{"backend": "rest", **result}
+    )
+
+
+def compare(
+    results: list[dict[str, Any]], baseline_path: str, max_regression: float
+) -> bool:
+    """NOTE: returns False if any scenario regressed against the baseline."""
+    with open(baseline_path) as f:
+        baseline: dict[str, dict[str, Any]] = {
+            scenario_key(result): result for result in json.load(f)["results"]
+        }
+
+    ok: bool = True
+    for result in results:
+        key: str = scenario_key(result)
+        if key not in baseline:
+            continue
+        old: dict[str, Any] = baseline[key]
+        ratio: float = result["seconds"]["total"] / max(old["seconds"]["total"], 1e-9)
+        if ratio > max_regression:
+            print(f"FAIL: {key} took {ratio:.2f}x the baseline time.")
+            ok = False
+        if result["requests"]["total"] > old["requests"]["total"]:
+            print(
+                f"FAIL: {key} made {result['requests']['total']} requests (baseline {old['requests']['total']})."
+            )
+            ok = False
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--issues", type=int, nargs="+", default=[0, 1000])
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument(
+        "--backend", nargs="+", choices=["rest", "graphql"], default=["rest"]
+    )
+    parser.add_argument("--out", default="")
+    parser.add_argument("--compare", default="")
+    parser.add_argument("--max-regression", type=float, default=1.5)
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    print(
+        f"{'labels':>7} {'issues':>7} {'latency':>8} {'conc':>5} {'backend':>8} "
+        f"{'fetch':>8} {'remove':>8} {'add':>8} {'total':>8} {'requests':>9}"
+    )
+    for labels, issues, latency, concurrency, backend in itertools.product(
+        args.labels, args.issues, args.latency, args.concurrency, args.backend
+    ):
+        result: dict[str, Any] = run_scenario(
+            labels, issues, latency, concurrency, backend
+        )
+        results.append(result)
+        seconds: dict[str, float] = result["seconds"]
+        print(
+            f"{labels:>7} {issues:>7} {latency:>8.3f} {concurrency:>5} {backend:>8} "
+            f"{seconds['fetch']:>7.2f}s {seconds['remove']:>7.2f}s "
+            f"{seconds['add']:>7.2f}s {seconds['total']:>7.2f}s "
+            f"{result['requests']['total']:>9}"
+        )
+
+    out: str = args.out or os.path.join(
+        RESULTS_DIR, f"setup_e2e_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"created_at": time.time(), "results": results}, f, indent=2)
+    print(f"Saved results to {out}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""
+Startup-time regression check for the `ghlabel` CLI.
+
+Usage: python benchmarks/bench_startup.py [--budget-ms 100] [--runs 5]
+
+Measures the cumulative `-X importtime` of `ghlabel.cli` (best of `--runs`),
+and fails if it is over `--budget-ms`, if a heavy module is imported up front,
+or if `ghlabel --version` creates any file (e.g. the `logs/` dir).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Only needed once a command actually runs.
+LAZY_MODULES: tuple[str, ...] = (
+    "dotenv",
+    "httpx",
+    "requests",
+    "rich.progress",
+    "rich.prompt",
+    "yaml",
+)
+
+
+def import_times(module: str) -> dict[str, int]:
+    """NOTE: cumulative import time in us of every module imported by `module`."""
+    res = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="ghlabel.cli")
+    parser.add_argument("--budget-ms", type=float, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed: bool = False
+    runs: list[dict[str, int]] = [import_times(args.module) for _ in range(args.runs)]
+    best: dict[str, int] = min(runs, key=lambda times: times[args.module])
+
+    print(
+        f"{args.module} import: {best[args.module] / 1000:.1f}ms (best of {args.runs})"
+    )
+    print("slowest imports:")
+    for name, us in sorted(best.items(), key=lambda item: -item[1])[1:11]:
+        print(f"  {us / 1000:>8.1f}ms  {name}")
+
+    if best[args.module] / 1000 > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f}ms budget.")
+        failed = True
+
+    eager: list[str] = [name for name in LAZY_MODULES if name in best]
+    if eager:
+        print(f"FAIL: imported up front: {', '.join(eager)}.")
+        failed = True
+
+    # runs from an empty dir, so a relative PYTHONPATH (e.g. `src`) must be made absolute
+    env: dict[str, str] = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            os.path.abspath(path)
+            for path in os.getenv("PYTHONPATH", "").split(os.pathsep)
+            if path
+        ),
+    }
+    with tempfile.TemporaryDirectory() as cwd:
+        subprocess.run(
+            [sys.executable, "-m", "ghlabel.cli", "--version"],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        created: list[str] = os.listdir(cwd)
+    if created:
+        print(f"FAIL: `ghlabel --version` created {', '.join(created)}.")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
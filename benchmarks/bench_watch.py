@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of `ghlabel watch` (`LabelWatcher`) against a local
+`FakeGithubServer` that delivers `label` webhooks to it.
+
+Usage: python benchmarks/bench_watch.py [--labels 50] [--rounds 5]
+           [--latency 0] [--interval 0.5]
+
+Times how long the watcher takes to apply the labels config once it
+changes on disk, and to revert a label edited on "Github" (i.e. through the
+fake API, which sends the webhook). Requests made after start-up are
+counted too: they should all be label changes, with no label listings.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import requests
+
+from ghlabel.utils.fake_github_server import FakeGithubServer, seed_repo
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.label_watch import LabelWatcher
+from ghlabel.utils.rate_limit import RateLimitScheduler
+
+REPO: str = "octo/watch"
+
+
+def write_config(labels_dir: str, labels: list[GithubLabel]) -> None:
+    with open(os.path.join(labels_dir, "labels.json"), "w") as f:
+        json.dump(labels, f)
+
+
+def wait_for(check: Callable[[], bool], timeout: float = 30) -> float:
+    start: float = time.perf_counter()
+    while not check():
+        if time.perf_counter() - start > timeout:
+            sys.exit("Timed out waiting for the watcher.")
+        time.sleep(0.005)
+    return time.perf_counter() - start
+
+
+def run(labels: int, rounds: int, latency: float, interval: float) -> dict[str, Any]:
+    with (
+        FakeGithubServer(latency=latency) as server,
+        tempfile.TemporaryDirectory() as labels_dir,
+    ):
+        repo = seed_repo(server, REPO, labels=labels)
+        config: list[GithubLabel] = [
+            {"name": f"Label: {i}", "color": "000000", "description": f"Label {i}"}
+            for i in range(labels)
+        ]
+        write_config(labels_dir, config)
+
+        def gh_api_factory(repo_owner: str, repo_name: str) -> GithubApi:
+            return GithubApi(
+                "fake-token",
+                repo_owner,
+                repo_name,
+                rate_limiter=RateLimitScheduler(writes_per_minute=0),
+                api_url=server.url,
+            )
+
+        watcher = LabelWatcher(
+            gh_api_factory, [REPO], labels_dir=labels_dir, interval=interval
+        )
+        start: float = time.perf_counter()
+        watcher.start()
+        server.add_webhook(watcher.serve_webhooks() + "/webhook")
+        thread = threading.Thread(target=watcher.run, daemon=True)
+        thread.start()
+
+        def synced(color: str, label_name: str | None = None) -> Callable[[], bool]:
+            return lambda: all(
+                label["color"] == color
+                for label in list(repo.labels.values())
+                if label_name in (None, label["name"])
+            )
+
+        startup: float = wait_for(synced("000000")) + (time.perf_counter() - start)
+        server.reset_stats()
+
+        config_times: list[float] = []
+        webhook_times: list[float] = []
+        for i in range(rounds):
+            color: str = f"{i + 1:06d}"
+            for label in config:
+                label["color"] = color
+            # NOTE: mtimes can be too coarse to tell two quick saves apart
+            time.sleep(0.01)
+            write_config(labels_dir, config)
+            config_times.append(wait_for(synced(color)))
+
+            start = time.perf_counter()
+            requests.patch(
+                f"{server.url}/repos/{REPO}/labels/Label: 0",
+                json={"color": "ff0000"},
+                timeout=10,
+            )
+            webhook_times.append(
+                wait_for(synced(color, "Label: 0")) + (time.perf_counter() - start)
+            )
+
+        watcher.stop()
+        thread.join()
+        requests_made: dict[str, int] = dict(server.requests)
+
+    return {
+        "startup_seconds": startup,
+        "config_seconds": config_times,
+        "webhook_seconds": webhook_times,
+        "requests_after_startup": requests_made,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    result: dict[str, Any] = run(args.labels, args.rounds, args.latency, args.interval)
+    print(f"start-up (fetch + first sync): {result['startup_seconds']:.3f}s")
+    print(
+        "config edit -> applied: "
+        + ", ".join(f"{seconds:.3f}s" for seconds in result["config_seconds"])
+    )
+    print(
+        "Github edit -> reverted: "
+        + ", ".join(f"{seconds:.3f}s" for seconds in result["webhook_seconds"])
+    )
+    print(f"requests after start-up: {result['requests_after_startup']}")
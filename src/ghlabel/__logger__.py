@@ -1,50 +1,190 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import sys
+import threading
+from collections.abc import Mapping
+from datetime import datetime, timezone
 from logging import Logger
 from logging.config import fileConfig
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
-import rich
-
-from ghlabel.config import is_ghlabel_debug_mode
+from ghlabel.config import (
+    get_ghlabel_log_format,
+    is_ghlabel_debug_mode,
+    is_ghlabel_headless,
+)
 
 GHLABEL_LOGS_DIR: str = os.path.join("logs")
+GHLABEL_LOGGER_NAME: str = "ghlabel"
 
+# Attributes every `LogRecord` has; anything else on a record came from `extra`.
+_RECORD_ATTRS: frozenset[str] = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime"}
+
+_logging_lock = threading.Lock()
+_is_logging_configured: bool = False
+_listener: QueueListener | None = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, message, plus any
+    `extra` fields (e.g. the repo, endpoint, status and latency of a request).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, val) for key, val in vars(record).items() if key not in _RECORD_ATTRS
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
-class GhlabelLogger:
-    def __init__(self) -> None:
-        self.logger: GhlabelLogger
 
+def _log_level() -> int:
+    return logging.DEBUG if is_ghlabel_debug_mode() else logging.ERROR
+
+
+def refresh_log_level() -> None:
+    """NOTE: applies `--debug`, even if something logged before it was parsed."""
+    if _is_logging_configured:
+        logging.getLogger(GHLABEL_LOGGER_NAME).setLevel(_log_level())
+
+
+def configure_logging() -> None:
+    """
+    NOTE: creates the logs dir and loads `logging.ini` once, on the first log
+    call, so commands that never log (e.g. `--version`) touch no files.
+    File handlers are moved behind a queue, written by a listener thread, so
+    request workers never block on disk. The screen handler stays inline to
+    keep its output in order with the rest of the CLI output.
+    """
+
+    global _is_logging_configured, _listener  # noqa: PLW0603
+    with _logging_lock:
+        if _is_logging_configured:
+            return
         if not os.path.isdir(GHLABEL_LOGS_DIR):
             os.makedirs(GHLABEL_LOGS_DIR)
-        fileConfig(os.path.join(os.path.dirname(__file__), "logging.ini"))
+        fileConfig(
+            os.path.join(os.path.dirname(__file__), "logging.ini"),
+            disable_existing_loggers=False,
+        )
 
-    def init(self, module_name: str) -> "GhlabelLogger":
-        """NOTE: pass in __name__ as module name"""
-        logger: Logger = logging.getLogger(module_name)
+        root: Logger = logging.getLogger()
+        if get_ghlabel_log_format() == "json":
+            for handler in root.handlers:
+                handler.setFormatter(JsonLinesFormatter())
+        if is_ghlabel_headless():
+            # NOTE: stdout only carries `--output` events
+            for handler in root.handlers:
+                if type(handler) is logging.StreamHandler:
+                    handler.setStream(sys.stderr)
+
+        file_handlers: list[logging.Handler] = [
+            handler
+            for handler in root.handlers
+            if isinstance(handler, logging.FileHandler)
+        ]
+        if file_handlers:
+            log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(min(handler.level for handler in file_handlers))
+            for handler in file_handlers:
+                root.removeHandler(handler)
+            root.addHandler(queue_handler)
+
+            _listener = QueueListener(
+                log_queue, *file_handlers, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(_listener.stop)
+
+        logging.getLogger(GHLABEL_LOGGER_NAME).setLevel(_log_level())
+        _is_logging_configured = True
+
+
+class GhlabelLogger:
+    """
+    Thin wrapper over a `logging.Logger`, configured on first use.
+    NOTE: messages take %-style args, formatted only if the record is emitted:
+    `logger.info("Fetching page %s.", page)`.
+    """
 
-        if is_ghlabel_debug_mode():
-            logger.setLevel(level=logging.DEBUG)
-        else:
-            logger.setLevel(level=logging.ERROR)
+    def __init__(self, module_name: str = GHLABEL_LOGGER_NAME) -> None:
+        # NOTE: kept under the `ghlabel` logger, which alone holds the level
+        if module_name != GHLABEL_LOGGER_NAME and not module_name.startswith(
+            f"{GHLABEL_LOGGER_NAME}."
+        ):
+            module_name = f"{GHLABEL_LOGGER_NAME}.{module_name}"
+        self._module_name = module_name
+        self._logger: Logger | None = None
 
-        self.logger = logger  # type: ignore[assignment]
-        return self.logger
+    @property
+    def logger(self) -> Logger:
+        if self._logger is None:
+            configure_logging()
+            self._logger = logging.getLogger(self._module_name)
+        return self._logger
+
+    def is_enabled_for(self, level: int) -> bool:
+        """NOTE: checked without configuring logging, so filtered out calls stay free."""
+        return level >= _log_level()
+
+    def init(self, module_name: str) -> "GhlabelLogger":
+        """NOTE: pass in __name__ as module name"""
+        return GhlabelLogger(module_name)
 
     def exception(self, ex: Exception) -> None:
+        import rich
+
         rich.print(
             f"\nSomething went wrong. See logs ([blue underline]{GHLABEL_LOGS_DIR}[/blue underline]) for more details.\n"
         )
         rich.print("  [[red]Exception[/red]]:", str(ex))
         self.logger.exception(ex)
 
-    def error(self, message: str) -> None:
-        self.logger.error(message)
+    def _log(
+        self,
+        level: int,
+        message: str,
+        args: tuple[object, ...],
+        extra: Mapping[str, object] | None,
+    ) -> None:
+        if self.is_enabled_for(level):
+            # stacklevel 3 attributes the record to the caller, not this wrapper
+            self.logger.log(level, message, *args, extra=extra, stacklevel=3)
+
+    def error(
+        self, message: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
+        self._log(logging.ERROR, message, args, extra)
+
+    def warning(
+        self, message: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
+        self._log(logging.WARNING, message, args, extra)
 
-    def warning(self, message: str) -> None:
-        self.logger.warning(message)
+    def info(
+        self, message: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
+        self._log(logging.INFO, message, args, extra)
 
-    def info(self, message: str) -> None:
-        self.logger.info(message)
+    def debug(
+        self, message: str, *args: object, extra: Mapping[str, object] | None = None
+    ) -> None:
+        self._log(logging.DEBUG, message, args, extra)
 
 
 ghlabel_logger: GhlabelLogger = GhlabelLogger()
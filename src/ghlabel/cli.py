@@ -12,17 +12,34 @@ __status__ = "Prototype"
 import json
 import os
 import time
+from collections.abc import Callable
 from enum import Enum
-from typing import Annotated, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 
-import rich
 import typer
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ghlabel.__about__ import __version__
-from ghlabel.config import set_ghlabel_debug_mode
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger, refresh_log_level
+from ghlabel.config import (
+    is_ghlabel_headless,
+    set_ghlabel_debug_mode,
+    set_ghlabel_log_format,
+    set_ghlabel_output,
+)
 from ghlabel.utils.github_api_types import GithubLabel
-from ghlabel.utils.helpers import clear_screen, validate_env
+from ghlabel.utils.helpers import clear_screen, load_env, validate_env
+
+if TYPE_CHECKING:
+    from ghlabel.utils.api_metrics import ApiMetrics
+    from ghlabel.utils.change_events import ChangeEvents
+    from ghlabel.utils.github_api import GithubApi
+    from ghlabel.utils.label_diff import LabelPlan
+    from ghlabel.utils.label_executor import LabelMutationSummary
+    from ghlabel.utils.run_journal import RunJournal
+    from ghlabel.utils.setup_github_label import SetupGithubLabel
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
 
 
 def parse_remove_labels(label_names: str | None) -> set[str] | None:
@@ -39,6 +56,8 @@ def parse_add_labels(labels: str | None) -> list[GithubLabel] | None:
 
 def version_callback(show_version: bool) -> None:
     if show_version:
+        import rich
+
         rich.print(
             f"\n[green]{os.path.basename(os.path.dirname(__file__))}[/green] {__version__}\n"
         )
@@ -56,12 +75,30 @@ class ExtChoices(str, Enum):
     yaml = "yaml"
 
 
+class BackendChoices(str, Enum):
+    rest = "rest"
+    graphql = "graphql"
+
+
+class LogFormatChoices(str, Enum):
+    text = "text"
+    json = "json"
+
+
+class OutputChoices(str, Enum):
+    rich = "rich"
+    plain = "plain"
+    json = "json"
+
+
 class RemoveAllChoices(str, Enum):
     disable = "disable"
     enable = "enable"
     silent = "silent"
 
 
+COMMANDS_WITHOUT_ENV: frozenset[str] = frozenset({"dump"})
+
 app = typer.Typer(
     add_completion=False,
     context_settings={
@@ -71,8 +108,312 @@ app = typer.Typer(
 )
 
 
+def _gh_api_factory(  # noqa: PLR0913
+    token: str,
+    backend: BackendChoices,
+    concurrency: int,
+    writes_per_minute: int,
+    cache: bool,
+    metrics: "ApiMetrics | None" = None,
+    api_url: str | None = None,
+) -> "Callable[[str, str], GithubApi]":
+    from ghlabel.utils.github_api import GithubApi
+    from ghlabel.utils.github_graphql_api import GithubGraphqlApi
+    from ghlabel.utils.http_cache import HttpCache
+    from ghlabel.utils.rate_limit import RateLimitScheduler
+
+    gh_api_cls: type[GithubApi] = (
+        GithubGraphqlApi if backend.value == "graphql" else GithubApi
+    )
+    return partial(
+        gh_api_cls,
+        token,
+        pool_maxsize=max(concurrency, 10),
+        rate_limiter=RateLimitScheduler(writes_per_minute=writes_per_minute),
+        http_cache=HttpCache() if cache else None,
+        metrics=metrics,
+        api_url=api_url,
+    )
+
+
+def _fetch_github_labels(  # noqa: PLR0913
+    gh_api: "GithubApi",
+    labels_dir: str = "labels",
+    concurrency: int = 1,
+    labels: list[GithubLabel] | None = None,
+    journal: "RunJournal | None" = None,
+    events: "ChangeEvents | None" = None,
+) -> "SetupGithubLabel":
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    from ghlabel.utils.setup_github_label import SetupGithubLabel
+
+    clear_screen()
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        transient=True,
+        disable=is_ghlabel_headless(),
+    ) as progress:
+        progress.add_task(description="[green]Fetching...", total=None)
+
+        return SetupGithubLabel(
+            gh_api,
+            labels_dir=labels_dir,
+            concurrency=concurrency,
+            labels=labels,
+            labels_to_remove=set() if labels is not None else None,
+            show_progress=not is_ghlabel_headless(),
+            journal=journal,
+            events=events,
+        )
+
+
+def _print_labels_unsafe_to_remove(gh_label: "SetupGithubLabel") -> None:
+    import rich
+
+    rich.print("  The following labels are not [red]removed[/red]:")
+    for label_name in gh_label.labels_unsafe_to_remove:
+        rich.print(
+            f'    - {label_name} \[{", ".join(url for url in gh_label.label_name_urls_map[label_name])}]'
+        )
+    rich.print()
+    rich.print(
+        "  They are still in use. Run `ghlabel migrate --from <label> --to <label>` to move their issues and PRs and retire them."
+    )
+    rich.print()
+
+
+def _exit_on_failed_changes(gh_label: "SetupGithubLabel", repo: str) -> None:
+    if not gh_label.summary.failed:
+        return
+    if is_ghlabel_headless():
+        # NOTE: the failures were already written as `change` events
+        raise typer.Exit(code=1)
+
+    import rich
+
+    rich.print("  The following label changes [red]failed[/red]:")
+    for result in gh_label.summary.failed:
+        rich.print(
+            f"    - {result.action} `{result.label_name}` \\[{result.error or result.status_code}]"
+        )
+    rich.print()
+    rich.print(
+        f"[red]Failed[/red] {len(gh_label.summary.failed)} of {len(gh_label.summary.results)} label changes on repo `{repo}`."
+    )
+    raise typer.Exit(code=1)
+
+
+def _report_stats(metrics: "ApiMetrics", stats: bool, stats_file: str | None) -> None:
+    """NOTE: registered with `ctx.call_on_close`, so it also runs when setup exits early."""
+
+    if stats_file:
+        metrics.write(stats_file)
+    if not stats:
+        return
+
+    from ghlabel.utils.change_events import change_events
+
+    summary: dict[str, Any] = metrics.summary()
+    events: ChangeEvents | None = change_events()
+    if events:
+        events.emit("stats", **summary)
+        return
+
+    import rich
+    from rich.table import Table
+
+    table = Table("Phase", "Requests", "Retries", "p50", "p95", "p99", "max")
+    for phase, phase_summary in [
+        *summary["phases"].items(),
+        ("total", summary),
+    ]:
+        latency: dict[str, float] = phase_summary["latency"]
+        table.add_row(
+            phase,
+            str(phase_summary["requests"]),
+            str(phase_summary["retries"]),
+            *(f"{latency[key] * 1000:.0f}ms" for key in ("p50", "p95", "p99", "max")),
+        )
+
+    rich.print()
+    rich.print(table)
+    rich.print(
+        f"  {summary['requests']} requests in {summary['seconds']:.2f}s, "
+        f"{summary['errors']} errors, {summary['bytes'] / 1024:.1f} KiB received."
+    )
+    rich.print(
+        f"  Config: {summary['config']['files']} files "
+        f"({summary['config']['cached']} cached) loaded in "
+        f"{summary['config']['seconds'] * 1000:.0f}ms."
+    )
+    rich.print(
+        "  Rate limit consumed: "
+        + (
+            ", ".join(
+                f"{resource} {consumed}"
+                for resource, consumed in summary["rate_limit_consumed"].items()
+            )
+            or "none"
+        )
+    )
+
+
+def _print_plan(plan: "LabelPlan") -> None:
+    import rich
+
+    for action, color, label_names in (
+        ("remove", "red", sorted(plan.delete)),
+        ("add", "cyan", [label["name"] for label in plan.create]),
+        (
+            "update",
+            "yellow",
+            [
+                label["name"]
+                if github_label["name"] == label["name"]
+                else f"{github_label['name']} -> {label['name']}"
+                for github_label, label in plan.update
+            ],
+        ),
+    ):
+        rich.print(f"  will [{color}]{action}[/{color}] the following labels:")
+        for label_name in label_names:
+            rich.print(f"    - {label_name}")
+        if not label_names:
+            rich.print("    None")
+        rich.print()
+
+
+def _list_repos(
+    gh_api_factory: "Callable[[str, str], GithubApi]",
+    repos: list[str] | None,
+    repos_file: str | None,
+    org: str | None,
+    user: str | None,
+) -> list[str]:
+    from ghlabel.utils.helpers import STATUS_OK
+    from ghlabel.utils.multi_repo_setup import load_repos_file
+
+    all_repos: list[str] = list(repos or [])
+    if repos_file:
+        all_repos.extend(load_repos_file(repos_file))
+
+    for owner, owner_type in ((org, "orgs"), (user, "users")):
+        if not owner:
+            continue
+        with gh_api_factory(owner, "") as gh_api:
+            owner_repos, status_code = gh_api.list_owner_repos(owner, owner_type)
+        if status_code != STATUS_OK:
+            raise typer.Exit(code=1)
+        all_repos.extend(owner_repos)
+
+    return all_repos
+
+
+def _setup_many_repos(  # noqa: PLR0913
+    gh_api_factory: "Callable[[str, str], GithubApi]",
+    repos: list[str],
+    labels_dir: str,
+    workers: int,
+    concurrency: int,
+    strict: bool,
+    label_names: set[str] | None,
+    labels: list[GithubLabel] | None,
+    remove_all: RemoveAllChoices,
+    force: bool,
+    preview: bool,
+    sync_state: bool,
+    resume: bool,
+    events: "ChangeEvents | None",
+    metrics: "ApiMetrics | None" = None,
+) -> None:
+    import rich
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.prompt import Confirm
+    from rich.table import Table
+
+    from ghlabel.utils.multi_repo_setup import MultiRepoSetup, RepoSetupResult
+    from ghlabel.utils.sync_state import SyncStateStore
+
+    if remove_all.value == "enable" and not preview:
+        rich.print(
+            f"[[yellow]WARNING[/yellow]] This action will [red]remove[/red] all labels in {len(repos)} repositories."
+        )
+        if not Confirm.ask("Are you sure you want to continue?"):
+            raise typer.Exit()
+
+    clear_screen()
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        transient=True,
+        disable=preview or events is not None,
+    ) as progress:
+        progress.add_task(
+            description=f"[green]Setting up {len(repos)} repos...", total=None
+        )
+        results: list[RepoSetupResult] = MultiRepoSetup(
+            gh_api_factory,
+            labels_dir=labels_dir,
+            workers=workers,
+            concurrency=concurrency,
+            sync_state=SyncStateStore() if sync_state else None,
+            events=events,
+            metrics=metrics,
+        ).run(
+            repos,
+            strict=strict,
+            label_names=label_names,
+            labels=labels,
+            remove_all=remove_all.value != "disable",
+            force=force,
+            preview=preview,
+            resume=resume,
+        )
+
+    failed_repos: int = sum(1 for result in results if result.exit_code)
+    if events:
+        # NOTE: each repo's totals were already written as a `done` event
+        if failed_repos:
+            raise typer.Exit(code=1)
+        return
+    if preview:
+        return
+
+    table = Table(
+        "Repo", "Added", "Updated", "Removed", "Failed", "Not removed", "Exit"
+    )
+    for result in results:
+        table.add_row(
+            f"{result.repo} [green](in sync)[/green]"
+            if result.in_sync
+            else f"{result.repo} [green](done earlier)[/green]"
+            if result.resumed
+            else result.repo,
+            str(result.count("add")),
+            str(result.count("update")),
+            str(result.count("remove")),
+            result.error or str(len(result.summary.failed)),
+            ", ".join(sorted(result.labels_unsafe_to_remove)),
+            f"[{'red' if result.exit_code else 'green'}]{result.exit_code}",
+        )
+    rich.print(table)
+
+    if failed_repos:
+        rich.print(
+            f"[red]Failed[/red] to setup github labels on {failed_repos} of {len(results)} repos."
+        )
+        raise typer.Exit(code=1)
+
+    rich.print(
+        f"[green]Successfully[/green] setup github labels from config to {len(results)} repos."
+    )
+
+
 @app.command("setup", help="Add/Remove Github labels from config files.")  # type: ignore[misc]
-def setup_labels(  # noqa: PLR0913
+def setup_labels(  # noqa: PLR0912, PLR0913, PLR0915
+    ctx: typer.Context,
     token: Annotated[
         Optional[str],
         typer.Argument(
@@ -99,7 +440,7 @@ def setup_labels(  # noqa: PLR0913
         typer.Option(
             "--directory",
             "-d",
-            help="Specify the directory where to find labels.",
+            help="Specify the directory where to find labels. A <repo_owner>/<repo_name> overlay dir in it, as written by `dump --from-repo`, is layered over the shared labels for that repo.",
         ),
     ] = "labels",
     preview: Annotated[
@@ -150,103 +491,1054 @@ def setup_labels(  # noqa: PLR0913
             help="Forcefully remove GitHub labels, even if they are currently in use on issues or pull requests.",
         ),
     ] = False,
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            "--concurrency",
+            "-c",
+            min=1,
+            help="Number of label changes sent to Github in parallel. Writes are still paced by --writes-per-minute, so it only helps while a request takes longer than the pacing interval; use -w 0 to let it scale.",
+        ),
+    ] = 1,
+    backend: Annotated[
+        BackendChoices,
+        typer.Option(
+            "--backend",
+            "-b",
+            case_sensitive=False,
+            help="Github API used to read and change labels. graphql batches label changes.",
+        ),
+    ] = BackendChoices.rest.value,  # type: ignore[assignment]
+    writes_per_minute: Annotated[
+        int,
+        typer.Option(
+            "--writes-per-minute",
+            "-w",
+            min=0,
+            help="Pace label changes to stay under Github's secondary rate limit. 0 disables pacing.",
+        ),
+    ] = 80,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help="Send conditional requests and serve unchanged label/issue listings from the local cache.",
+        ),
+    ] = True,
+    repos: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--repo",
+            "-o",
+            help="Setup labels on <repo_owner>/<repo_name> instead of REPO_OWNER/REPO_NAME. Repeat for more repos.",
+        ),
+    ] = None,
+    repos_file: Annotated[
+        Optional[str],
+        typer.Option(
+            "--repos-file",
+            help="Setup labels on every <repo_owner>/<repo_name> listed (one per line) in a file.",
+        ),
+    ] = None,
+    org: Annotated[
+        Optional[str],
+        typer.Option(
+            "--org",
+            help="Setup labels on every repo of a Github organization.",
+        ),
+    ] = None,
+    user: Annotated[
+        Optional[str],
+        typer.Option(
+            "--user",
+            help="Setup labels on every repo of a Github user.",
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            "-W",
+            min=1,
+            help="Number of repos set up in parallel.",
+        ),
+    ] = 4,
+    sync_state: Annotated[
+        bool,
+        typer.Option(
+            "--sync-state/--no-sync-state",
+            help="Remember the last applied state and skip runs that would change nothing with one conditional request.",
+        ),
+    ] = True,
+    stats: Annotated[
+        bool,
+        typer.Option(
+            "--stats/--no-stats",
+            help="Print request counts per phase, latency percentiles, retries and rate limit consumed at the end.",
+        ),
+    ] = False,
+    stats_file: Annotated[
+        Optional[str],
+        typer.Option(
+            "--stats-file",
+            help="Write per-repo request metrics to a file, as a Prometheus textfile if it ends with `.prom`, else as JSON.",
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume/--no-resume",
+            help="Continue an interrupted run with the same config, options and repos, skipping the label changes it already made.",
+        ),
+    ] = False,
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root, e.g. `https://<host>/api/v3` for Github Enterprise Server. Defaults to `https://api.github.com`.",
+        ),
+    ] = None,
 ) -> None:
-    from ghlabel.utils.github_api import GithubApi
-    from ghlabel.utils.setup_github_label import SetupGithubLabel
+    import rich
+    from rich.prompt import Confirm
 
-    if not token:
-        token = validate_env("GITHUB_TOKEN")
-    if not repo_owner:
-        repo_owner = validate_env("GITHUB_REPO_OWNER")
-    if not repo_name:
-        repo_name = validate_env("GITHUB_REPO_NAME")
-    gh_api: GithubApi = GithubApi(token, repo_owner, repo_name)
+    from ghlabel.utils.api_metrics import ApiMetrics
+    from ghlabel.utils.change_events import change_events
+    from ghlabel.utils.label_diff import LabelPlan
+    from ghlabel.utils.run_journal import JournalState, RunJournal, run_key
+    from ghlabel.utils.sync_state import SyncStateStore, hash_desired_state
 
-    clear_screen()
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
-        progress.add_task(description="[green]Fetching...", total=None)
+    events: ChangeEvents | None = change_events()
+    if events and remove_all.value == "enable" and not preview:
+        logger.error(
+            "`--remove-all enable` asks for confirmation, which `--output %s` can't. Use `--remove-all silent` instead.",
+            events.output,
+        )
+        raise typer.Exit(code=1)
 
-        gh_label = SetupGithubLabel(gh_api, labels_dir=labels_dir)
+    metrics: ApiMetrics | None = None
+    if stats or stats_file:
+        metrics = ApiMetrics()
+        ctx.call_on_close(partial(_report_stats, metrics, stats, stats_file))
 
-    if preview:
-        rich.print(
-            f"\n  [bold green]Preview [[/bold green]{repo_owner}/{repo_name}[bold green]][/bold green]"
-        )
-        rich.print()
+    if not token:
+        token = validate_env("GITHUB_TOKEN")
+    gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+        token, backend, concurrency, writes_per_minute, cache, metrics, api_url
+    )
 
-    if remove_all.value == "enable":
-        gh_label.remove_all_labels(preview=preview, force=force)
-    elif remove_all.value == "silent":
-        gh_label.remove_all_labels(silent=True, preview=preview, force=force)
-    elif remove_all.value == "disable":
-        gh_label.remove_labels(
+    if repos or repos_file or org or user:
+        _setup_many_repos(
+            gh_api_factory,
+            _list_repos(gh_api_factory, repos, repos_file, org, user),
+            labels_dir=labels_dir,
+            workers=workers,
+            concurrency=concurrency,
             strict=strict,
             label_names=parse_remove_labels(remove_labels),
-            preview=preview,
+            labels=parse_add_labels(add_labels),
+            remove_all=remove_all,
             force=force,
+            preview=preview,
+            sync_state=sync_state,
+            resume=resume,
+            events=events,
+            metrics=metrics,
         )
+        return
 
-    gh_label.add_labels(labels=parse_add_labels(add_labels), preview=preview)
+    if not repo_owner:
+        repo_owner = validate_env("GITHUB_REPO_OWNER")
+    if not repo_name:
+        repo_name = validate_env("GITHUB_REPO_NAME")
+    state_store: SyncStateStore | None = (
+        SyncStateStore() if sync_state and not preview else None
+    )
+    config_hash: str = hash_desired_state(
+        labels_dir,
+        strict=strict,
+        label_names=sorted(parse_remove_labels(remove_labels) or []),
+        labels=parse_add_labels(add_labels),
+        remove_all=remove_all.value != "disable",
+        force=force,
+    )
+    with gh_api_factory(repo_owner, repo_name) as gh_api:
+        if state_store and state_store.is_in_sync(gh_api, config_hash):
+            if events:
+                events.done(f"{repo_owner}/{repo_name}", in_sync=True)
+            else:
+                rich.print(
+                    f"[green]In sync[/green]. Nothing to change on repo `{repo_owner}/{repo_name}`."
+                )
+            return
 
-    if gh_label.labels_unsafe_to_remove:
+        journal: RunJournal | None = None
+        journal_state: JournalState | None = None
+        pending_plan: LabelPlan | None = None
         if not preview:
-            rich.print()
-        rich.print("  The following labels are not [red]removed[/red]:")
-        for label_name in gh_label.labels_unsafe_to_remove:
+            journal = RunJournal(run_key(config_hash, [f"{repo_owner}/{repo_name}"]))
+            journal_state = journal.load() if resume else None
+            if resume and journal_state is None and not events:
+                rich.print(
+                    "[yellow]Nothing to resume[/yellow]. Running setup from the start."
+                )
+            if journal_state:
+                pending_plan = journal_state.pending_plan(f"{repo_owner}/{repo_name}")
+            journal.start(resume=journal_state is not None)
+
+        gh_label = _fetch_github_labels(
+            gh_api,
+            labels_dir=labels_dir,
+            concurrency=concurrency,
+            # NOTE: a resumed plan is applied as is, so the config isn't needed
+            labels=[] if pending_plan else None,
+            journal=journal,
+            events=events,
+        )
+
+        if pending_plan:
+            # issues are not scanned again, the plan already holds only safe removals
+            gh_label.apply_plan(gh_label.rebase_plan(pending_plan))
+        elif preview and events:
+            events.plan(
+                f"{repo_owner}/{repo_name}",
+                gh_label.build_plan(
+                    label_names=parse_remove_labels(remove_labels),
+                    labels=parse_add_labels(add_labels),
+                    strict=strict,
+                    remove_all=remove_all.value != "disable",
+                    force=force,
+                ),
+            )
+        elif preview:
             rich.print(
-                f'    - {label_name} \[{", ".join(url for url in gh_label.label_name_urls_map[label_name])}]'
+                f"\n  [bold green]Preview [[/bold green]{repo_owner}/{repo_name}[bold green]][/bold green]"
             )
-        rich.print()
+            rich.print()
 
-    if not preview:
-        rich.print(
-            f"[green]Successfully[/green] setup github labels from config to repo `{repo_owner}/{repo_name}`."
-        )
+            if remove_all.value == "disable":
+                gh_label.remove_labels(
+                    strict=strict,
+                    label_names=parse_remove_labels(remove_labels),
+                    preview=True,
+                    force=force,
+                )
+            else:
+                gh_label.remove_all_labels(silent=True, preview=True, force=force)
+            gh_label.add_labels(labels=parse_add_labels(add_labels), preview=True)
+        else:
+            plan: LabelPlan = gh_label.build_plan(
+                label_names=parse_remove_labels(remove_labels),
+                labels=parse_add_labels(add_labels),
+                strict=strict,
+                remove_all=remove_all.value != "disable",
+                force=force,
+            )
+            if remove_all.value == "enable":
+                rich.print(
+                    "[[yellow]WARNING[/yellow]] This action will [red]remove[/red] all labels in the repository."
+                )
+                if not Confirm.ask("Are you sure you want to continue?"):
+                    plan = LabelPlan(create=plan.create, update=plan.update)
+            if journal:
+                journal.record_plan(f"{repo_owner}/{repo_name}", plan)
+            gh_label.apply_plan(plan)
 
+        if events:
+            events.skipped(
+                f"{repo_owner}/{repo_name}",
+                gh_label.labels_unsafe_to_remove,
+                gh_label.label_name_urls_map,
+            )
+        elif gh_label.labels_unsafe_to_remove:
+            if not preview:
+                rich.print()
+            _print_labels_unsafe_to_remove(gh_label)
 
-@app.command("dump", help="Generate starter labels config files.")  # type: ignore[misc]
-def app_dump(
-    new: Annotated[
-        bool,
-        typer.Option(
-            "--new/--keep-old-labels",
-            "-n/-N",
-            help="Deletes all files in labels dir.",
+        if state_store:
+            # a resumed run's unsafe labels are unknown, as issues are not scanned again
+            if (
+                gh_label.summary.failed
+                or gh_label.labels_unsafe_to_remove
+                or pending_plan
+            ):
+                state_store.clear(gh_api)
+            else:
+                state_store.record(gh_api, config_hash)
+
+        if journal:
+            # NOTE: kept for `--resume` only while there is work left to retry
+            if gh_label.summary.failed:
+                journal.close()
+            else:
+                journal.remove()
+
+        if events:
+            events.done(
+                f"{repo_owner}/{repo_name}",
+                gh_label.summary,
+                1 if gh_label.summary.failed else 0,
+            )
+        _exit_on_failed_changes(gh_label, f"{repo_owner}/{repo_name}")
+
+        if not preview and not events:
+            rich.print(
+                f"[green]Successfully[/green] setup github labels from config to repo `{repo_owner}/{repo_name}`."
+            )
+
+
+@app.command("plan", help="Save the label changes `setup` would make to a plan file.")  # type: ignore[misc]
+def plan_labels(  # noqa: PLR0913
+    token: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="TOKEN",
+            show_default=False,
         ),
-    ] = True,
+    ] = None,
+    repo_owner: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_OWNER",
+            show_default=False,
+        ),
+    ] = None,
+    repo_name: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_NAME",
+            show_default=False,
+        ),
+    ] = None,
     labels_dir: Annotated[
         str,
         typer.Option(
-            "--dir",
+            "--directory",
             "-d",
-            help="Specify the dir where to find labels.",
+            help="Specify the directory where to find labels. A <repo_owner>/<repo_name> overlay dir in it, as written by `dump --from-repo`, is layered over the shared labels for that repo.",
         ),
     ] = "labels",
-    ext: Annotated[
-        ExtChoices,
+    strict: Annotated[
+        bool,
         typer.Option(
-            "--ext",
-            "-e",
-            case_sensitive=False,
-            help="Label file extension.",
+            "--strict/--no-strict",
+            "-s/-S",
+            help="Strictly mirror Github labels from labels config.",
         ),
-    ] = ExtChoices.yaml.value,  # type: ignore[assignment]
-    app: Annotated[
-        AppChoices,
+    ] = False,
+    add_labels: Annotated[
+        Optional[str],
         typer.Option(
-            "--app",
+            "--add-labels",
+            "-a",
+            help="Add more Github labels.",
+        ),
+    ] = None,
+    remove_labels: Annotated[
+        Optional[str],
+        typer.Option(
+            "--remove-labels",
+            "-r",
+            help="Remove more Github labels.",
+        ),
+    ] = None,
+    remove_all: Annotated[
+        bool,
+        typer.Option(
+            "--remove-all/--no-remove-all",
+            "-R/-N",
+            help="Remove all Github labels.",
+        ),
+    ] = False,
+    force: Annotated[
+        bool,
+        typer.Option(
+            "--force-remove/--safe-remove",
+            "-f/-F",
+            help="Forcefully remove GitHub labels, even if they are currently in use on issues or pull requests.",
+        ),
+    ] = False,
+    backend: Annotated[
+        BackendChoices,
+        typer.Option(
+            "--backend",
+            "-b",
+            case_sensitive=False,
+            help="Github API used to read and change labels. graphql batches label changes.",
+        ),
+    ] = BackendChoices.rest.value,  # type: ignore[assignment]
+    cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help="Send conditional requests and serve unchanged label/issue listings from the local cache.",
+        ),
+    ] = True,
+    plan_file: Annotated[
+        str,
+        typer.Option(
+            "--out",
+            "-O",
+            help="Plan file to write.",
+        ),
+    ] = "ghlabel-plan.json",
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root, e.g. `https://<host>/api/v3` for Github Enterprise Server. Defaults to `https://api.github.com`.",
+        ),
+    ] = None,
+) -> None:
+    import rich
+
+    from ghlabel.utils.change_events import change_events
+    from ghlabel.utils.label_diff import fingerprint_labels
+    from ghlabel.utils.plan_file import PlanFile
+
+    if not token:
+        token = validate_env("GITHUB_TOKEN")
+    if not repo_owner:
+        repo_owner = validate_env("GITHUB_REPO_OWNER")
+    if not repo_name:
+        repo_name = validate_env("GITHUB_REPO_NAME")
+
+    gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+        token, backend, 1, 0, cache, api_url=api_url
+    )
+    with gh_api_factory(repo_owner, repo_name) as gh_api:
+        gh_label = _fetch_github_labels(gh_api, labels_dir=labels_dir)
+        plan: LabelPlan = gh_label.build_plan(
+            label_names=parse_remove_labels(remove_labels),
+            labels=parse_add_labels(add_labels),
+            strict=strict,
+            remove_all=remove_all,
+            force=force,
+        )
+
+    PlanFile(
+        repo=f"{repo_owner}/{repo_name}",
+        backend=backend.value,
+        fingerprint=fingerprint_labels(gh_label.github_labels),
+        plan=plan,
+        labels_unsafe_to_remove=sorted(gh_label.labels_unsafe_to_remove),
+    ).write(plan_file)
+
+    events: ChangeEvents | None = change_events()
+    if events:
+        events.plan(f"{repo_owner}/{repo_name}", plan)
+        events.skipped(
+            f"{repo_owner}/{repo_name}",
+            gh_label.labels_unsafe_to_remove,
+            gh_label.label_name_urls_map,
+        )
+        events.emit(
+            "saved",
+            repo=f"{repo_owner}/{repo_name}",
+            path=os.path.abspath(plan_file),
+        )
+        return
+
+    rich.print(
+        f"\n  [bold green]Plan [[/bold green]{repo_owner}/{repo_name}[bold green]][/bold green]"
+    )
+    rich.print()
+    _print_plan(plan)
+    if gh_label.labels_unsafe_to_remove:
+        _print_labels_unsafe_to_remove(gh_label)
+
+    rich.print(
+        f"[green]Successfully[/green] saved plan to {os.path.abspath(plan_file)}. Run `ghlabel apply` to apply it."
+    )
+
+
+@app.command("apply", help="Apply a plan file saved by `ghlabel plan`.")  # type: ignore[misc]
+def apply_plan(  # noqa: PLR0913
+    token: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="TOKEN",
+            show_default=False,
+        ),
+    ] = None,
+    plan_file: Annotated[
+        str,
+        typer.Option(
+            "--plan",
+            "-i",
+            help="Plan file to apply.",
+        ),
+    ] = "ghlabel-plan.json",
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            "--concurrency",
+            "-c",
+            min=1,
+            help="Number of label changes sent to Github in parallel. Writes are still paced by --writes-per-minute, so it only helps while a request takes longer than the pacing interval; use -w 0 to let it scale.",
+        ),
+    ] = 1,
+    writes_per_minute: Annotated[
+        int,
+        typer.Option(
+            "--writes-per-minute",
+            "-w",
+            min=0,
+            help="Pace label changes to stay under Github's secondary rate limit. 0 disables pacing.",
+        ),
+    ] = 80,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help="Send conditional requests and serve unchanged label listings from the local cache.",
+        ),
+    ] = True,
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root, e.g. `https://<host>/api/v3` for Github Enterprise Server. Defaults to `https://api.github.com`.",
+        ),
+    ] = None,
+) -> None:
+    import rich
+
+    from ghlabel.utils.change_events import change_events
+    from ghlabel.utils.label_diff import fingerprint_labels
+    from ghlabel.utils.multi_repo_setup import parse_repo
+    from ghlabel.utils.plan_file import PlanFile
+
+    saved_plan: PlanFile = PlanFile.load(plan_file)
+    events: ChangeEvents | None = change_events()
+    if not token:
+        token = validate_env("GITHUB_TOKEN")
+
+    gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+        token,
+        BackendChoices(saved_plan.backend),
+        concurrency,
+        writes_per_minute,
+        cache,
+        api_url=api_url,
+    )
+    with gh_api_factory(*parse_repo(saved_plan.repo)) as gh_api:
+        # NOTE: the only read; issues are not scanned again.
+        gh_label = _fetch_github_labels(
+            gh_api, concurrency=concurrency, labels=[], events=events
+        )
+        if fingerprint_labels(gh_label.github_labels) != saved_plan.fingerprint:
+            if events:
+                events.emit("stale", repo=saved_plan.repo)
+            else:
+                rich.print(
+                    f"[red]Stale[/red] plan. Labels on repo `{saved_plan.repo}` changed since the plan was made. Re-run `ghlabel plan`."
+                )
+            raise typer.Exit(code=1)
+
+        gh_label.apply_plan(saved_plan.plan)
+        if events:
+            events.done(
+                saved_plan.repo,
+                gh_label.summary,
+                1 if gh_label.summary.failed else 0,
+            )
+        _exit_on_failed_changes(gh_label, saved_plan.repo)
+
+    if events:
+        return
+    rich.print(f"[green]Successfully[/green] applied plan to repo `{saved_plan.repo}`.")
+
+
+@app.command(  # type: ignore[misc]
+    "migrate",
+    help="Move every issue and PR from one label to another, then delete the old label.",
+)
+def migrate_label(  # noqa: PLR0912, PLR0913
+    from_label: Annotated[
+        str,
+        typer.Option(
+            "--from",
+            help="Label to move issues and PRs off, deleted afterwards.",
+            show_default=False,
+        ),
+    ],
+    to_label: Annotated[
+        str,
+        typer.Option(
+            "--to",
+            help="Label to move issues and PRs to. If missing, the old label is renamed to it instead.",
+            show_default=False,
+        ),
+    ],
+    token: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="TOKEN",
+            show_default=False,
+        ),
+    ] = None,
+    repo_owner: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_OWNER",
+            show_default=False,
+        ),
+    ] = None,
+    repo_name: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_NAME",
+            show_default=False,
+        ),
+    ] = None,
+    preview: Annotated[
+        bool,
+        typer.Option(
+            "--preview/--no-preview",
+            "-p/-P",
+            help="Dry run and count the affected issues and PRs, without listing them.",
+        ),
+    ] = False,
+    delete: Annotated[
+        bool,
+        typer.Option(
+            "--delete-old/--keep-old",
+            help="Delete the old label once every issue and PR moved.",
+        ),
+    ] = True,
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            "--concurrency",
+            "-c",
+            min=1,
+            help="Number of issues relabeled in parallel. Writes are still paced by --writes-per-minute, so it only helps while a request takes longer than the pacing interval; use -w 0 to let it scale.",
+        ),
+    ] = 4,
+    writes_per_minute: Annotated[
+        int,
+        typer.Option(
+            "--writes-per-minute",
+            "-w",
+            min=0,
+            help="Pace label changes to stay under Github's secondary rate limit. 0 disables pacing.",
+        ),
+    ] = 80,
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root, e.g. `https://<host>/api/v3` for Github Enterprise Server. Defaults to `https://api.github.com`.",
+        ),
+    ] = None,
+) -> None:
+    import rich
+
+    from ghlabel.utils.change_events import change_events
+    from ghlabel.utils.label_migration import LabelMigration, MigrationPreview
+
+    if not token:
+        token = validate_env("GITHUB_TOKEN")
+    if not repo_owner:
+        repo_owner = validate_env("GITHUB_REPO_OWNER")
+    if not repo_name:
+        repo_name = validate_env("GITHUB_REPO_NAME")
+
+    gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+        token,
+        BackendChoices.rest,
+        concurrency,
+        writes_per_minute,
+        False,
+        api_url=api_url,
+    )
+    events: ChangeEvents | None = change_events()
+    with gh_api_factory(repo_owner, repo_name) as gh_api:
+        migration = LabelMigration(
+            gh_api,
+            from_label,
+            to_label,
+            concurrency=concurrency,
+            show_progress=events is None,
+        )
+
+        if preview:
+            migration_preview: MigrationPreview = migration.preview()
+            if events:
+                if migration_preview.from_label_exists:
+                    events.emit(
+                        "plan",
+                        repo=f"{repo_owner}/{repo_name}",
+                        action="rename" if migration_preview.rename else "migrate",
+                        label=to_label,
+                        issues=migration_preview.issues,
+                        **{"from": from_label},
+                    )
+                return
+            rich.print(
+                f"\n  [bold green]Preview [[/bold green]{repo_owner}/{repo_name}[bold green]][/bold green]"
+            )
+            rich.print()
+            if not migration_preview.from_label_exists:
+                rich.print(f"  Label `{from_label}` not found. Nothing to migrate.")
+            elif migration_preview.rename:
+                rich.print(
+                    f"  will [yellow]rename[/yellow] `{from_label}` to `{to_label}`, keeping it on {migration_preview.issues} issues and PRs."
+                )
+            else:
+                rich.print(
+                    f"  will [cyan]move[/cyan] {migration_preview.issues} issues and PRs from `{from_label}` to `{to_label}`."
+                )
+                if delete:
+                    rich.print(f"  will [red]remove[/red] `{from_label}`.")
+            rich.print()
+            return
+
+        clear_screen()
+        summary: LabelMutationSummary = migration.run(delete=delete)
+
+    if events:
+        events.results(f"{repo_owner}/{repo_name}", summary.results)
+        events.done(f"{repo_owner}/{repo_name}", summary, 1 if summary.failed else 0)
+        if summary.failed:
+            raise typer.Exit(code=1)
+        return
+    if not summary.results:
+        rich.print(
+            f"Label `{from_label}` not found on repo `{repo_owner}/{repo_name}`. Nothing to migrate."
+        )
+        return
+    if summary.failed:
+        rich.print("  The following changes [red]failed[/red]:")
+        for result in summary.failed:
+            rich.print(
+                f"    - {result.action} `{result.label_name}` \\[{result.error or result.status_code}]"
+            )
+        rich.print()
+        rich.print(
+            f"[red]Failed[/red] to migrate {len(summary.failed)} of {len(summary.results)} changes. Run the same command again to retry them."
+        )
+        raise typer.Exit(code=1)
+
+    rich.print(
+        f"[green]Successfully[/green] migrated `{from_label}` to `{to_label}` on repo `{repo_owner}/{repo_name}`."
+    )
+
+
+@app.command(  # type: ignore[misc]
+    "watch",
+    help="Keep Github labels in sync with config files, applying changes as the config or the repos change.",
+)
+def watch_labels(  # noqa: PLR0913
+    token: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="TOKEN",
+            show_default=False,
+        ),
+    ] = None,
+    repo_owner: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_OWNER",
+            show_default=False,
+        ),
+    ] = None,
+    repo_name: Annotated[
+        Optional[str],
+        typer.Argument(
+            envvar="REPO_NAME",
+            show_default=False,
+        ),
+    ] = None,
+    labels_dir: Annotated[
+        str,
+        typer.Option(
+            "--directory",
+            "-d",
+            help="Specify the directory where to find labels. A <repo_owner>/<repo_name> overlay dir in it, as written by `dump --from-repo`, is layered over the shared labels for that repo.",
+        ),
+    ] = "labels",
+    strict: Annotated[
+        bool,
+        typer.Option(
+            "--strict/--no-strict",
+            "-s/-S",
+            help="Strictly mirror Github labels from labels config.",
+        ),
+    ] = False,
+    force: Annotated[
+        bool,
+        typer.Option(
+            "--force-remove/--safe-remove",
+            "-f/-F",
+            help="Forcefully remove GitHub labels, even if they are currently in use on issues or pull requests.",
+        ),
+    ] = False,
+    repos: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--repo",
+            "-o",
+            help="Watch <repo_owner>/<repo_name> instead of REPO_OWNER/REPO_NAME. Repeat for more repos.",
+        ),
+    ] = None,
+    repos_file: Annotated[
+        Optional[str],
+        typer.Option(
+            "--repos-file",
+            help="Watch every <repo_owner>/<repo_name> listed (one per line) in a file.",
+        ),
+    ] = None,
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            "--concurrency",
+            "-c",
+            min=1,
+            help="Number of label changes sent to Github in parallel. Writes are still paced by --writes-per-minute, so it only helps while a request takes longer than the pacing interval; use -w 0 to let it scale.",
+        ),
+    ] = 1,
+    writes_per_minute: Annotated[
+        int,
+        typer.Option(
+            "--writes-per-minute",
+            "-w",
+            min=0,
+            help="Pace label changes to stay under Github's secondary rate limit. 0 disables pacing.",
+        ),
+    ] = 80,
+    interval: Annotated[
+        float,
+        typer.Option(
+            "--interval",
+            "-i",
+            min=0.1,
+            help="Seconds between checks of the labels dir for changes.",
+        ),
+    ] = 1.0,
+    webhooks: Annotated[
+        bool,
+        typer.Option(
+            "--webhooks/--no-webhooks",
+            help="Accept Github `label` webhook events, to catch label changes made on Github.",
+        ),
+    ] = True,
+    host: Annotated[
+        str,
+        typer.Option(
+            "--host",
+            help="Address the webhook endpoint listens on.",
+        ),
+    ] = "127.0.0.1",
+    port: Annotated[
+        int,
+        typer.Option(
+            "--port",
+            min=0,
+            help="Port the webhook endpoint listens on. 0 picks a free one.",
+        ),
+    ] = 8765,
+    secret: Annotated[
+        Optional[str],
+        typer.Option(
+            "--secret",
+            envvar="GHLABEL_WEBHOOK_SECRET",
+            show_default=False,
+            help="Webhook secret; deliveries without a matching `X-Hub-Signature-256` are rejected.",
+        ),
+    ] = None,
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root, e.g. `https://<host>/api/v3` for Github Enterprise Server. Defaults to `https://api.github.com`.",
+        ),
+    ] = None,
+) -> None:
+    import rich
+
+    from ghlabel.utils.change_events import change_events
+    from ghlabel.utils.label_watch import LabelWatcher
+
+    if not token:
+        token = validate_env("GITHUB_TOKEN")
+    gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+        token,
+        BackendChoices.rest,
+        concurrency,
+        writes_per_minute,
+        False,
+        api_url=api_url,
+    )
+    watch_repos: list[str] = _list_repos(gh_api_factory, repos, repos_file, None, None)
+    if not watch_repos:
+        if not repo_owner:
+            repo_owner = validate_env("GITHUB_REPO_OWNER")
+        if not repo_name:
+            repo_name = validate_env("GITHUB_REPO_NAME")
+        watch_repos = [f"{repo_owner}/{repo_name}"]
+
+    events: ChangeEvents | None = change_events()
+    watcher = LabelWatcher(
+        gh_api_factory,
+        watch_repos,
+        labels_dir=labels_dir,
+        strict=strict,
+        force=force,
+        concurrency=concurrency,
+        interval=interval,
+        events=events,
+    )
+    watcher.start()
+    webhook_url: str = (
+        watcher.serve_webhooks(host, port, secret or "") if webhooks else ""
+    )
+
+    if events:
+        events.emit("watch", repos=watcher.repos, webhook_url=webhook_url)
+    else:
+        rich.print(
+            f"[green]Watching[/green] `{labels_dir}` for {len(watcher.repos)} repos. Press Ctrl+C to stop."
+        )
+        if webhook_url:
+            rich.print(f"  Send Github `label` webhook events to {webhook_url}")
+    watcher.run()
+
+
+@app.command(  # type: ignore[misc]
+    "dump",
+    help="Generate starter labels config files from a template or from live repos.",
+)
+def app_dump(  # noqa: PLR0913
+    new: Annotated[
+        bool,
+        typer.Option(
+            "--new/--keep-old-labels",
+            "-n/-N",
+            help="Deletes all files in labels dir.",
+        ),
+    ] = True,
+    labels_dir: Annotated[
+        str,
+        typer.Option(
+            "--dir",
+            "-d",
+            help="Specify the dir where to find labels.",
+        ),
+    ] = "labels",
+    ext: Annotated[
+        ExtChoices,
+        typer.Option(
+            "--ext",
+            "-e",
+            case_sensitive=False,
+            help="Label file extension.",
+        ),
+    ] = ExtChoices.yaml.value,  # type: ignore[assignment]
+    app: Annotated[
+        AppChoices,
+        typer.Option(
+            "--app",
             "-a",
             case_sensitive=False,
             help="App to determine label template.",
         ),
     ] = AppChoices.app.value,  # type: ignore[assignment]
+    from_repos: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--from-repo",
+            "-r",
+            help="Dump the live labels of <repo_owner>/<repo_name> instead of a template. Repeat for more repos: labels they all share are dumped to the dir, the rest to a <repo_owner>/<repo_name> overlay dir per repo, which setup layers over the shared labels.",
+        ),
+    ] = None,
+    token: Annotated[
+        Optional[str],
+        typer.Option(
+            "--token",
+            "-t",
+            envvar="TOKEN",
+            show_default=False,
+            help="Github token used with --from-repo.",
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            "-W",
+            min=1,
+            help="Number of repos fetched in parallel with --from-repo.",
+        ),
+    ] = 4,
+    api_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--api-url",
+            envvar="GITHUB_API_URL",
+            show_default=False,
+            help="Github REST API root used with --from-repo, e.g. `https://<host>/api/v3` for Github Enterprise Server.",
+        ),
+    ] = None,
 ) -> None:
+    import rich
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    from ghlabel.utils.change_events import change_events
     from ghlabel.utils.dump_label import DumpLabel
 
+    events: ChangeEvents | None = change_events()
+    if from_repos:
+        if not token:
+            token = validate_env("GITHUB_TOKEN")
+        gh_api_factory: Callable[[str, str], GithubApi] = _gh_api_factory(
+            token, BackendChoices.rest, 1, 0, False, api_url=api_url
+        )
+
+        clear_screen()
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            transient=True,
+            disable=events is not None,
+        ) as progress:
+            progress.add_task(
+                description=f"Dumping labels of {len(from_repos)} repos...", total=None
+            )
+            DumpLabel.dump_from_repos(
+                gh_api_factory,
+                from_repos,
+                labels_dir=labels_dir,
+                new=new,
+                ext=ext.value,
+                workers=workers,
+            )
+
+        if events:
+            events.emit("dump", repos=from_repos, path=os.path.abspath(labels_dir))
+            return
+        rich.print(
+            f"[green]Successfully[/green] dumped labels of {len(from_repos)} repos to {os.path.abspath(labels_dir)}."
+        )
+        return
+
+    if events:
+        DumpLabel.dump(labels_dir=labels_dir, new=new, ext=ext.value, app=app.value)
+        events.emit("dump", app=app.value, path=os.path.abspath(labels_dir))
+        return
+
     clear_screen()
     with Progress(
         SpinnerColumn(),
@@ -265,6 +1557,7 @@ def app_dump(
 
 @app.callback()  # type: ignore[misc]
 def app_callback(
+    ctx: typer.Context,
     version: Annotated[
         bool,
         typer.Option(
@@ -284,9 +1577,31 @@ def app_callback(
             help="Enable debug mode and show logs.",
         ),
     ] = False,
+    log_format: Annotated[
+        LogFormatChoices,
+        typer.Option(
+            "--log-format",
+            is_eager=True,
+            help="Write logs as plain text, or as JSON lines for log pipelines.",
+        ),
+    ] = LogFormatChoices.text,
+    output: Annotated[
+        OutputChoices,
+        typer.Option(
+            "--output",
+            is_eager=True,
+            help="Render for a terminal, or write one plain/JSON line per planned or applied label change, without prompts, screen clears or progress bars (e.g. for CI).",
+        ),
+    ] = OutputChoices.rich,
 ) -> None:
     """Setup Github Labels from a yaml/json config file."""
     set_ghlabel_debug_mode(debug)
+    set_ghlabel_log_format(log_format.value)
+    set_ghlabel_output(output.value)
+    refresh_log_level()
+    if ctx.invoked_subcommand not in COMMANDS_WITHOUT_ENV:
+        # runs before the subcommand parses its args, so `.env` still feeds `envvar`s
+        load_env()
 
 
 if __name__ == "__main__":
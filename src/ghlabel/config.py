@@ -9,3 +9,34 @@ def set_ghlabel_debug_mode(is_debug: bool) -> None:
 def is_ghlabel_debug_mode() -> bool:
     global g_GHLABEL_DEBUG_MODE  # noqa: PLW0602
     return g_GHLABEL_DEBUG_MODE
+
+
+g_GHLABEL_LOG_FORMAT = "text"
+
+
+def set_ghlabel_log_format(log_format: str) -> None:
+    global g_GHLABEL_LOG_FORMAT  # noqa: PLW0603
+    g_GHLABEL_LOG_FORMAT = log_format
+
+
+def get_ghlabel_log_format() -> str:
+    global g_GHLABEL_LOG_FORMAT  # noqa: PLW0602
+    return g_GHLABEL_LOG_FORMAT
+
+
+g_GHLABEL_OUTPUT = "rich"
+
+
+def set_ghlabel_output(output: str) -> None:
+    global g_GHLABEL_OUTPUT  # noqa: PLW0603
+    g_GHLABEL_OUTPUT = output
+
+
+def get_ghlabel_output() -> str:
+    global g_GHLABEL_OUTPUT  # noqa: PLW0602
+    return g_GHLABEL_OUTPUT
+
+
+def is_ghlabel_headless() -> bool:
+    """NOTE: no screen clears, sleeps, prompts or rich rendering; see `--output`."""
+    return get_ghlabel_output() != "rich"
@@ -0,0 +1,459 @@
+"""
+Per-request metrics for the Github API clients, summarized by `--stats` and
+written as JSON or a Prometheus textfile.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from ghlabel.utils.label_config import ConfigFileTiming
+
+# Path segments kept as-is in endpoint templates; any other segment is a parameter.
+STATIC_SEGMENTS: frozenset[str] = frozenset(
+    {"repos", "orgs", "users", "labels", "issues", "pulls", "search", "graphql"}
+)
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+NO_PHASE: str = "other"
+STATUS_NOT_MODIFIED: int = 304
+
+
+class MeteredResponse(Protocol):
+    """NOTE: satisfied by both `requests.Response` and `httpx.Response`."""
+
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+    @property
+    def content(self) -> bytes: ...
+
+
+R = TypeVar("R", bound=MeteredResponse)
+
+
+def endpoint_template(api_url: str, url: str) -> str:
+    """NOTE: e.g. `/repos/{owner}/{repo}/labels/{name}`, so endpoints group across repos."""
+    path: str = url[len(api_url) :] if url.startswith(api_url) else urlsplit(url).path
+    segments: list[str] = path.split("?", 1)[0].strip("/").split("/")
+    template: list[str] = []
+
+    for i, segment in enumerate(segments):
+        if segment in STATIC_SEGMENTS and not (i in (1, 2) and segments[0] == "repos"):
+            template.append(segment)
+        elif segments[0] == "repos" and i == 1:
+            template.append("{owner}")
+        elif segments[0] == "repos" and i == 2:  # noqa: PLR2004
+            template.append("{repo}")
+        elif segments[0] in ("orgs", "users") and i == 1:
+            template.append("{owner}")
+        elif segment.isdigit():
+            template.append("{number}")
+        else:
+            template.append("{name}")
+    return "/" + "/".join(template)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """NOTE: nearest-rank percentile of already sorted `values`."""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+@dataclass(frozen=True)
+class RequestMetric:
+    repo: str
+    phase: str
+    method: str
+    endpoint: str
+    status_code: int
+    seconds: float
+    bytes: int
+    attempt: int
+    rate_limit_resource: str = ""
+    rate_limit_remaining: int | None = None
+
+    @property
+    def is_retry(self) -> bool:
+        return self.attempt > 1
+
+    @property
+    def is_error(self) -> bool:
+        """NOTE: status 0 is a request that never got a response (e.g. a timeout)."""
+        return not 0 < self.status_code < 400  # noqa: PLR2004
+
+
+class ApiMetrics:
+    """
+    Thread-safe store of every request sent through the instrumented
+    clients. One instance is shared by all clients of a run, each request
+    tagged with its repo and the client's current phase.
+    NOTE: labels config file loads are kept apart from requests, as the
+    run's `config` cost.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: list[RequestMetric] = []
+        self._config_loads: list[ConfigFileTiming] = []
+        self._started_at: float = time.perf_counter()
+
+    @property
+    def requests(self) -> list[RequestMetric]:
+        with self._lock:
+            return list(self._requests)
+
+    @property
+    def config_loads(self) -> "list[ConfigFileTiming]":
+        with self._lock:
+            return list(self._config_loads)
+
+    def record(self, metric: RequestMetric) -> None:
+        with self._lock:
+            self._requests.append(metric)
+
+    def record_config(self, timings: "Iterable[ConfigFileTiming]") -> None:
+        with self._lock:
+            self._config_loads.extend(timings)
+
+    def config_summary(self) -> dict[str, Any]:
+        config_loads: list[ConfigFileTiming] = self.config_loads
+        return {
+            "files": len(config_loads),
+            "cached": sum(1 for timing in config_loads if timing.cached),
+            "seconds": sum(timing.seconds for timing in config_loads),
+        }
+
+    def _record_response(  # noqa: PLR0913
+        self,
+        repo: str,
+        phase: str,
+        method: str,
+        endpoint: str,
+        attempt: int,
+        seconds: float,
+        res: MeteredResponse | None,
+    ) -> None:
+        remaining: str | None = (
+            res.headers.get("X-RateLimit-Remaining") if res is not None else None
+        )
+        self.record(
+            RequestMetric(
+                repo=repo,
+                phase=phase or NO_PHASE,
+                method=method.upper(),
+                endpoint=endpoint,
+                status_code=res.status_code if res is not None else 0,
+                seconds=seconds,
+                bytes=len(res.content) if res is not None else 0,
+                attempt=attempt,
+                rate_limit_resource=res.headers.get("X-RateLimit-Resource", "core")
+                if res is not None
+                else "",
+                rate_limit_remaining=int(remaining) if remaining else None,
+            )
+        )
+
+    def instrument(  # noqa: PLR0913
+        self,
+        send: Callable[[], R],
+        repo: str,
+        phase: str,
+        method: str,
+        endpoint: str,
+        first_attempt: int = 1,
+    ) -> Callable[[], R]:
+        """
+        NOTE: wraps the zero-arg `send` handed to `RateLimitScheduler.send`, so
+        every attempt (including rate limit retries) is recorded.
+        `first_attempt` numbers retries made by the `RetryPolicy` above it.
+        """
+
+        attempt: int = first_attempt - 1
+
+        def timed_send() -> R:
+            nonlocal attempt
+            attempt += 1
+            start: float = time.perf_counter()
+            res: R | None = None
+            try:
+                res = send()
+                return res
+            finally:
+                self._record_response(
+                    repo,
+                    phase,
+                    method,
+                    endpoint,
+                    attempt,
+                    time.perf_counter() - start,
+                    res,
+                )
+
+        return timed_send
+
+    def ainstrument(  # noqa: PLR0913
+        self,
+        send: Callable[[], Awaitable[R]],
+        repo: str,
+        phase: str,
+        method: str,
+        endpoint: str,
+        first_attempt: int = 1,
+    ) -> Callable[[], Awaitable[R]]:
+        attempt: int = first_attempt - 1
+
+        async def timed_send() -> R:
+            nonlocal attempt
+            attempt += 1
+            start: float = time.perf_counter()
+            res: R | None = None
+            try:
+                res = await send()
+                return res
+            finally:
+                self._record_response(
+                    repo,
+                    phase,
+                    method,
+                    endpoint,
+                    attempt,
+                    time.perf_counter() - start,
+                    res,
+                )
+
+        return timed_send
+
+    def summary(self, repo: str | None = None) -> dict[str, Any]:
+        """
+        NOTE: pass `repo` to only summarize the requests sent for it. The
+        config load is shared by every repo, so it is only in the run's summary.
+        """
+
+        requests: list[RequestMetric] = [
+            metric for metric in self.requests if repo is None or metric.repo == repo
+        ]
+        phases: dict[str, list[RequestMetric]] = {}
+        for metric in requests:
+            phases.setdefault(metric.phase, []).append(metric)
+
+        summary: dict[str, Any] = {
+            "requests": len(requests),
+            "retries": sum(1 for metric in requests if metric.is_retry),
+            "errors": sum(1 for metric in requests if metric.is_error),
+            "bytes": sum(metric.bytes for metric in requests),
+            "seconds": time.perf_counter() - self._started_at,
+            "latency": self._latency(requests),
+            "status_codes": {
+                str(status_code): count
+                for status_code, count in sorted(
+                    Counter(metric.status_code for metric in requests).items()
+                )
+            },
+            "phases": {
+                phase: {
+                    "requests": len(phase_requests),
+                    "retries": sum(1 for metric in phase_requests if metric.is_retry),
+                    "latency": self._latency(phase_requests),
+                }
+                for phase, phase_requests in phases.items()
+            },
+            "rate_limit_consumed": self._rate_limit_consumed(requests),
+        }
+        if repo is None:
+            summary["config"] = self.config_summary()
+        return summary
+
+    def _latency(self, requests: list[RequestMetric]) -> dict[str, float]:
+        seconds: list[float] = sorted(metric.seconds for metric in requests)
+        return {
+            **{f"p{pct}": percentile(seconds, pct) for pct in PERCENTILES},
+            "max": seconds[-1] if seconds else 0,
+        }
+
+    def _rate_limit_consumed(self, requests: list[RequestMetric]) -> dict[str, int]:
+        """
+        NOTE: counted per request rather than from the spread of
+        `X-RateLimit-Remaining`, which other repos sharing the token also move.
+        Github does not charge a 304 against the budget.
+        """
+
+        consumed: Counter[str] = Counter(
+            metric.rate_limit_resource
+            for metric in requests
+            if metric.rate_limit_remaining is not None
+            and metric.status_code != STATUS_NOT_MODIFIED
+        )
+        return dict(sorted(consumed.items()))
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "summary": self.summary(),
+            "repos": {
+                repo: self.summary(repo)
+                for repo in sorted({metric.repo for metric in self.requests})
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+
+        def metric_family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def sample(name: str, labels: dict[str, str], value: float) -> None:
+            label_str: str = ",".join(
+                f'{key}="{_escape_label_value(val)}"' for key, val in labels.items()
+            )
+            lines.append(f"{name}{{{label_str}}} {value}")
+
+        requests: list[RequestMetric] = self.requests
+        repos: list[str] = sorted({metric.repo for metric in requests})
+
+        metric_family(
+            "ghlabel_api_requests_total", "counter", "Github API requests sent."
+        )
+        request_counts: Counter[tuple[str, str, str, str, int]] = Counter(
+            (
+                metric.repo,
+                metric.phase,
+                metric.method,
+                metric.endpoint,
+                metric.status_code,
+            )
+            for metric in requests
+        )
+        for (repo, phase, method, endpoint, status_code), count in sorted(
+            request_counts.items()
+        ):
+            sample(
+                "ghlabel_api_requests_total",
+                {
+                    "repo": repo,
+                    "phase": phase,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "status": str(status_code),
+                },
+                count,
+            )
+
+        metric_family(
+            "ghlabel_api_request_duration_seconds",
+            "summary",
+            "Github API request latency.",
+        )
+        for repo in repos:
+            seconds: list[float] = sorted(
+                metric.seconds for metric in requests if metric.repo == repo
+            )
+            for pct in PERCENTILES:
+                sample(
+                    "ghlabel_api_request_duration_seconds",
+                    {"repo": repo, "quantile": str(pct / 100)},
+                    percentile(seconds, pct),
+                )
+            sample(
+                "ghlabel_api_request_duration_seconds_sum", {"repo": repo}, sum(seconds)
+            )
+            sample(
+                "ghlabel_api_request_duration_seconds_count",
+                {"repo": repo},
+                len(seconds),
+            )
+
+        families: tuple[tuple[str, str, str], ...] = (
+            (
+                "ghlabel_api_response_bytes_total",
+                "bytes",
+                "Github API response bytes received.",
+            ),
+            (
+                "ghlabel_api_retries_total",
+                "retries",
+                "Github API requests that were retries.",
+            ),
+            ("ghlabel_api_errors_total", "errors", "Github API requests that failed."),
+        )
+        summaries: dict[str, dict[str, Any]] = {
+            repo: self.summary(repo) for repo in repos
+        }
+        for name, key, help_text in families:
+            metric_family(name, "counter", help_text)
+            for repo in repos:
+                sample(name, {"repo": repo}, summaries[repo][key])
+
+        metric_family(
+            "ghlabel_api_rate_limit_consumed",
+            "gauge",
+            "Github API rate limit budget consumed by the run.",
+        )
+        for repo in repos:
+            for resource, consumed in summaries[repo]["rate_limit_consumed"].items():
+                sample(
+                    "ghlabel_api_rate_limit_consumed",
+                    {"repo": repo, "resource": resource},
+                    consumed,
+                )
+
+        config_summary: dict[str, Any] = self.config_summary()
+        metric_family(
+            "ghlabel_config_load_seconds",
+            "gauge",
+            "Time spent loading the labels config files.",
+        )
+        lines.append(f"ghlabel_config_load_seconds {config_summary['seconds']}")
+        metric_family(
+            "ghlabel_config_files_loaded",
+            "gauge",
+            "Labels config files loaded, by whether the parse cache served them.",
+        )
+        for cached in (False, True):
+            sample(
+                "ghlabel_config_files_loaded",
+                {"cached": str(cached).lower()},
+                config_summary["cached"]
+                if cached
+                else config_summary["files"] - config_summary["cached"],
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        NOTE: a `.prom` path is written in the Prometheus textfile format, any
+        other path as JSON. The file is replaced atomically, as node_exporter expects.
+        """
+
+        content: str = (
+            self.to_prometheus()
+            if path.endswith(".prom")
+            else json.dumps(self.to_json(), indent=2) + "\n"
+        )
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,501 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import partial
+from types import TracebackType
+from typing import Any
+
+try:
+    import httpx
+except ImportError as ex:
+    raise ImportError(
+        "AsyncGithubApi requires `httpx`. Install it with `pip install ghlabel[async]`."
+    ) from ex
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.api_metrics import ApiMetrics, endpoint_template
+from ghlabel.utils.github_api import (
+    GithubApi,
+    issue_url,
+    log_request,
+    parse_last_page,
+)
+from ghlabel.utils.github_api_types import (
+    GithubIssue,
+    GithubIssueParams,
+    GithubLabel,
+    StatusCode,
+)
+from ghlabel.utils.helpers import STATUS_FAILED
+from ghlabel.utils.rate_limit import RateLimitScheduler
+from ghlabel.utils.retry_policy import RetryPolicy, is_already_applied
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_CREATED: int = 201
+STATUS_NO_CONTENT: int = 204
+STATUS_BAD_REQUEST: int = 400
+
+
+class AsyncGithubApi:
+    """
+    asyncio counterpart of `GithubApi`. Pass a shared `client` to drive
+    many repos over one connection pool from a single event loop.
+    """
+
+    VERSION: str = GithubApi.VERSION
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token: str,
+        repo_owner: str,
+        repo_name: str,
+        connect_timeout: float = 10,
+        read_timeout: float = 10,
+        max_connections: int = 100,
+        client: httpx.AsyncClient | None = None,
+        rate_limiter: RateLimitScheduler | None = None,
+        api_url: str | None = None,
+        metrics: ApiMetrics | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        self._token = token
+        self._repo_owner = repo_owner
+        self._repo_name = repo_name
+        self._api_url: str = (api_url or GithubApi.API_URL).rstrip("/")
+        self._base_url = f"{self._api_url}/repos/{repo_owner}/{repo_name}"
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": AsyncGithubApi.VERSION,
+        }
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._rate_limiter: RateLimitScheduler = rate_limiter or RateLimitScheduler()
+        self._metrics = metrics
+        self._retry_policy: RetryPolicy = replace(
+            retry_policy or RetryPolicy(),
+            retry_exceptions=(retry_policy and retry_policy.retry_exceptions)
+            or (httpx.TransportError,),
+        )
+        self._phase: str = ""
+        self._owns_client: bool = client is None
+        self._client: httpx.AsyncClient = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=self._timeout,
+        )
+
+    async def __aenter__(self) -> "AsyncGithubApi":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    @property
+    def repo_owner(self) -> str:
+        return self._repo_owner
+
+    @property
+    def repo_name(self) -> str:
+        return self._repo_name
+
+    @property
+    def api_url(self) -> str:
+        return self._api_url
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return self._headers
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client
+
+    @property
+    def rate_limiter(self) -> RateLimitScheduler:
+        return self._rate_limiter
+
+    @property
+    def metrics(self) -> ApiMetrics | None:
+        return self._metrics
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return self._retry_policy
+
+    @property
+    def current_phase(self) -> str:
+        return self._phase
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        previous: str = self._phase
+        self._phase = name
+        try:
+            yield
+        finally:
+            self._phase = previous
+
+    async def _send(
+        self, method: str, url: str, attempt: int = 1, **kwargs: Any
+    ) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        send: Callable[[], Awaitable[httpx.Response]] = partial(
+            self.client.request, method, url, headers=self.headers, **kwargs
+        )
+        if self.metrics:
+            send = self.metrics.ainstrument(
+                send,
+                f"{self.repo_owner}/{self.repo_name}",
+                self.current_phase,
+                method,
+                endpoint_template(self.api_url, url),
+                first_attempt=attempt,
+            )
+        if not logger.is_enabled_for(logging.DEBUG):
+            return await self.rate_limiter.asend(method, url, send)
+
+        start: float = time.perf_counter()
+        res: httpx.Response = await self.rate_limiter.asend(method, url, send)
+        log_request(
+            self.api_url,
+            f"{self.repo_owner}/{self.repo_name}",
+            method,
+            url,
+            attempt,
+            res.status_code,
+            time.perf_counter() - start,
+        )
+        return res
+
+    async def _request_attempts(
+        self, method: str, url: str, deadline: float | None = None, **kwargs: Any
+    ) -> tuple[httpx.Response, int]:
+        """NOTE: see `GithubApi._request_attempts`."""
+
+        deadline_at: float | None = (
+            time.monotonic() + deadline if deadline is not None else None
+        )
+
+        async def send(attempt: int) -> httpx.Response:
+            attempt_kwargs: dict[str, Any] = dict(kwargs)
+            if deadline_at is not None:
+                time_left: float = max(deadline_at - time.monotonic(), 0.001)
+                attempt_kwargs["timeout"] = httpx.Timeout(
+                    min(self._timeout.read or time_left, time_left),
+                    connect=min(self._timeout.connect or time_left, time_left),
+                )
+            return await self._send(method, url, attempt, **attempt_kwargs)
+
+        return await self.retry_policy.acall(
+            send, deadline_at=deadline_at, description=f"{method} `{url}`"
+        )
+
+    async def _request(
+        self, method: str, url: str, deadline: float | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        res, _ = await self._request_attempts(method, url, deadline=deadline, **kwargs)
+        return res
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _fetch_page(
+        self, url: str, params: dict[str, Any], page: int
+    ) -> httpx.Response:
+        logger.info("Fetching page %s.", page)
+        res: httpx.Response = await self._request(
+            "GET", url, params={**params, "page": page, "per_page": GithubApi.PER_PAGE}
+        )
+        res.raise_for_status()
+        return res
+
+    async def _paginate(
+        self, url: str, params: dict[str, Any], resource: str
+    ) -> AsyncIterator[tuple[list[Any], StatusCode]]:
+        """
+        Same `Link: rel="last"` driven pagination as `GithubApi._paginate`.
+        NOTE: a failed request is yielded as an empty page and ends pagination.
+        """
+
+        try:
+            res: httpx.Response = await self._fetch_page(url, params, 1)
+            yield res.json(), res.status_code
+
+            last_page: int = parse_last_page(res.links)
+            if last_page > 1:
+                for page_res in await asyncio.gather(
+                    *(
+                        self._fetch_page(url, params, page)
+                        for page in range(2, last_page + 1)
+                    )
+                ):
+                    yield page_res.json(), page_res.status_code
+        except httpx.TransportError:
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            yield [], STATUS_FAILED
+        except httpx.HTTPStatusError as ex:
+            logger.error(
+                "Failed to fetch list of github %s. Check if token has permission to access `%s/%s`.",
+                resource,
+                self.repo_owner,
+                self.repo_name,
+            )
+            yield [], ex.response.status_code
+
+    async def iter_labels(self) -> AsyncIterator[GithubLabel]:
+        logger.info(
+            "Fetching list of github labels from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        async for github_labels, _ in self._paginate(
+            f"{self.base_url}/labels", {}, "labels"
+        ):
+            for github_label in github_labels:
+                yield github_label
+
+    def _issue_params(
+        self, label_names: set[str] | None, state: str
+    ) -> GithubIssueParams:
+        params: GithubIssueParams = {}
+
+        if label_names:
+            params["labels"] = ",".join(label_name for label_name in label_names)
+
+        if state:
+            params["state"] = state
+
+        return params
+
+    async def iter_issues(
+        self, label_names: set[str] | None = None, state: str = "all"
+    ) -> AsyncIterator[GithubIssue]:
+        """
+        Issue queried include PRs. PR has "pull_request" key.
+        """
+
+        logger.info(
+            "Fetching list of github issues from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        async for github_issues, _ in self._paginate(
+            f"{self.base_url}/issues",
+            self._issue_params(label_names, state),  # type: ignore[arg-type]
+            "issues",
+        ):
+            for github_issue in github_issues:
+                yield github_issue
+
+    async def list_labels(self) -> tuple[list[GithubLabel], StatusCode]:
+        logger.info(
+            "Fetching list of github labels from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        github_labels: list[GithubLabel] = []
+        status_code: StatusCode = STATUS_FAILED
+        async for page_labels, page_status_code in self._paginate(
+            f"{self.base_url}/labels", {}, "labels"
+        ):
+            github_labels.extend(page_labels)
+            status_code = page_status_code
+
+        return github_labels, status_code
+
+    async def list_issues(
+        self, label_names: set[str] | None = None, state: str = "all"
+    ) -> tuple[list[GithubIssue], StatusCode]:
+        """
+        Issue queried include PRs. PR has "pull_request" key.
+        """
+
+        logger.info(
+            "Fetching list of github issues from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        github_issues: list[GithubIssue] = []
+        status_code: StatusCode = STATUS_FAILED
+        async for page_issues, page_status_code in self._paginate(
+            f"{self.base_url}/issues",
+            self._issue_params(label_names, state),  # type: ignore[arg-type]
+            "issues",
+        ):
+            github_issues.extend(page_issues)
+            status_code = page_status_code
+
+        return github_issues, status_code
+
+    async def create_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
+        url: str = f"{self.base_url}/labels"
+
+        try:
+            res, attempts = await self._request_attempts(
+                "POST", url, deadline=deadline, json=label
+            )
+            if attempts > 1 and is_already_applied("POST", res):
+                logger.info(
+                    "Label `%s` was already added by an earlier attempt.", label["name"]
+                )
+                return label, STATUS_CREATED
+            res.raise_for_status()
+        except httpx.TransportError:
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not added. Try checking the connection.",
+                label["name"],
+            )
+            return label, STATUS_FAILED
+        except httpx.HTTPStatusError as ex:
+            logger.error(
+                "Failed to add label `%s`. Check the label format.", label["name"]
+            )
+            # NOTE: the error body isn't always JSON, e.g. a 502 HTML page
+            return label, ex.response.status_code
+
+        logger.info("Label `%s` added successfully.", label["name"])
+        return res.json(), res.status_code
+
+    async def update_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
+        url: str = f"{self.base_url}/labels/{label['name']}"
+        # NOTE: a rename already carries its `new_name`
+        label.setdefault("new_name", label.pop("name"))  # type: ignore[misc]
+
+        try:
+            res = await self._request("PATCH", url, deadline=deadline, json=label)
+            res.raise_for_status()
+        except httpx.TransportError:
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not updated. Try checking the connection.",
+                label["new_name"],
+            )
+            return label, STATUS_FAILED
+        except httpx.HTTPStatusError as ex:
+            logger.error(
+                "Failed to update label `%s`. Check the label format.",
+                label["new_name"],
+            )
+            return label, ex.response.status_code
+
+        logger.info("Label `%s` updated successfully.", label["new_name"])
+        return res.json(), res.status_code
+
+    async def delete_label(
+        self, label_name: str, deadline: float | None = None
+    ) -> tuple[None, StatusCode]:
+        url: str = f"{self.base_url}/labels/{label_name}"
+
+        try:
+            res, attempts = await self._request_attempts(
+                "DELETE", url, deadline=deadline
+            )
+            if attempts > 1 and is_already_applied("DELETE", res):
+                logger.info(
+                    "Label `%s` was already deleted by an earlier attempt.", label_name
+                )
+                return None, STATUS_NO_CONTENT
+            res.raise_for_status()
+        except httpx.TransportError:
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not deleted. Try checking the connection.",
+                label_name,
+            )
+            return None, STATUS_FAILED
+        except httpx.HTTPStatusError as ex:
+            logger.error("Failed to delete label `%s`.", label_name)
+            return None, ex.response.status_code
+
+        logger.info("Label `%s` deleted successfully.", label_name)
+        return None, res.status_code
+
+    async def _probe_label_usage(self, label_name: str, limit: int) -> list[str]:
+        logger.info("Probing usage of label `%s`.", label_name)
+        res: httpx.Response = await self._request(
+            "GET",
+            f"{self.base_url}/issues",
+            params={"labels": label_name, "state": "all", "per_page": limit},
+        )
+        res.raise_for_status()
+        return [issue_url(issue) for issue in res.json()]
+
+    async def probe_label_usage(
+        self, label_names: set[str], limit: int = GithubApi.LABEL_USAGE_SAMPLE
+    ) -> dict[str, list[str]]:
+        """
+        See `GithubApi.probe_label_usage`.
+        NOTE: a label whose probe fails is reported as in use, so it is never removed.
+        """
+
+        probe_names: list[str] = sorted(
+            label_name for label_name in label_names if "," not in label_name
+        )
+        scan_names: set[str] = label_names - set(probe_names)
+        label_name_urls_map: dict[str, list[str]] = {}
+
+        results: list[list[str] | BaseException] = await asyncio.gather(
+            *(self._probe_label_usage(label_name, limit) for label_name in probe_names),
+            return_exceptions=True,
+        )
+        for label_name, result in zip(probe_names, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Failed to probe usage of label `%s`. %s", label_name, result
+                )
+                label_name_urls_map[label_name] = []
+            elif result:
+                label_name_urls_map[label_name] = result
+
+        # stops paginating once every scanned label is proven in use
+        unproven_names: set[str] = set(scan_names)
+        if scan_names:
+            async for github_issues, status_code in self._paginate(
+                f"{self.base_url}/issues",
+                self._issue_params(None, "all"),  # type: ignore[arg-type]
+                "issues",
+            ):
+                if status_code == STATUS_FAILED or status_code >= STATUS_BAD_REQUEST:
+                    logger.error(
+                        "Failed to scan issues for usage of labels %s.",
+                        sorted(unproven_names),
+                    )
+                    for label_name in unproven_names:
+                        label_name_urls_map[label_name] = []
+                    break
+                for issue in github_issues:
+                    for label in issue["labels"]:
+                        if label["name"] not in scan_names:
+                            continue
+                        urls = label_name_urls_map.setdefault(label["name"], [])
+                        if len(urls) < limit:
+                            urls.append(issue_url(issue))
+                        unproven_names.discard(label["name"])
+                if not unproven_names:
+                    break
+
+        return label_name_urls_map
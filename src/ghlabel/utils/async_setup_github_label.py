@@ -0,0 +1,244 @@
+"""
+asyncio variant of the `SetupGithubLabel` reconcile flow,
+for embedding ghlabel in an event loop.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import asyncio
+from collections.abc import Awaitable
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.async_github_api import AsyncGithubApi
+from ghlabel.utils.github_api_types import GithubLabel, StatusCode
+from ghlabel.utils.helpers import STATUS_FAILED, STATUS_OK
+from ghlabel.utils.label_config import (
+    format_github_label,
+    load_repo_labels_from_config,
+    load_repo_labels_to_remove_from_config,
+)
+from ghlabel.utils.label_diff import (
+    LabelIndex,
+    LabelPlan,
+    mutation_label,
+    plan_labels,
+)
+from ghlabel.utils.label_executor import LabelMutationResult, LabelMutationSummary
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+
+class AsyncSetupGithubLabel:
+    """
+    Unlike `SetupGithubLabel`, nothing is fetched or loaded on init and nothing
+    is rendered; call `reconcile` (or the individual phases) from a coroutine.
+    NOTE: the labels config is parsed in a worker thread (`load_config`), so
+    its file reads and YAML parsing never block the event loop.
+    """
+
+    def __init__(
+        self,
+        gh_api: AsyncGithubApi,
+        labels_dir: str = "labels",
+        concurrency: int = 10,
+        labels: list[GithubLabel] | None = None,
+    ) -> None:
+        self._labels_dir = labels_dir
+        self._gh_api = gh_api
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._summary = LabelMutationSummary()
+
+        self._github_label_index = LabelIndex()
+        self._labels: list[GithubLabel] | None = labels
+        self._labels_to_remove: set[str] | None = None
+        self._label_name_urls_map: dict[str, set[str]] = {}
+        self._labels_unsafe_to_remove: set[str] = set()
+
+    @property
+    def labels_dir(self) -> str:
+        return self._labels_dir
+
+    @property
+    def gh_api(self) -> AsyncGithubApi:
+        return self._gh_api
+
+    @property
+    def github_labels(self) -> list[GithubLabel]:
+        return self._github_label_index.labels
+
+    @property
+    def github_label_names(self) -> set[str]:
+        return self._github_label_index.names
+
+    @property
+    def github_label_index(self) -> LabelIndex:
+        return self._github_label_index
+
+    @property
+    def labels(self) -> list[GithubLabel]:
+        """NOTE: empty until `load_config` ran, unless `labels` were passed in."""
+        return self._labels or []
+
+    @property
+    def label_name_urls_map(self) -> dict[str, set[str]]:
+        return self._label_name_urls_map
+
+    @property
+    def labels_unsafe_to_remove(self) -> set[str]:
+        return self._labels_unsafe_to_remove
+
+    @property
+    def summary(self) -> LabelMutationSummary:
+        return self._summary
+
+    async def load_config(self) -> None:
+        if self._labels is None:
+            self._labels = await asyncio.to_thread(
+                load_repo_labels_from_config,
+                self.labels_dir,
+                f"{self.gh_api.repo_owner}/{self.gh_api.repo_name}",
+                self.gh_api.metrics,
+            )
+        if self._labels_to_remove is None:
+            self._labels_to_remove = await asyncio.to_thread(
+                load_repo_labels_to_remove_from_config,
+                self.labels_dir,
+                f"{self.gh_api.repo_owner}/{self.gh_api.repo_name}",
+                self.gh_api.metrics,
+            )
+
+    async def fetch_github_labels(self) -> StatusCode:
+        with self.gh_api.phase("fetch"):
+            github_labels, status_code = await self.gh_api.list_labels()
+        if status_code == STATUS_OK:
+            self._github_label_index = LabelIndex(
+                map(format_github_label, github_labels)
+            )
+        return status_code
+
+    async def _run_mutation(
+        self, action: str, label_name: str, mutation: Awaitable[tuple[object, int]]
+    ) -> LabelMutationResult:
+        async with self._semaphore:
+            try:
+                _, status_code = await mutation
+            except Exception as ex:
+                logger.error("Failed to %s label `%s`. %s", action, label_name, ex)
+                return LabelMutationResult(action, label_name, STATUS_FAILED, str(ex))
+        return LabelMutationResult(action, label_name, status_code)
+
+    async def _run_mutations(
+        self, action: str, mutations: dict[str, Awaitable[tuple[object, int]]]
+    ) -> list[LabelMutationResult]:
+        with self.gh_api.phase(action):
+            results: list[LabelMutationResult] = list(
+                await asyncio.gather(
+                    *(
+                        self._run_mutation(action, label_name, mutation)
+                        for label_name, mutation in mutations.items()
+                    )
+                )
+            )
+        self.summary.extend(results)
+        return results
+
+    async def _list_labels_safe_to_remove(self, label_names: set[str]) -> set[str]:
+        label_name_urls_map: dict[str, list[str]]
+        with self.gh_api.phase("scan"):
+            label_name_urls_map = await self.gh_api.probe_label_usage(
+                label_names & self.github_label_names
+            )
+        for label_name, urls in label_name_urls_map.items():
+            self._label_name_urls_map.setdefault(label_name, set()).update(urls)
+
+        labels_unsafe_to_remove: set[str] = set(label_name_urls_map)
+        self._labels_unsafe_to_remove = labels_unsafe_to_remove
+        return label_names - labels_unsafe_to_remove
+
+    async def remove_labels(
+        self,
+        label_names: set[str] | None = None,
+        strict: bool = False,
+        force: bool = False,
+    ) -> list[LabelMutationResult]:
+        await self.load_config()
+        plan: LabelPlan = plan_labels(
+            self.labels,
+            self.github_label_index,
+            strict=strict,
+            remove=(label_names or set()) | (self._labels_to_remove or set()),
+        )
+        labels_safe_to_remove: set[str] = (
+            plan.delete
+            if force
+            else await self._list_labels_safe_to_remove(plan.delete)
+        )
+
+        return await self._run_mutations(
+            "remove",
+            {
+                label_name: self.gh_api.delete_label(label_name)
+                for label_name in labels_safe_to_remove
+            },
+        )
+
+    async def update_labels(
+        self, labels: list[GithubLabel]
+    ) -> list[LabelMutationResult]:
+        # NOTE: matched to the remote labels by name, or by alias for a rename
+        return await self._run_mutations(
+            "update",
+            {
+                label["name"]: self.gh_api.update_label(
+                    mutation_label(label, github_label)
+                )
+                for github_label, label in plan_labels(
+                    labels, self.github_label_index
+                ).update
+            },
+        )
+
+    async def add_labels(
+        self, labels: list[GithubLabel] | None = None
+    ) -> list[LabelMutationResult]:
+        await self.load_config()
+        plan: LabelPlan = plan_labels(
+            [*self.labels, *(labels or [])], self.github_label_index
+        )
+        labels_to_add: list[GithubLabel] = plan.create
+        labels_to_update: list[GithubLabel] = [label for _, label in plan.update]
+
+        results: list[LabelMutationResult] = await self._run_mutations(
+            "add",
+            {
+                label["name"]: self.gh_api.create_label(mutation_label(label))
+                for label in labels_to_add
+            },
+        )
+        results.extend(await self.update_labels(labels_to_update))
+        logger.info("Label creation process completed.")
+        return results
+
+    async def reconcile(
+        self,
+        label_names: set[str] | None = None,
+        strict: bool = False,
+        force: bool = False,
+    ) -> LabelMutationSummary:
+        await self.load_config()
+        if await self.fetch_github_labels() != STATUS_OK:
+            logger.error(
+                "Failed to fetch labels from `%s/%s`.",
+                self.gh_api.repo_owner,
+                self.gh_api.repo_name,
+            )
+            return self.summary
+
+        await self.remove_labels(label_names=label_names, strict=strict, force=force)
+        await self.add_labels()
+        return self.summary
@@ -0,0 +1,147 @@
+"""
+Machine-readable output for `--output json|plain`: one line per planned or
+applied label change, for CI and other tooling to consume.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import json
+import sys
+import threading
+from collections.abc import Iterable, Mapping
+from typing import IO, Any
+
+from ghlabel.config import get_ghlabel_output
+from ghlabel.utils.label_diff import LabelPlan
+from ghlabel.utils.label_executor import LabelMutationResult, LabelMutationSummary
+
+OUTPUT_FORMATS: tuple[str, ...] = ("json", "plain")
+
+
+def _plain_value(value: object) -> str:
+    if isinstance(value, str) and value and not any(c in value for c in ' "='):
+        return value
+    return json.dumps(value)
+
+
+class ChangeEvents:
+    """
+    Writes events to `stream` (stdout by default), one per line, flushed as
+    they happen. Label change events carry the `repo` they happened on:
+    - `plan`: a change `setup`/`plan` will make (`action`, `label`, and
+      `from` for a rename).
+    - `change`: a change that was sent (`action`, `label`, `status`, `ok`,
+      and `error` if it raised).
+    - `skip`: a label not removed because it is still in use (`urls`).
+    - `done`: a repo's totals and `exit_code`.
+    NOTE: `plain` writes the same events as `event key=value ...` lines.
+    Safe to share across the threads of a multi-repo run.
+    """
+
+    def __init__(self, output: str = "json", stream: IO[str] | None = None) -> None:
+        self._output = output
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    @property
+    def output(self) -> str:
+        return self._output
+
+    def emit(self, event: str, **fields: Any) -> None:
+        entry: dict[str, Any] = {"event": event, **fields}
+        if self.output == "json":
+            line: str = json.dumps(entry, default=str)
+        else:
+            line = " ".join(
+                [event]
+                + [
+                    f"{key}={_plain_value(val)}"
+                    for key, val in entry.items()
+                    if key != "event"
+                ]
+            )
+        stream: IO[str] = self._stream or sys.stdout
+        with self._lock:
+            stream.write(line + "\n")
+            stream.flush()
+
+    def plan(self, repo: str, plan: LabelPlan) -> None:
+        for label_name in sorted(plan.delete):
+            self.emit("plan", repo=repo, action="remove", label=label_name)
+        for label in plan.create:
+            self.emit("plan", repo=repo, action="add", label=label["name"])
+        for github_label, label in plan.update:
+            if github_label["name"] == label["name"]:
+                self.emit("plan", repo=repo, action="update", label=label["name"])
+            else:
+                self.emit(
+                    "plan",
+                    repo=repo,
+                    action="update",
+                    label=label["name"],
+                    **{"from": github_label["name"]},
+                )
+
+    def results(self, repo: str, results: Iterable[LabelMutationResult]) -> None:
+        for result in results:
+            fields: dict[str, Any] = {
+                "action": result.action,
+                "label": result.label_name,
+                "status": result.status_code,
+                "ok": result.ok,
+            }
+            if result.error:
+                fields["error"] = result.error
+            self.emit("change", repo=repo, **fields)
+
+    def skipped(
+        self,
+        repo: str,
+        label_names: Iterable[str],
+        label_name_urls_map: Mapping[str, Iterable[str]],
+    ) -> None:
+        for label_name in sorted(label_names):
+            self.emit(
+                "skip",
+                repo=repo,
+                action="remove",
+                label=label_name,
+                reason="in use",
+                urls=sorted(label_name_urls_map.get(label_name, ())),
+            )
+
+    def done(
+        self,
+        repo: str,
+        summary: LabelMutationSummary | None = None,
+        exit_code: int = 0,
+        **fields: Any,
+    ) -> None:
+        """NOTE: `fields` adds to the totals, e.g. `in_sync=True`."""
+
+        summary = summary or LabelMutationSummary()
+        counts: dict[str, int] = {"add": 0, "update": 0, "remove": 0}
+        for result in summary.succeeded:
+            counts[result.action] = counts.get(result.action, 0) + 1
+        self.emit(
+            "done",
+            repo=repo,
+            added=counts["add"],
+            updated=counts["update"],
+            removed=counts["remove"],
+            succeeded=len(summary.succeeded),
+            failed=len(summary.failed),
+            exit_code=exit_code,
+            **fields,
+        )
+
+
+def change_events() -> ChangeEvents | None:
+    """NOTE: None unless `--output` asked for machine-readable output."""
+    output: str = get_ghlabel_output()
+    return ChangeEvents(output) if output in OUTPUT_FORMATS else None
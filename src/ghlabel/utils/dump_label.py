@@ -14,16 +14,30 @@ __status__ = "Prototype"
 
 import json
 import os
+import re
+import sys
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, Any, TypedDict
 
 import yaml
 
 from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.helpers import STATUS_OK
+from ghlabel.utils.label_config import repo_overlay_dir
+
+if TYPE_CHECKING:
+    from ghlabel.utils.github_api import GithubApi
 
 logger: GhlabelLogger = ghlabel_logger.init(__name__)
 
+# Labels without a `Prefix: ` name go to `default_labels.<ext>`, like the templates.
+DEFAULT_CATEGORY: str = "default"
+
 
 @dataclass(frozen=True)
 class Labels:
@@ -263,16 +277,68 @@ LABELS_CLS_MAP: LABELS_CLS_MAP_Type = {
 }
 
 
+def label_category(label_name: str) -> str:
+    """NOTE: e.g. `Type: Bug` -> `type`, for `type_labels.<ext>`."""
+
+    prefix, sep, _ = label_name.partition(":")
+    category: str = re.sub(r"[^a-z0-9]+", "_", prefix.lower()).strip("_")
+    return category if sep and category else DEFAULT_CATEGORY
+
+
+def config_label(github_label: GithubLabel) -> dict[str, str]:
+    """NOTE: in the templates' style, `#` colors and no empty description."""
+
+    label: dict[str, str] = {
+        "name": github_label["name"],
+        "color": f"#{github_label['color']}",
+    }
+    if github_label.get("description"):
+        label["description"] = github_label["description"]
+    return label
+
+
 class DumpLabel:
     @staticmethod
     def _init_labels_dir(labels_dir: str = "labels") -> None:
-        logger.info(f"Initializing {os.path.join(os.getcwd(), labels_dir)} dir.")
-        Path(labels_dir).mkdir(exist_ok=True)
+        logger.info("Initializing %s dir.", os.path.join(os.getcwd(), labels_dir))
+        Path(labels_dir).mkdir(parents=True, exist_ok=True)
         for filename in os.listdir(labels_dir):
             file_path: str = os.path.join(labels_dir, filename)
             if os.path.isfile(file_path):
                 os.remove(file_path)
 
+    @staticmethod
+    def _write_labels(label_file: str, labels: list[Any], ext: str) -> None:
+        with open(label_file, "w+") as f:
+            logger.info("Dumping to %s.", f.name)
+
+            if ext == "yaml":
+                print(
+                    yaml.dump(
+                        data=labels,
+                        default_flow_style=False,
+                        sort_keys=False,
+                    ),
+                    file=f,
+                )
+            elif ext == "json":
+                json.dump(labels, f, indent=2)
+
+    @staticmethod
+    def _write_categories(
+        labels_dir: str, labels: Iterable[dict[str, str]], ext: str
+    ) -> None:
+        categories: dict[str, list[dict[str, str]]] = {}
+        for label in sorted(labels, key=lambda label: label["name"]):
+            categories.setdefault(label_category(label["name"]), []).append(label)
+
+        for category, category_labels in sorted(categories.items()):
+            DumpLabel._write_labels(
+                os.path.join(labels_dir, f"{category}_labels.{ext}"),
+                category_labels,
+                ext,
+            )
+
     @staticmethod
     def dump(
         labels_dir: str = "labels",
@@ -289,22 +355,127 @@ class DumpLabel:
             labels: tuple[dict[str, str], ...] | tuple[str, ...] = getattr(
                 label_cls, field
             )
-            label_file: str = os.path.join(labels_dir, f"{field.lower()}_labels.{ext}")
+            DumpLabel._write_labels(
+                os.path.join(labels_dir, f"{field.lower()}_labels.{ext}"),
+                list(labels),
+                ext,
+            )
+
+        logger.info("Finished dumping of labels.")
+
+    @staticmethod
+    def _fetch_repo_labels(
+        gh_api_factory: "Callable[[str, str], GithubApi]", repo: str
+    ) -> list[dict[str, str]]:
+        from ghlabel.utils.multi_repo_setup import parse_repo
+
+        with gh_api_factory(*parse_repo(repo)) as gh_api:
+            github_labels, status_code = gh_api.list_labels()
+        if status_code != STATUS_OK:
+            logger.error("Failed to dump labels of `%s`.", repo)
+            sys.exit()
+        return [config_label(github_label) for github_label in github_labels]
+
+    @staticmethod
+    def _iter_repo_labels(
+        gh_api_factory: "Callable[[str, str], GithubApi]",
+        repos: list[str],
+        workers: int,
+    ) -> Iterator[tuple[str, list[dict[str, str]]]]:
+        """NOTE: yields each repo's labels as soon as they are fetched, in no order."""
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(repos))),
+            thread_name_prefix="ghlabel-dump",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    DumpLabel._fetch_repo_labels, gh_api_factory, repo
+                ): repo
+                for repo in repos
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    @staticmethod
+    def dump_from_repos(  # noqa: PLR0913
+        gh_api_factory: "Callable[[str, str], GithubApi]",
+        repos: list[str],
+        labels_dir: str = "labels",
+        new: bool = True,
+        ext: str = "yaml",
+        workers: int = 4,
+    ) -> None:
+        """
+        Dumps the live labels of `repos`, fetched concurrently, grouped into
+        `<category>_labels.<ext>` files by their `Prefix: ` name.
+        With more than one repo, labels defined the same in every repo go to
+        `labels_dir` as the shared template, and each repo's other labels to
+        its overlay, `labels_dir/<repo_owner>/<repo_name>`, which setup layers
+        over the template.
+        NOTE: each repo's labels are spooled to a temp file as they arrive;
+        only the labels still shared by every repo so far are kept in memory.
+        """
+
+        unique_repos: list[str] = list(dict.fromkeys(repos))
+        if new:
+            DumpLabel._init_labels_dir(labels_dir)
+
+        if len(unique_repos) == 1:
+            for _, labels in DumpLabel._iter_repo_labels(
+                gh_api_factory, unique_repos, workers
+            ):
+                DumpLabel._write_categories(labels_dir, labels, ext)
+            logger.info("Finished dumping of labels.")
+            return
+
+        shared: dict[str, dict[str, str]] | None = None
+        with tempfile.TemporaryDirectory(prefix="ghlabel-dump-") as spool_dir:
+            spool_files: dict[str, str] = {}
+            for i, (repo, labels) in enumerate(
+                DumpLabel._iter_repo_labels(gh_api_factory, unique_repos, workers)
+            ):
+                spool_files[repo] = os.path.join(spool_dir, f"{i}.jsonl")
+                with open(spool_files[repo], "w") as f:
+                    for label in labels:
+                        f.write(json.dumps(label) + "\n")
 
-            with open(label_file, "w+") as f:
-                logger.info(f"Dumping to {f.name}.")
+                repo_labels: dict[str, dict[str, str]] = {
+                    label["name"]: label for label in labels
+                }
+                shared = (
+                    repo_labels
+                    if shared is None
+                    else {
+                        name: label
+                        for name, label in shared.items()
+                        if repo_labels.get(name) == label
+                    }
+                )
+                logger.info(
+                    "Fetched %s labels of `%s`, %s shared so far.",
+                    len(labels),
+                    repo,
+                    len(shared),
+                )
 
-                if ext == "yaml":
-                    print(
-                        yaml.dump(
-                            data=list(labels),
-                            default_flow_style=False,
-                            sort_keys=False,
+            DumpLabel._write_categories(labels_dir, (shared or {}).values(), ext)
+            for repo in unique_repos:
+                overlay_dir: str = repo_overlay_dir(labels_dir, repo)
+                if new:
+                    DumpLabel._init_labels_dir(overlay_dir)
+                else:
+                    Path(overlay_dir).mkdir(parents=True, exist_ok=True)
+                with open(spool_files[repo]) as f:
+                    DumpLabel._write_categories(
+                        overlay_dir,
+                        (
+                            label
+                            for label in map(json.loads, f)
+                            if label["name"] not in (shared or {})
                         ),
-                        file=f,
+                        ext,
                     )
-                elif ext == "json":
-                    json.dump(labels, f, indent=2)
 
         logger.info("Finished dumping of labels.")
 
@@ -0,0 +1,789 @@
+#!/usr/bin/env python
+
+"""
+In-memory fake of the Github REST (and label GraphQL) endpoints ghlabel
+uses, for benchmarks and local runs without touching github.com.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import argparse
+import hashlib
+import hmac
+import json
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+STATUS_OK: int = 200
+STATUS_CREATED: int = 201
+STATUS_NO_CONTENT: int = 204
+STATUS_NOT_MODIFIED: int = 304
+STATUS_FORBIDDEN: int = 403
+STATUS_NOT_FOUND: int = 404
+STATUS_UNPROCESSABLE: int = 422
+STATUS_BAD_GATEWAY: int = 502
+
+
+def label_webhook_payload(
+    full_name: str,
+    action: str,
+    label: dict[str, Any],
+    changes: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """NOTE: the body of a Github `label` webhook event (`created`, `edited` or `deleted`)."""
+    payload: dict[str, Any] = {
+        "action": action,
+        "label": label,
+        "repository": {"full_name": full_name},
+    }
+    if changes:
+        payload["changes"] = changes
+    return payload
+
+
+def send_webhook(
+    url: str, event: str, payload: dict[str, Any], secret: str = ""
+) -> int:
+    """
+    NOTE: posts `payload` like Github delivers a webhook, signed with
+    `X-Hub-Signature-256` when `secret` is set. Returns the status code.
+    """
+
+    data: bytes = json.dumps(payload).encode()
+    headers: dict[str, str] = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+    }
+    if secret:
+        digest: str = hmac.new(secret.encode(), data, hashlib.sha256).hexdigest()
+        headers["X-Hub-Signature-256"] = f"sha256={digest}"
+
+    req = urllib.request.Request(url, data=data, headers=headers, method="POST")  # noqa: S310
+    try:
+        with urllib.request.urlopen(req, timeout=10) as res:  # noqa: S310
+            return int(res.status)
+    except urllib.error.HTTPError as ex:
+        return ex.code
+
+
+@dataclass
+class FakeRepo:
+    full_name: str
+    labels: dict[str, dict[str, Any]] = field(default_factory=dict)
+    issues: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def node_id(self) -> str:
+        return f"R_{hashlib.sha1(self.full_name.encode()).hexdigest()[:12]}"  # noqa: S324
+
+    def add_label(
+        self, name: str, color: str = "ffffff", description: str = ""
+    ) -> None:
+        self.labels[name] = {
+            "id": len(self.labels) + 1,
+            "node_id": f"LA_{hashlib.sha1(name.encode()).hexdigest()[:12]}",  # noqa: S324
+            "url": f"https://api.github.com/repos/{self.full_name}/labels/{name}",
+            "name": name,
+            "color": color,
+            "description": description,
+            "default": False,
+        }
+
+    def add_issue(
+        self, label_names: Iterable[str] = (), state: str = "open", is_pr: bool = False
+    ) -> None:
+        number: int = len(self.issues) + 1
+        kind: str = "pull" if is_pr else "issues"
+        issue: dict[str, Any] = {
+            "number": number,
+            "html_url": f"https://github.com/{self.full_name}/{kind}/{number}",
+            "state": state,
+            "title": f"Issue #{number}",
+            "body": "",
+            "labels": [
+                self.labels[name] for name in label_names if name in self.labels
+            ],
+        }
+        if is_pr:
+            issue["pull_request"] = {"html_url": issue["html_url"]}
+        self.issues.append(issue)
+
+
+class FakeGithubServer:
+    """
+    Serves labels (CRUD), issues (label/state filters), issue labels (add and
+    remove), issue search counts, owner repo listings, `Link` pagination, `X-RateLimit-*` headers with a primary limit, `ETag`
+    revalidation, and injectable latency and 502 errors.
+    `POST /graphql` (or `/api/graphql`) answers the label queries and
+    mutations of `GithubGraphqlApi`.
+    Label changes made through the API are delivered as `label` webhook
+    events to every url passed to `add_webhook`, in order, off the request thread.
+    NOTE: one shared rate limit bucket; the token is not checked.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0,
+        error_rate: float = 0,
+        rate_limit: int = 5000,
+        seed: int = 0,
+    ) -> None:
+        self._latency = latency
+        self._error_rate = error_rate
+        self._rate_limit = rate_limit
+        self._random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._remaining: int = rate_limit
+        self._reset_at: int = int(time.time()) + 3600
+        self._requests: Counter[str] = Counter()
+        self._webhooks: list[tuple[str, str]] = []
+        self._deliveries: queue.SimpleQueue[dict[str, Any] | None] = queue.SimpleQueue()
+        self._delivery_thread: threading.Thread | None = None
+
+        self.repos: dict[str, FakeRepo] = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_cls())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "FakeGithubServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def requests(self) -> Counter[str]:
+        """NOTE: request counts keyed by method, plus `total`."""
+        with self._lock:
+            return Counter(self._requests)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._remaining = self._rate_limit
+
+    def add_repo(self, full_name: str) -> FakeRepo:
+        repo = FakeRepo(full_name)
+        self.repos[full_name] = repo
+        return repo
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-github", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._delivery_thread:
+            self._deliveries.put(None)
+            self._delivery_thread.join()
+
+    def add_webhook(self, url: str, secret: str = "") -> None:
+        with self._lock:
+            self._webhooks.append((url, secret))
+            if self._delivery_thread is None:
+                self._delivery_thread = threading.Thread(
+                    target=self._deliver, name="fake-github-webhooks", daemon=True
+                )
+                self._delivery_thread.start()
+
+    def _notify(
+        self,
+        repo: FakeRepo,
+        action: str,
+        label: dict[str, Any],
+        changes: dict[str, Any] | None = None,
+    ) -> None:
+        if self._webhooks:
+            self._deliveries.put(
+                label_webhook_payload(repo.full_name, action, dict(label), changes)
+            )
+
+    def _deliver(self) -> None:
+        while (payload := self._deliveries.get()) is not None:
+            for url, secret in list(self._webhooks):
+                try:
+                    send_webhook(url, "label", payload, secret)
+                except OSError:
+                    # NOTE: like Github, a failed delivery is not retried
+                    pass
+
+    def serve_forever(self) -> None:
+        """NOTE: blocks the calling thread until Ctrl+C."""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            self._httpd.server_close()
+
+    def _take_rate_limit(self, method: str) -> dict[str, str] | None:
+        """NOTE: returns the rate limit headers, or None if the limit is exhausted."""
+        with self._lock:
+            self._requests[method] += 1
+            self._requests["total"] += 1
+            if time.time() >= self._reset_at:
+                self._remaining = self._rate_limit
+                self._reset_at = int(time.time()) + 3600
+            exhausted: bool = self._remaining <= 0
+            if not exhausted:
+                self._remaining -= 1
+            headers: dict[str, str] = {
+                "X-RateLimit-Limit": str(self._rate_limit),
+                "X-RateLimit-Remaining": str(self._remaining),
+                "X-RateLimit-Used": str(self._rate_limit - self._remaining),
+                "X-RateLimit-Reset": str(self._reset_at),
+                "X-RateLimit-Resource": "core",
+            }
+        return None if exhausted else headers
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self._error_rate
+
+    def _handler_cls(self) -> type[BaseHTTPRequestHandler]:
+        fake: FakeGithubServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+            def _send(
+                self,
+                status_code: int,
+                body: Any = None,
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                data: bytes = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, val in (headers or {}).items():
+                    self.send_header(key, val)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _route(self) -> None:
+                length: int = int(self.headers.get("Content-Length") or 0)
+                payload: Any = json.loads(self.rfile.read(length)) if length else None
+
+                if fake._latency:
+                    time.sleep(fake._latency)
+
+                headers: dict[str, str] | None = fake._take_rate_limit(self.command)
+                if headers is None:
+                    self._send(
+                        STATUS_FORBIDDEN,
+                        {"message": "API rate limit exceeded"},
+                        {
+                            "X-RateLimit-Remaining": "0",
+                            "X-RateLimit-Reset": str(fake._reset_at),
+                        },
+                    )
+                    return
+                if fake._should_fail():
+                    self._send(STATUS_BAD_GATEWAY, {"message": "Server Error"}, headers)
+                    return
+
+                status_code, body, extra_headers = fake.handle(
+                    self.command, self.path, payload
+                )
+                headers.update(extra_headers)
+
+                if self.command == "GET" and status_code == STATUS_OK:
+                    etag: str = (
+                        f'W/"{hashlib.sha256(json.dumps(body).encode()).hexdigest()}"'
+                    )
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        self._send(STATUS_NOT_MODIFIED, None, headers)
+                        return
+                self._send(status_code, body, headers)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _route
+
+        return Handler
+
+    def _page(
+        self, path: str, query: dict[str, list[str]], items: list[Any]
+    ) -> tuple[list[Any], dict[str, str]]:
+        page: int = int(query.get("page", ["1"])[0])
+        per_page: int = min(int(query.get("per_page", ["30"])[0]), 100)
+        last_page: int = max(1, -(-len(items) // per_page))
+
+        def page_url(page: int) -> str:
+            params: dict[str, str] = {key: val[0] for key, val in query.items()}
+            return f"{self.url}{path}?{urlencode({**params, 'page': page, 'per_page': per_page})}"
+
+        links: list[str] = []
+        if page < last_page:
+            links.append(f'<{page_url(page + 1)}>; rel="next"')
+            links.append(f'<{page_url(last_page)}>; rel="last"')
+        if page > 1:
+            links.append(f'<{page_url(1)}>; rel="first"')
+            links.append(f'<{page_url(page - 1)}>; rel="prev"')
+        headers: dict[str, str] = {"Link": ", ".join(links)} if links else {}
+        return items[(page - 1) * per_page : page * per_page], headers
+
+    def handle(  # noqa: PLR0911, PLR0912
+        self, method: str, raw_path: str, payload: Any
+    ) -> tuple[int, Any, dict[str, str]]:
+        url = urlsplit(raw_path)
+        query: dict[str, list[str]] = parse_qs(url.query)
+        parts: list[str] = [unquote(part) for part in url.path.strip("/").split("/")]
+        not_found: tuple[int, Any, dict[str, str]] = (
+            STATUS_NOT_FOUND,
+            {"message": "Not Found"},
+            {},
+        )
+
+        if len(parts) == 3 and parts[0] in ("orgs", "users") and parts[2] == "repos":  # noqa: PLR2004
+            repos: list[dict[str, Any]] = [
+                {"full_name": full_name, "archived": False}
+                for full_name in self.repos
+                if full_name.split("/")[0] == parts[1]
+            ]
+            page, headers = self._page(url.path, query, repos)
+            return STATUS_OK, page, headers
+
+        if parts == ["search", "issues"] and method == "GET":
+            return self._search_issues(url.path, query)
+
+        if parts[-1] == "graphql" and method == "POST":
+            return self._graphql(payload)
+
+        if len(parts) < 4 or parts[0] != "repos":  # noqa: PLR2004
+            return not_found
+        repo: FakeRepo | None = self.repos.get(f"{parts[1]}/{parts[2]}")
+        if repo is None:
+            return not_found
+        resource, rest = parts[3], parts[4:]
+
+        if resource == "labels" and not rest:
+            if method == "GET":
+                page, headers = self._page(url.path, query, list(repo.labels.values()))
+                return STATUS_OK, page, headers
+            if method == "POST":
+                if payload["name"] in repo.labels:
+                    return (
+                        STATUS_UNPROCESSABLE,
+                        {
+                            "message": "Validation Failed",
+                            "errors": [
+                                {
+                                    "resource": "Label",
+                                    "code": "already_exists",
+                                    "field": "name",
+                                }
+                            ],
+                        },
+                        {},
+                    )
+                repo.add_label(
+                    payload["name"],
+                    payload.get("color", "ffffff"),
+                    payload.get("description", ""),
+                )
+                self._notify(repo, "created", repo.labels[payload["name"]])
+                return STATUS_CREATED, repo.labels[payload["name"]], {}
+
+        if resource == "labels" and len(rest) == 1:
+            label: dict[str, Any] | None = repo.labels.get(rest[0])
+            if label is None:
+                return not_found
+            if method == "GET":
+                return STATUS_OK, label, {}
+            if method == "PATCH":
+                new_name: str = payload.get("new_name", label["name"])
+                if new_name != label["name"] and new_name in repo.labels:
+                    return STATUS_UNPROCESSABLE, {"message": "Validation Failed"}, {}
+                del repo.labels[label["name"]]
+                changes: dict[str, Any] = {
+                    key: {"from": label[key]}
+                    for key, val in (
+                        ("name", new_name),
+                        ("color", payload.get("color", label["color"])),
+                        (
+                            "description",
+                            payload.get("description", label["description"]),
+                        ),
+                    )
+                    if val != label[key]
+                }
+                label.update(
+                    {
+                        "name": new_name,
+                        "color": payload.get("color", label["color"]),
+                        "description": payload.get("description", label["description"]),
+                    }
+                )
+                repo.labels[new_name] = label
+                self._notify(repo, "edited", label, changes)
+                return STATUS_OK, label, {}
+            if method == "DELETE":
+                del repo.labels[label["name"]]
+                for issue in repo.issues:
+                    issue["labels"] = [
+                        issue_label
+                        for issue_label in issue["labels"]
+                        if issue_label is not label
+                    ]
+                self._notify(repo, "deleted", label)
+                return STATUS_NO_CONTENT, None, {}
+
+        if resource == "issues" and len(rest) >= 2 and rest[1] == "labels":  # noqa: PLR2004
+            return self._issue_labels(repo, method, rest, payload)
+
+        if resource == "issues" and not rest and method == "GET":
+            state: str = query.get("state", ["open"])[0]
+            label_names: list[str] = (
+                query["labels"][0].split(",") if "labels" in query else []
+            )
+            issues: list[dict[str, Any]] = [
+                issue
+                for issue in repo.issues
+                if state in ("all", issue["state"])
+                and all(
+                    any(issue_label["name"] == name for issue_label in issue["labels"])
+                    for name in label_names
+                )
+            ]
+            page, headers = self._page(url.path, query, issues)
+            return STATUS_OK, page, headers
+
+        return not_found
+
+    def _issue_labels(
+        self, repo: FakeRepo, method: str, rest: list[str], payload: Any
+    ) -> tuple[int, Any, dict[str, str]]:
+        """NOTE: `rest` is `[<number>, "labels"]`, plus the label name to remove."""
+
+        issue: dict[str, Any] | None = next(
+            (issue for issue in repo.issues if str(issue["number"]) == rest[0]), None
+        )
+        if issue is None:
+            return STATUS_NOT_FOUND, {"message": "Not Found"}, {}
+
+        if method == "POST" and len(rest) == 2:  # noqa: PLR2004
+            for name in payload["labels"]:
+                # like Github, unknown labels are created
+                if name not in repo.labels:
+                    repo.add_label(name)
+                if all(issue_label["name"] != name for issue_label in issue["labels"]):
+                    issue["labels"] = [*issue["labels"], repo.labels[name]]
+            return STATUS_OK, issue["labels"], {}
+
+        if method == "DELETE" and len(rest) == 3:  # noqa: PLR2004
+            labels: list[dict[str, Any]] = [
+                issue_label
+                for issue_label in issue["labels"]
+                if issue_label["name"] != rest[2]
+            ]
+            if len(labels) == len(issue["labels"]):
+                return STATUS_NOT_FOUND, {"message": "Label does not exist"}, {}
+            issue["labels"] = labels
+            return STATUS_OK, labels, {}
+
+        return STATUS_NOT_FOUND, {"message": "Not Found"}, {}
+
+    def _find_label(
+        self, node_id: str
+    ) -> tuple[FakeRepo, dict[str, Any]] | tuple[None, None]:
+        for repo in self.repos.values():
+            for label in repo.labels.values():
+                if label["node_id"] == node_id:
+                    return repo, label
+        return None, None
+
+    def _graphql_label(
+        self, repo: FakeRepo, label: dict[str, Any], limit: int
+    ) -> dict[str, Any]:
+        issues: list[dict[str, Any]] = [
+            issue
+            for issue in repo.issues
+            if any(issue_label is label for issue_label in issue["labels"])
+        ]
+        usage: dict[str, list[dict[str, Any]]] = {
+            "issues": [issue for issue in issues if "pull_request" not in issue],
+            "pullRequests": [issue for issue in issues if "pull_request" in issue],
+        }
+        return {
+            "id": label["node_id"],
+            "name": label["name"],
+            "color": label["color"],
+            "description": label["description"],
+            **{
+                key: {
+                    "totalCount": len(items),
+                    "nodes": [{"url": item["html_url"]} for item in items[:limit]],
+                }
+                for key, items in usage.items()
+            },
+        }
+
+    def _graphql(self, payload: Any) -> tuple[int, Any, dict[str, str]]:
+        """
+        NOTE: not a GraphQL parser; it answers the shapes `GithubGraphqlApi`
+        sends: the label listing, aliased `label(name:)` lookups and aliased
+        createLabel/updateLabel/deleteLabel mutations. Per-alias failures come
+        back in `errors` with the alias in `path`, like Github's.
+        """
+
+        query: str = payload.get("query", "")
+        variables: dict[str, Any] = payload.get("variables") or {}
+        headers: dict[str, str] = {"X-RateLimit-Resource": "graphql"}
+        data: dict[str, Any] = {}
+        errors: list[dict[str, Any]] = []
+
+        mutations: list[tuple[str, str, str]] = re.findall(
+            r"(\w+): (createLabel|updateLabel|deleteLabel)\(input: \$(\w+)\)", query
+        )
+        for alias, mutation, var in mutations:
+            result, error = self._graphql_mutation(mutation, variables[var])
+            data[alias] = result
+            if error:
+                errors.append({**error, "path": [alias]})
+        if mutations:
+            body: dict[str, Any] = {"data": data}
+            if errors:
+                body["errors"] = errors
+            return STATUS_OK, body, headers
+
+        full_name: str = f"{variables.get('owner')}/{variables.get('name')}"
+        repo: FakeRepo | None = self.repos.get(full_name)
+        if repo is None:
+            return (
+                STATUS_OK,
+                {
+                    "data": {"repository": None},
+                    "errors": [
+                        {
+                            "type": "NOT_FOUND",
+                            "path": ["repository"],
+                            "message": f"Could not resolve to a Repository with the name '{full_name}'.",
+                        }
+                    ],
+                },
+                headers,
+            )
+
+        repository: dict[str, Any] = {"id": repo.node_id}
+        limit_match: re.Match[str] | None = re.search(r"issues\(first: (\d+)\)", query)
+        limit: int = int(limit_match[1]) if limit_match else 0
+
+        if "labels(first:" in query:
+            labels: list[dict[str, Any]] = list(repo.labels.values())
+            start: int = int(variables.get("after") or 0)
+            end: int = start + 100
+            repository["labels"] = {
+                "nodes": [
+                    self._graphql_label(repo, label, 0) for label in labels[start:end]
+                ],
+                "pageInfo": {
+                    "hasNextPage": end < len(labels),
+                    "endCursor": str(end),
+                },
+            }
+        for alias, var in re.findall(r"(\w+): label\(name: \$(\w+)\)", query):
+            label: dict[str, Any] | None = repo.labels.get(variables[var])
+            repository[alias] = (
+                self._graphql_label(repo, label, limit) if label else None
+            )
+        return STATUS_OK, {"data": {"repository": repository}}, headers
+
+    def _graphql_mutation(  # noqa: PLR0911
+        self, mutation: str, mutation_input: dict[str, Any]
+    ) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+        """NOTE: returns the alias payload, or None and the error."""
+
+        if mutation == "createLabel":
+            repo: FakeRepo | None = next(
+                (
+                    repo
+                    for repo in self.repos.values()
+                    if repo.node_id == mutation_input.get("repositoryId")
+                ),
+                None,
+            )
+            if repo is None:
+                return None, {
+                    "type": "NOT_FOUND",
+                    "message": "Could not resolve to a node with the global id.",
+                }
+            if mutation_input["name"] in repo.labels:
+                return None, {
+                    "type": "UNPROCESSABLE",
+                    "message": "Name has already been taken",
+                }
+            repo.add_label(
+                mutation_input["name"],
+                mutation_input.get("color", "ffffff"),
+                mutation_input.get("description") or "",
+            )
+            label: dict[str, Any] = repo.labels[mutation_input["name"]]
+            self._notify(repo, "created", label)
+            return {"label": {"id": label["node_id"], "name": label["name"]}}, None
+
+        found_repo, found_label = self._find_label(mutation_input.get("id", ""))
+        if found_repo is None or found_label is None:
+            return None, {
+                "type": "NOT_FOUND",
+                "message": f"Could not resolve to a node with the global id of '{mutation_input.get('id', '')}'.",
+            }
+
+        if mutation == "deleteLabel":
+            del found_repo.labels[found_label["name"]]
+            for issue in found_repo.issues:
+                issue["labels"] = [
+                    issue_label
+                    for issue_label in issue["labels"]
+                    if issue_label is not found_label
+                ]
+            self._notify(found_repo, "deleted", found_label)
+            return {"clientMutationId": None}, None
+
+        new_name: str = mutation_input.get("name") or found_label["name"]
+        if new_name != found_label["name"] and new_name in found_repo.labels:
+            return None, {
+                "type": "UNPROCESSABLE",
+                "message": "Name has already been taken",
+            }
+        changes: dict[str, Any] = {
+            key: {"from": found_label[key]}
+            for key in ("name", "color", "description")
+            if key in mutation_input and (mutation_input[key] or "") != found_label[key]
+        }
+        del found_repo.labels[found_label["name"]]
+        found_label.update(
+            {
+                "name": new_name,
+                "color": mutation_input.get("color") or found_label["color"],
+                "description": mutation_input.get(
+                    "description", found_label["description"]
+                )
+                or "",
+            }
+        )
+        found_repo.labels[new_name] = found_label
+        self._notify(found_repo, "edited", found_label, changes)
+        return {
+            "label": {"id": found_label["node_id"], "name": found_label["name"]}
+        }, None
+
+    def _search_issues(
+        self, path: str, query: dict[str, list[str]]
+    ) -> tuple[int, Any, dict[str, str]]:
+        """NOTE: only the `repo:` and `label:` qualifiers are understood."""
+
+        q: str = query.get("q", [""])[0]
+        repo_match: re.Match[str] | None = re.search(r"repo:(\S+)", q)
+        repo: FakeRepo | None = self.repos.get(repo_match[1]) if repo_match else None
+        if repo is None:
+            return STATUS_UNPROCESSABLE, {"message": "Validation Failed"}, {}
+
+        label_names: list[str] = [
+            quoted or bare
+            for quoted, bare in re.findall(r'label:(?:"([^"]*)"|(\S+))', q)
+        ]
+        issues: list[dict[str, Any]] = [
+            issue
+            for issue in repo.issues
+            if all(
+                any(issue_label["name"] == name for issue_label in issue["labels"])
+                for name in label_names
+            )
+        ]
+        page, headers = self._page(path, query, issues)
+        return (
+            STATUS_OK,
+            {"total_count": len(issues), "incomplete_results": False, "items": page},
+            headers,
+        )
+
+
+def seed_repo(  # noqa: PLR0913
+    server: FakeGithubServer,
+    full_name: str,
+    labels: int = 50,
+    issues: int = 0,
+    labels_per_issue: int = 2,
+    seed: int = 0,
+) -> FakeRepo:
+    """NOTE: labels are named `Label: <i>`; issues carry random ones of them."""
+    rng = random.Random(seed)  # noqa: S311
+    repo: FakeRepo = server.add_repo(full_name)
+    for i in range(labels):
+        repo.add_label(f"Label: {i}", "ffffff", f"Label {i}")
+    label_names: list[str] = list(repo.labels)
+    for i in range(issues):
+        repo.add_issue(
+            rng.sample(label_names, min(labels_per_issue, len(label_names))),
+            state="open" if i % 2 else "closed",
+            is_pr=i % 5 == 0,
+        )
+    return repo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--repo", default="octo/fake")
+    parser.add_argument("--labels", type=int, default=50)
+    parser.add_argument("--issues", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    parser.add_argument(
+        "--webhook",
+        action="append",
+        default=[],
+        help="Deliver label webhook events to this url, e.g. `ghlabel watch`'s.",
+    )
+    parser.add_argument("--webhook-secret", default="")
+    args = parser.parse_args()
+
+    fake_server = FakeGithubServer(
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    seed_repo(fake_server, args.repo, labels=args.labels, issues=args.issues)
+    for webhook_url in args.webhook:
+        fake_server.add_webhook(webhook_url, args.webhook_secret)
+    print(f"Serving fake Github API for `{args.repo}` on {fake_server.url}")
+    fake_server.serve_forever()
@@ -1,35 +1,173 @@
+import logging
 import sys
+import time
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import partial
+from types import TracebackType
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as HTTPConnectionError
 from requests.exceptions import HTTPError, Timeout
 from requests.models import Response
 
 from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.api_metrics import ApiMetrics, endpoint_template
 from ghlabel.utils.github_api_types import (
     GithubIssue,
     GithubIssueParams,
+    GithubIssueSummary,
     GithubLabel,
     GithubPullRequest,
     StatusCode,
 )
-from ghlabel.utils.helpers import STATUS_OK, validate_env
+from ghlabel.utils.helpers import STATUS_FAILED, STATUS_OK, validate_env
+from ghlabel.utils.http_cache import STATUS_NOT_MODIFIED, CachedResponse, HttpCache
+from ghlabel.utils.rate_limit import RateLimitScheduler
+from ghlabel.utils.retry_policy import RetryPolicy, is_already_applied
 
 logger: GhlabelLogger = ghlabel_logger.init(__name__)
 
+STATUS_CREATED: int = 201
+STATUS_NO_CONTENT: int = 204
+
+
+def parse_last_page(links: Mapping[Any, Mapping[str, str]]) -> int:
+    """
+    NOTE: pass in the parsed `Link` header (`response.links`).
+    A response without `rel="last"` is the only page.
+    """
+
+    last_url: str | None = links.get("last", {}).get("url")
+    if not last_url:
+        return 1
+
+    pages: list[str] = parse_qs(urlsplit(last_url).query).get("page", ["1"])
+    return int(pages[0])
+
+
+def summarize_issue(issue: GithubIssue) -> GithubIssueSummary:
+    summary: GithubIssueSummary = {
+        "number": issue["number"],
+        "html_url": issue["html_url"],
+        "label_names": [label["name"] for label in issue["labels"]],
+    }
+    if "pull_request" in issue:
+        summary["pull_request_url"] = issue["pull_request"]["html_url"]
+    return summary
+
+
+def issue_url(issue: GithubIssue) -> str:
+    if "pull_request" in issue:
+        return issue["pull_request"]["html_url"]
+    return issue["html_url"]
+
+
+def log_request(  # noqa: PLR0913
+    api_url: str,
+    repo: str,
+    method: str,
+    url: str,
+    attempt: int,
+    status_code: int,
+    seconds: float,
+) -> None:
+    """NOTE: one debug record per attempt, its fields kept apart for `--log-format json`."""
+    logger.debug(
+        "%s %s -> %s in %.0fms.",
+        method,
+        url,
+        status_code,
+        seconds * 1000,
+        extra={
+            "repo": repo,
+            "method": method,
+            "endpoint": endpoint_template(api_url, url),
+            "status": status_code,
+            "latency_ms": round(seconds * 1000, 1),
+            "attempt": attempt,
+        },
+    )
+
+
+class IssueListingError(Exception):
+    """NOTE: raised by `GithubApi.iter_issues` once retries are exhausted; the reason is already logged."""
+
+    def __init__(self, status_code: StatusCode) -> None:
+        super().__init__(f"Failed to list github issues ({status_code}).")
+        self._status_code = status_code
+
+    @property
+    def status_code(self) -> StatusCode:
+        return self._status_code
+
 
 class GithubApi:
     VERSION: str = "2022-11-28"
+    API_URL: str = "https://api.github.com"
+    PER_PAGE: int = 100
+    LABEL_USAGE_SAMPLE: int = 3
+    MUTATION_BATCH_SIZE: int = 1
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token: str,
+        repo_owner: str,
+        repo_name: str,
+        connect_timeout: float = 10,
+        read_timeout: float = 10,
+        pool_maxsize: int = 10,
+        rate_limiter: RateLimitScheduler | None = None,
+        http_cache: HttpCache | None = None,
+        api_url: str | None = None,
+        metrics: ApiMetrics | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """
+        NOTE: `api_url` points the client at another REST API root, e.g. a
+        GitHub Enterprise Server or a local `FakeGithubServer`.
+        Pass `metrics` to record every request, tagged with the current `phase`.
+        `retry_policy` defaults to retrying timeouts, connection errors and 5xx.
+        """
 
-    def __init__(self, token: str, repo_owner: str, repo_name: str) -> None:
         self._token = token
         self._repo_owner = repo_owner
         self._repo_name = repo_name
-        self._base_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}"
+        self._api_url: str = (api_url or GithubApi.API_URL).rstrip("/")
+        self._base_url = f"{self._api_url}/repos/{repo_owner}/{repo_name}"
         self._headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": GithubApi.VERSION,
         }
+        self._timeout: tuple[float, float] = (connect_timeout, read_timeout)
+        self._pool_maxsize = pool_maxsize
+        self._rate_limiter: RateLimitScheduler = rate_limiter or RateLimitScheduler()
+        self._http_cache = http_cache
+        self._metrics = metrics
+        self._retry_policy: RetryPolicy = replace(
+            retry_policy or RetryPolicy(),
+            retry_exceptions=(retry_policy and retry_policy.retry_exceptions)
+            or (Timeout, HTTPConnectionError),
+        )
+        self._phase: str = ""
+        self._session: requests.Session = self._init_session(pool_maxsize)
+
+    def __enter__(self) -> "GithubApi":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
 
     @property
     def token(self) -> str:
@@ -43,6 +181,10 @@ class GithubApi:
     def repo_name(self) -> str:
         return self._repo_name
 
+    @property
+    def api_url(self) -> str:
+        return self._api_url
+
     @property
     def base_url(self) -> str:
         return self._base_url
@@ -51,123 +193,491 @@ class GithubApi:
     def headers(self) -> dict[str, str]:
         return self._headers
 
-    def list_labels(self) -> tuple[list[GithubLabel], StatusCode]:
-        url: str = f"{self.base_url}/labels"
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return self._timeout
 
-        page: int = 1
-        per_page: int = 100
-        res: Response
+    @property
+    def session(self) -> requests.Session:
+        return self._session
 
-        logger.info(
-            f"Fetching list of github labels from `{self.repo_owner}/{self.repo_name}`."
+    @property
+    def rate_limiter(self) -> RateLimitScheduler:
+        return self._rate_limiter
+
+    @property
+    def http_cache(self) -> HttpCache | None:
+        return self._http_cache
+
+    @property
+    def metrics(self) -> ApiMetrics | None:
+        return self._metrics
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return self._retry_policy
+
+    @property
+    def current_phase(self) -> str:
+        return self._phase
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """NOTE: tags the requests sent inside the block (from any thread) with `name`."""
+        previous: str = self._phase
+        self._phase = name
+        try:
+            yield
+        finally:
+            self._phase = previous
+
+    def _init_session(self, pool_maxsize: int) -> requests.Session:
+        """
+        One keep-alive session is shared by every request, so the TCP+TLS
+        handshake to `api.github.com` is paid once per pooled connection.
+        The session is configured once here and never mutated afterwards,
+        which keeps it safe to share between worker threads.
+        """
+
+        session: requests.Session = requests.Session()
+        session.headers.update(self.headers)
+
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
         )
-        github_labels: list[GithubLabel] = []
-        while True:
-            params: dict[str, int] = {"page": page, "per_page": per_page}
-            logger.info(f"Fetching page {page}.")
-            try:
-                res = requests.get(
-                    url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=10,
-                )
-                res.raise_for_status()
-            except Timeout:
-                logger.error(
-                    "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        attempt: int = 1,
+        write: bool | None = None,
+        cache: bool = True,
+        **kwargs: Any,
+    ) -> Response:
+        """NOTE: one attempt, through the http cache and the rate limiter."""
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        cache_key: str = ""
+        cached: CachedResponse | None = None
+        if self.http_cache and cache and method == "GET":
+            cache_key = self.http_cache.key(url, kwargs.get("params"), self.token)
+            cached = self.http_cache.load(cache_key)
+            if cached:
+                kwargs["headers"] = {
+                    **kwargs.get("headers", {}),
+                    **cached.conditional_headers(),
+                }
+
+        send: Callable[[], Response] = partial(
+            self.session.request, method, url, **kwargs
+        )
+        if self.metrics:
+            send = self.metrics.instrument(
+                send,
+                f"{self.repo_owner}/{self.repo_name}",
+                self.current_phase,
+                method,
+                endpoint_template(self.api_url, url),
+                first_attempt=attempt,
+            )
+        if not logger.is_enabled_for(logging.DEBUG):
+            res: Response = self.rate_limiter.send(method, url, send, write=write)
+        else:
+            start: float = time.perf_counter()
+            res = self.rate_limiter.send(method, url, send, write=write)
+            log_request(
+                self.api_url,
+                f"{self.repo_owner}/{self.repo_name}",
+                method,
+                url,
+                attempt,
+                res.status_code,
+                time.perf_counter() - start,
+            )
+
+        if cached and res.status_code == STATUS_NOT_MODIFIED:
+            logger.info("Serving `%s` from cache (not modified).", url)
+            return cached.replay(res)
+        if self.http_cache and cache_key and res.status_code == STATUS_OK:
+            self.http_cache.store(cache_key, res)
+        return res
+
+    def _request_attempts(
+        self,
+        method: str,
+        url: str,
+        write: bool | None = None,
+        cache: bool = True,
+        deadline: float | None = None,
+        **kwargs: Any,
+    ) -> tuple[Response, int]:
+        """
+        Sends the request under `retry_policy`, returning the last response and
+        how many attempts it took.
+        NOTE: `deadline` is how many seconds every attempt, backoff included,
+        must finish in; each attempt's timeout is capped by the time left.
+        """
+
+        deadline_at: float | None = (
+            time.monotonic() + deadline if deadline is not None else None
+        )
+
+        def send(attempt: int) -> Response:
+            attempt_kwargs: dict[str, Any] = dict(kwargs)
+            if deadline_at is not None:
+                time_left: float = max(deadline_at - time.monotonic(), 0.001)
+                connect_timeout, read_timeout = attempt_kwargs.get(
+                    "timeout", self.timeout
                 )
-                break
-            except HTTPError:
-                logger.error(
-                    f"Failed to fetch list of github labels. Check if token has permission to access `{self.repo_owner}/{self.repo_name}`."
+                attempt_kwargs["timeout"] = (
+                    min(connect_timeout, time_left),
+                    min(read_timeout, time_left),
                 )
-                break
+            return self._send(
+                method, url, attempt, write=write, cache=cache, **attempt_kwargs
+            )
+
+        return self.retry_policy.call(
+            send, deadline_at=deadline_at, description=f"{method} `{url}`"
+        )
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        write: bool | None = None,
+        cache: bool = True,
+        deadline: float | None = None,
+        **kwargs: Any,
+    ) -> Response:
+        res, _ = self._request_attempts(
+            method, url, write=write, cache=cache, deadline=deadline, **kwargs
+        )
+        return res
+
+    def close(self) -> None:
+        self.session.close()
+        if self.http_cache:
+            self.http_cache.evict()
+
+    def _fetch_page(self, url: str, params: dict[str, Any], page: int) -> Response:
+        logger.info("Fetching page %s.", page)
+        res: Response = self._request(
+            "GET",
+            url,
+            params={**params, "page": page, "per_page": GithubApi.PER_PAGE},
+        )
+        res.raise_for_status()
+        return res
+
+    def _paginate(
+        self, url: str, params: dict[str, Any]
+    ) -> tuple[list[Any], StatusCode]:
+        """
+        Page 1 is fetched first; its `Link: rel="last"` header tells how many
+        pages remain, and those are fetched concurrently (results kept in order).
+        NOTE: raises `Timeout`/`HTTPError` like a single request would.
+        """
 
-            if not res.json():
-                break
+        res: Response = self._fetch_page(url, params, 1)
+        items: list[Any] = list(res.json())
+        last_page: int = parse_last_page(res.links)
 
-            github_labels.extend(res.json())
-            page += 1
+        if last_page > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self._pool_maxsize, last_page - 1),
+                thread_name_prefix="ghlabel-page",
+            ) as executor:
+                for page_res in executor.map(
+                    partial(self._fetch_page, url, params), range(2, last_page + 1)
+                ):
+                    items.extend(page_res.json())
 
-        return github_labels, res.status_code
+        return items, res.status_code
 
-    def create_label(self, label: GithubLabel) -> tuple[GithubLabel, StatusCode]:
+    def list_labels(self) -> tuple[list[GithubLabel], StatusCode]:
+        url: str = f"{self.base_url}/labels"
+
+        logger.info(
+            "Fetching list of github labels from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        try:
+            return self._paginate(url, {})
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return [], STATUS_FAILED
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch list of github labels. Check if token has permission to access `%s/%s`.",
+                self.repo_owner,
+                self.repo_name,
+            )
+            return [], ex.response.status_code
+
+    def list_labels_if_modified(
+        self, etag: str = ""
+    ) -> tuple[list[GithubLabel] | None, str, StatusCode]:
+        """
+        NOTE: one conditional request for the first page of labels, returning
+        the labels, the new ETag and the status code. Labels are None when not
+        modified (304) or when they don't fit in one page.
+        """
+
+        url: str = f"{self.base_url}/labels"
+
+        try:
+            res: Response = self._request(
+                "GET",
+                url,
+                cache=False,
+                headers={"If-None-Match": etag} if etag else {},
+                params={"page": 1, "per_page": GithubApi.PER_PAGE},
+            )
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return None, "", STATUS_FAILED
+
+        if res.status_code == STATUS_NOT_MODIFIED:
+            return None, etag, STATUS_NOT_MODIFIED
+        if res.status_code != STATUS_OK:
+            return None, "", res.status_code
+
+        new_etag: str = res.headers.get("ETag", "")
+        if parse_last_page(res.links) > 1:
+            return None, new_etag, STATUS_OK
+        return res.json(), new_etag, STATUS_OK
+
+    def create_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
         url: str = f"{self.base_url}/labels"
         res: Response
 
         try:
-            res = requests.post(
+            res, attempts = self._request_attempts(
+                "POST",
                 url,
-                headers=self.headers,
+                deadline=deadline,
                 json=label,
-                timeout=10,
             )
+            if attempts > 1 and is_already_applied("POST", res):
+                logger.info(
+                    "Label `%s` was already added by an earlier attempt.", label["name"]
+                )
+                return label, STATUS_CREATED
             res.raise_for_status()
-        except Timeout:
+        except (Timeout, HTTPConnectionError):
             logger.error(
-                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not added. Try checking the connection.",
+                label["name"],
             )
-            sys.exit()
-        except HTTPError:
+            return label, STATUS_FAILED
+        except HTTPError as ex:
             logger.error(
-                f"Failed to add label `{label['name']}`. Check the label format."
+                "Failed to add label `%s`. Check the label format.", label["name"]
             )
-        else:
-            logger.info(f"Label `{label['name']}` added successfully.")
+            # NOTE: the error body isn't always JSON, e.g. a 502 HTML page
+            return label, ex.response.status_code
 
+        logger.info("Label `%s` added successfully.", label["name"])
         return res.json(), res.status_code
 
-    def update_label(self, label: GithubLabel) -> tuple[GithubLabel, StatusCode]:
+    def update_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
         url: str = f"{self.base_url}/labels/{label['name']}"
-        label["new_name"] = label.pop("name")  # type: ignore[misc]
+        # NOTE: a rename already carries its `new_name`
+        label.setdefault("new_name", label.pop("name"))  # type: ignore[misc]
         res: Response
 
         try:
-            res = requests.patch(
+            res = self._request(
+                "PATCH",
                 url,
-                headers=self.headers,
+                deadline=deadline,
                 json=label,
-                timeout=10,
             )
             res.raise_for_status()
-        except Timeout:
+        except (Timeout, HTTPConnectionError):
             logger.error(
-                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not updated. Try checking the connection.",
+                label["new_name"],
             )
-            sys.exit()
-        except HTTPError:
+            return label, STATUS_FAILED
+        except HTTPError as ex:
             logger.error(
-                f"Failed to update label `{label['new_name']}`. Check the label format."
+                "Failed to update label `%s`. Check the label format.",
+                label["new_name"],
             )
-        else:
-            logger.info(f"Label `{label['new_name']}` updated successfully.")
+            return label, ex.response.status_code
 
+        logger.info("Label `%s` updated successfully.", label["new_name"])
         return res.json(), res.status_code
 
-    def delete_label(self, label_name: str) -> tuple[None, StatusCode]:
+    def delete_label(
+        self, label_name: str, deadline: float | None = None
+    ) -> tuple[None, StatusCode]:
         url: str = f"{self.base_url}/labels/{label_name}"
         res: Response
 
         try:
-            res = requests.delete(
+            res, attempts = self._request_attempts(
+                "DELETE",
                 url,
-                headers=self.headers,
-                timeout=10,
+                deadline=deadline,
             )
+            if attempts > 1 and is_already_applied("DELETE", res):
+                logger.info(
+                    "Label `%s` was already deleted by an earlier attempt.", label_name
+                )
+                return None, STATUS_NO_CONTENT
             res.raise_for_status()
-        except Timeout:
+        except (Timeout, HTTPConnectionError):
             logger.error(
-                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not deleted. Try checking the connection.",
+                label_name,
             )
-            sys.exit()
+            return None, STATUS_FAILED
         except HTTPError:
-            logger.error(f"Failed to delete label `{label_name}`.")
+            logger.error("Failed to delete label `%s`.", label_name)
         else:
-            logger.info(f"Label `{label_name}` deleted successfully.")
+            logger.info("Label `%s` deleted successfully.", label_name)
 
         return None, res.status_code
 
+    def create_labels(
+        self, labels: list[GithubLabel], deadline: float | None = None
+    ) -> list[tuple[GithubLabel, StatusCode]]:
+        return [self.create_label(label, deadline=deadline) for label in labels]
+
+    def update_labels(
+        self, labels: list[GithubLabel], deadline: float | None = None
+    ) -> list[tuple[GithubLabel, StatusCode]]:
+        return [self.update_label(label, deadline=deadline) for label in labels]
+
+    def delete_labels(
+        self, label_names: list[str], deadline: float | None = None
+    ) -> list[tuple[None, StatusCode]]:
+        return [
+            self.delete_label(label_name, deadline=deadline)
+            for label_name in label_names
+        ]
+
+    def add_issue_labels(
+        self, issue_number: int, label_names: list[str], deadline: float | None = None
+    ) -> tuple[list[GithubLabel] | None, StatusCode]:
+        """NOTE: labels already on the issue are kept, so it is safe to repeat."""
+
+        url: str = f"{self.base_url}/issues/{issue_number}/labels"
+        res: Response
+
+        try:
+            res = self._request(
+                "POST",
+                url,
+                deadline=deadline,
+                json={"labels": label_names},
+            )
+            res.raise_for_status()
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Labels not added to issue #%s. Try checking the connection.",
+                issue_number,
+            )
+            return None, STATUS_FAILED
+        except HTTPError:
+            logger.error("Failed to add labels to issue #%s.", issue_number)
+            return None, res.status_code
+
+        logger.info(
+            "Labels `%s` added to issue #%s successfully.",
+            ", ".join(label_names),
+            issue_number,
+        )
+        return res.json(), res.status_code
+
+    def remove_issue_label(
+        self, issue_number: int, label_name: str, deadline: float | None = None
+    ) -> tuple[None, StatusCode]:
+        url: str = f"{self.base_url}/issues/{issue_number}/labels/{label_name}"
+        res: Response
+
+        try:
+            res, attempts = self._request_attempts(
+                "DELETE",
+                url,
+                deadline=deadline,
+            )
+            if attempts > 1 and is_already_applied("DELETE", res):
+                logger.info(
+                    "Label `%s` was already removed from issue #%s by an earlier attempt.",
+                    label_name,
+                    issue_number,
+                )
+                return None, STATUS_OK
+            res.raise_for_status()
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Label `%s` not removed from issue #%s. Try checking the connection.",
+                label_name,
+                issue_number,
+            )
+            return None, STATUS_FAILED
+        except HTTPError:
+            logger.error(
+                "Failed to remove label `%s` from issue #%s.", label_name, issue_number
+            )
+        else:
+            logger.info(
+                "Label `%s` removed from issue #%s successfully.",
+                label_name,
+                issue_number,
+            )
+
+        return None, res.status_code
+
+    def count_issues(self, label_name: str) -> tuple[int, StatusCode]:
+        """
+        NOTE: counts the issues and PRs carrying `label_name` with one search
+        request, reading `total_count` instead of listing them.
+        """
+
+        logger.info("Counting issues labeled `%s`.", label_name)
+        try:
+            res: Response = self._request(
+                "GET",
+                f"{self.api_url}/search/issues",
+                params={
+                    "q": f'repo:{self.repo_owner}/{self.repo_name} label:"{label_name}"',
+                    "per_page": 1,
+                },
+            )
+            res.raise_for_status()
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return 0, STATUS_FAILED
+        except HTTPError as ex:
+            logger.error("Failed to count issues labeled `%s`.", label_name)
+            return 0, ex.response.status_code
+
+        return res.json()["total_count"], res.status_code
+
     def list_issues(
         self, label_names: set[str] | None = None, state: str = "all"
     ) -> tuple[list[GithubIssue], StatusCode]:
@@ -176,7 +686,6 @@ class GithubApi:
         """
 
         url: str = f"{self.base_url}/issues"
-        res: Response
         params: GithubIssueParams = {}
 
         if label_names:
@@ -185,52 +694,195 @@ class GithubApi:
         if state:
             params["state"] = state
 
-        page: int = 1
-        per_page: int = 100
+        logger.info(
+            "Fetching list of github issues from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        try:
+            return self._paginate(url, params)  # type: ignore[arg-type]
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return [], STATUS_FAILED
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch list of github issues. Check if token has permission to access `%s/%s`.",
+                self.repo_owner,
+                self.repo_name,
+            )
+            return [], ex.response.status_code
+
+    def iter_issues(
+        self, label_names: set[str] | None = None, state: str = "all"
+    ) -> Iterator[GithubIssueSummary]:
+        """
+        Streams issues (PRs included) as `GithubIssueSummary`, one page at a
+        time, fetching the next page while the current one is consumed.
+        NOTE: stop iterating (e.g. `break`) to stop paginating. Raises
+        `IssueListingError` once a page can't be fetched, even after retries.
+        """
+
+        url: str = f"{self.base_url}/issues"
+        params: GithubIssueParams = {}
+
+        if label_names:
+            params["labels"] = ",".join(label_name for label_name in label_names)
+
+        if state:
+            params["state"] = state
 
         logger.info(
-            f"Fetching list of github issues from `{self.repo_owner}/{self.repo_name}`."
+            "Streaming github issues from `%s/%s`.", self.repo_owner, self.repo_name
         )
-        github_issues: list[GithubIssue] = []
-        while True:
-            params["page"] = page
-            params["per_page"] = per_page
-            logger.info(f"Fetching page {page}.")
-            try:
-                res = requests.get(
-                    url,
-                    headers=self.headers,
-                    params=params,  # type: ignore[arg-type]
-                    timeout=10,
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ghlabel-page")
+        try:
+            res: Response = self._fetch_page(url, params, 1)  # type: ignore[arg-type]
+            last_page: int = parse_last_page(res.links)
+
+            for page in range(1, last_page + 1):
+                next_res: Future[Response] | None = (
+                    executor.submit(self._fetch_page, url, params, page + 1)  # type: ignore[arg-type]
+                    if page < last_page
+                    else None
                 )
-                res.raise_for_status()
-            except Timeout:
+                # only the summaries outlive the page
+                for github_issue in res.json():
+                    yield summarize_issue(github_issue)
+
+                if next_res is None:
+                    break
+                res = next_res.result()
+        except (Timeout, HTTPConnectionError) as ex:
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            raise IssueListingError(STATUS_FAILED) from ex
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch list of github issues. Check if token has permission to access `%s/%s`.",
+                self.repo_owner,
+                self.repo_name,
+            )
+            raise IssueListingError(ex.response.status_code) from ex
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def list_owner_repos(
+        self, owner: str, owner_type: str = "orgs"
+    ) -> tuple[list[str], StatusCode]:
+        """
+        NOTE: not scoped to this client's repo. `owner_type` is `orgs` or `users`.
+        Archived repos are skipped since their labels are read-only.
+        """
+
+        url: str = f"{self.api_url}/{owner_type}/{owner}/repos"
+
+        logger.info("Fetching list of github repos owned by `%s`.", owner)
+        try:
+            repos, status_code = self._paginate(url, {"type": "all"})
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return [], STATUS_FAILED
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch list of github repos. Check if `%s` exists and the token can access it.",
+                owner,
+            )
+            return [], ex.response.status_code
+
+        return [
+            repo["full_name"] for repo in repos if not repo["archived"]
+        ], status_code
+
+    def _probe_label_usage(self, label_name: str, limit: int) -> list[str]:
+        logger.info("Probing usage of label `%s`.", label_name)
+        res: Response = self._request(
+            "GET",
+            f"{self.base_url}/issues",
+            params={"labels": label_name, "state": "all", "per_page": limit},
+        )
+        res.raise_for_status()
+        return [issue_url(issue) for issue in res.json()]
+
+    def probe_label_usage(
+        self, label_names: set[str], limit: int = LABEL_USAGE_SAMPLE
+    ) -> tuple[dict[str, list[str]], StatusCode]:
+        """
+        Asks, per label, whether at least one issue or PR carries it, with a
+        label-filtered listing of at most `limit` issues. Probes run concurrently,
+        so the cost scales with the number of labels, not the number of issues.
+        NOTE: only labels in use are returned, mapped to up to `limit` issue urls.
+        Names with a comma can't be expressed in the `labels` filter, so those
+        fall back to a full issue scan.
+        """
+
+        probe_names: list[str] = sorted(
+            label_name for label_name in label_names if "," not in label_name
+        )
+        scan_names: set[str] = label_names - set(probe_names)
+        label_name_urls_map: dict[str, list[str]] = {}
+
+        if probe_names:
+            try:
+                with ThreadPoolExecutor(
+                    max_workers=min(self._pool_maxsize, len(probe_names)),
+                    thread_name_prefix="ghlabel-probe",
+                ) as executor:
+                    for label_name, urls in zip(
+                        probe_names,
+                        executor.map(
+                            partial(self._probe_label_usage, limit=limit), probe_names
+                        ),
+                        strict=True,
+                    ):
+                        if urls:
+                            label_name_urls_map[label_name] = urls
+            except (Timeout, HTTPConnectionError):
                 logger.error(
                     "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
                 )
-                sys.exit()
-            except HTTPError:
+                return label_name_urls_map, STATUS_FAILED
+            except HTTPError as ex:
                 logger.error(
-                    f"Failed to fetch list of github issues. Check if token has permission to access `{self.repo_owner}/{self.repo_name}`."
+                    "Failed to fetch list of github issues. Check if token has permission to access `%s/%s`.",
+                    self.repo_owner,
+                    self.repo_name,
                 )
-                sys.exit()
-
-            if not res.json():
-                break
-
-            github_issues.extend(res.json())
-            page += 1
+                return label_name_urls_map, ex.response.status_code
 
-        return github_issues, res.status_code
+        # stops paginating once every scanned label is proven in use
+        unproven_names: set[str] = set(scan_names)
+        if scan_names:
+            try:
+                for issue in self.iter_issues():
+                    for label_name in issue["label_names"]:
+                        if label_name not in scan_names:
+                            continue
+                        urls = label_name_urls_map.setdefault(label_name, [])
+                        if len(urls) < limit:
+                            urls.append(
+                                issue.get("pull_request_url", issue["html_url"])
+                            )
+                        unproven_names.discard(label_name)
+                    if not unproven_names:
+                        break
+            except IssueListingError as ex:
+                return label_name_urls_map, ex.status_code
+
+        return label_name_urls_map, STATUS_OK
 
 
 if __name__ == "__main__":
-    gh_api = GithubApi(
+    with GithubApi(
         validate_env("GITHUB_TOKEN"),
         validate_env("GITHUB_REPO_OWNER"),
         validate_env("GITHUB_REPO_NAME"),
-    )
-    gh_issues, status_code = gh_api.list_issues()
+    ) as gh_api:
+        gh_issues, status_code = gh_api.list_issues()
     if status_code != STATUS_OK:
         sys.exit()
     gh_pull_requests: list[GithubPullRequest] = []
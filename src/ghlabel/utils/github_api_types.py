@@ -13,14 +13,26 @@ class GithubLabel(TypedDict):
     new_name: NotRequired[str]
     description: str
     color: str
+    # config only: earlier names of the label, renamed instead of recreated
+    aliases: NotRequired[list[str]]
 
 
 class GithubIssue(TypedDict):
+    number: int
     html_url: str
     pull_request: NotRequired[dict[str, str]]
     labels: list[GithubLabel]
 
 
+class GithubIssueSummary(TypedDict):
+    """NOTE: the few `GithubIssue` fields label checks need, to keep scans small."""
+
+    number: int
+    html_url: str
+    pull_request_url: NotRequired[str]
+    label_names: list[str]
+
+
 class GithubIssueParams(GithubParams):
     labels: NotRequired[str]
     state: NotRequired[str]
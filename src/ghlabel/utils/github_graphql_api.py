@@ -0,0 +1,504 @@
+from typing import Any
+
+from requests.exceptions import ConnectionError as HTTPConnectionError
+from requests.exceptions import HTTPError, Timeout
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.api_metrics import ApiMetrics
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.github_api_types import GithubLabel, StatusCode
+from ghlabel.utils.helpers import STATUS_FAILED, STATUS_OK
+from ghlabel.utils.http_cache import HttpCache
+from ghlabel.utils.rate_limit import RateLimitScheduler
+from ghlabel.utils.retry_policy import RetryPolicy
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_UNPROCESSABLE: int = 422
+
+LIST_LABELS_QUERY: str = """
+query ($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    id
+    labels(first: 100, after: $after) {
+      nodes {
+        id
+        name
+        color
+        description
+        issues { totalCount }
+        pullRequests { totalCount }
+      }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+
+def graphql_url_for(api_url: str) -> str:
+    """NOTE: e.g. `https://ghe.example.com/api/v3` -> `https://ghe.example.com/api/graphql`."""
+    if api_url.endswith("/api/v3"):
+        return f"{api_url.removesuffix('/v3')}/graphql"
+    return f"{api_url}/graphql"
+
+
+def is_already_applied_error(mutation: str, error: dict[str, Any]) -> bool:
+    """
+    NOTE: GraphQL counterpart of `is_already_applied`, for one aliased field's
+    error: the label already exists on create, or is gone on delete.
+    """
+
+    message: str = str(error.get("message", "")).lower()
+    if mutation == "createLabel":
+        return "already" in message or "taken" in message
+    if mutation == "deleteLabel":
+        return error.get("type") == "NOT_FOUND" or "could not resolve" in message
+    return False
+
+
+class GithubGraphqlApi(GithubApi):
+    """
+    GraphQL-backed `GithubApi`. Labels are listed together with their issue and
+    PR counts, usage probes for many labels share one aliased query, and label
+    mutations are sent `MUTATION_BATCH_SIZE` at a time as aliased fields.
+    Issue listing is inherited from the REST implementation.
+    """
+
+    MUTATION_BATCH_SIZE: int = 50
+    # createLabel/updateLabel/deleteLabel are still behind the `bane` preview.
+    PREVIEW_ACCEPT: str = "application/vnd.github.bane-preview+json"
+
+    def __init__(  # noqa: PLR0913
+        self,
+        token: str,
+        repo_owner: str,
+        repo_name: str,
+        connect_timeout: float = 10,
+        read_timeout: float = 10,
+        pool_maxsize: int = 10,
+        graphql_url: str | None = None,
+        rate_limiter: RateLimitScheduler | None = None,
+        http_cache: HttpCache | None = None,
+        api_url: str | None = None,
+        metrics: ApiMetrics | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """
+        NOTE: `graphql_url` defaults to `<api_url>/graphql`, or to `<host>/api/graphql`
+        for a Github Enterprise Server `api_url` (`<host>/api/v3`).
+        """
+
+        super().__init__(
+            token,
+            repo_owner,
+            repo_name,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            pool_maxsize=pool_maxsize,
+            rate_limiter=rate_limiter,
+            http_cache=http_cache,
+            api_url=api_url,
+            metrics=metrics,
+            retry_policy=retry_policy,
+        )
+        self._graphql_url: str = graphql_url or graphql_url_for(self.api_url)
+        self._repository_id: str = ""
+        self._label_ids: dict[str, str] = {}
+        self._label_usage: dict[str, int] = {}
+
+    @property
+    def graphql_url(self) -> str:
+        return self._graphql_url
+
+    @property
+    def label_usage(self) -> dict[str, int]:
+        """NOTE: issue + PR count per label, as of the last `list_labels`."""
+        return self._label_usage
+
+    def _graphql_attempts(
+        self, query: str, variables: dict[str, Any], deadline: float | None = None
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], StatusCode, int]:
+        """
+        NOTE: raises `Timeout`/`HTTPError` for transport failures; GraphQL
+        errors come back in the second item with their alias in `path`.
+        The last item is how many attempts the request took.
+        """
+
+        res, attempts = self._request_attempts(
+            "POST",
+            self.graphql_url,
+            write=query.startswith("mutation"),
+            deadline=deadline,
+            json={"query": query, "variables": variables},
+            headers={"Accept": GithubGraphqlApi.PREVIEW_ACCEPT},
+        )
+        res.raise_for_status()
+        body: dict[str, Any] = res.json()
+        return (
+            body.get("data") or {},
+            body.get("errors") or [],
+            res.status_code,
+            attempts,
+        )
+
+    def _graphql(
+        self, query: str, variables: dict[str, Any], deadline: float | None = None
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], StatusCode]:
+        data, errors, status_code, _ = self._graphql_attempts(
+            query, variables, deadline
+        )
+        return data, errors, status_code
+
+    def _repository_vars(self) -> dict[str, Any]:
+        return {"owner": self.repo_owner, "name": self.repo_name}
+
+    def list_labels(self) -> tuple[list[GithubLabel], StatusCode]:
+        logger.info(
+            "Fetching list of github labels from `%s/%s`.",
+            self.repo_owner,
+            self.repo_name,
+        )
+        github_labels: list[GithubLabel] = []
+        after: str | None = None
+
+        try:
+            while True:
+                data, errors, status_code = self._graphql(
+                    LIST_LABELS_QUERY, {**self._repository_vars(), "after": after}
+                )
+                if errors or not data.get("repository"):
+                    logger.error(
+                        "Failed to fetch list of github labels. Check if token has permission to access `%s/%s`.",
+                        self.repo_owner,
+                        self.repo_name,
+                    )
+                    return github_labels, STATUS_UNPROCESSABLE
+
+                repository: dict[str, Any] = data["repository"]
+                self._repository_id = repository["id"]
+                for node in repository["labels"]["nodes"]:
+                    self._label_ids[node["name"]] = node["id"]
+                    self._label_usage[node["name"]] = (
+                        node["issues"]["totalCount"]
+                        + node["pullRequests"]["totalCount"]
+                    )
+                    github_labels.append(
+                        {
+                            "name": node["name"],
+                            "color": node["color"],
+                            "description": node["description"] or "",
+                        }
+                    )
+
+                page_info: dict[str, Any] = repository["labels"]["pageInfo"]
+                if not page_info["hasNextPage"]:
+                    return github_labels, status_code
+                after = page_info["endCursor"]
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return github_labels, STATUS_FAILED
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch list of github labels. Check if token has permission to access `%s/%s`.",
+                self.repo_owner,
+                self.repo_name,
+            )
+            return github_labels, ex.response.status_code
+
+    def _query_labels(
+        self, label_names: list[str], fields: str
+    ) -> tuple[dict[str, dict[str, Any] | None], list[dict[str, Any]]]:
+        """
+        Looks up many labels by name in one query, one aliased `label` field each.
+        NOTE: also returns the GraphQL `errors`; with any (e.g. `RATE_LIMITED`)
+        the labels may come back null without being missing.
+        """
+
+        variables: dict[str, Any] = self._repository_vars()
+        declarations: list[str] = ["$owner: String!", "$name: String!"]
+        selections: list[str] = []
+
+        for i, label_name in enumerate(label_names):
+            variables[f"l{i}"] = label_name
+            declarations.append(f"$l{i}: String!")
+            selections.append(f"l{i}: label(name: $l{i}) {{ {fields} }}")
+
+        query: str = (
+            f"query ({', '.join(declarations)}) {{\n"
+            "  repository(owner: $owner, name: $name) {\n"
+            "    id\n    " + "\n    ".join(selections) + "\n  }\n}"
+        )
+        data, errors, _ = self._graphql(query, variables)
+        repository: dict[str, Any] = data.get("repository") or {}
+        if repository.get("id"):
+            self._repository_id = repository["id"]
+
+        return {
+            label_name: repository.get(f"l{i}")
+            for i, label_name in enumerate(label_names)
+        }, errors
+
+    def probe_label_usage(
+        self, label_names: set[str], limit: int = GithubApi.LABEL_USAGE_SAMPLE
+    ) -> tuple[dict[str, list[str]], StatusCode]:
+        """
+        Labels counted as unused by the last `list_labels` are skipped; the rest
+        are looked up `MUTATION_BATCH_SIZE` per aliased query. No issue scan is needed.
+        NOTE: a label whose lookup errored or came back null is reported as in
+        use, so it is never removed on a failed probe.
+        """
+
+        fields: str = (
+            f"issues(first: {limit}) {{ totalCount nodes {{ url }} }} "
+            f"pullRequests(first: {limit}) {{ totalCount nodes {{ url }} }}"
+        )
+        label_name_urls_map: dict[str, list[str]] = {}
+        names: list[str] = sorted(
+            label_name
+            for label_name in label_names
+            if self.label_usage.get(label_name, 1)
+        )
+
+        try:
+            for i in range(0, len(names), GithubGraphqlApi.MUTATION_BATCH_SIZE):
+                labels, errors = self._query_labels(
+                    names[i : i + GithubGraphqlApi.MUTATION_BATCH_SIZE], fields
+                )
+                if errors:
+                    logger.error(
+                        "Failed to probe usage of labels `%s`. %s",
+                        ", ".join(labels),
+                        "; ".join(
+                            str(error.get("message") or error.get("type"))
+                            for error in errors
+                        ),
+                    )
+                for label_name, label in labels.items():
+                    if errors or not label:
+                        label_name_urls_map[label_name] = []
+                        continue
+                    if (
+                        label["issues"]["totalCount"]
+                        + label["pullRequests"]["totalCount"]
+                    ):
+                        label_name_urls_map[label_name] = [
+                            node["url"]
+                            for node in (
+                                label["issues"]["nodes"]
+                                + label["pullRequests"]["nodes"]
+                            )
+                        ][:limit]
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Try checking the connection."
+            )
+            return label_name_urls_map, STATUS_FAILED
+        except HTTPError as ex:
+            logger.error(
+                "Failed to fetch label usage. Check if token has permission to access `%s/%s`.",
+                self.repo_owner,
+                self.repo_name,
+            )
+            return label_name_urls_map, ex.response.status_code
+
+        return label_name_urls_map, STATUS_OK
+
+    def _resolve_label_ids(self, label_names: list[str]) -> None:
+        missing: list[str] = [
+            label_name
+            for label_name in label_names
+            if label_name not in self._label_ids
+        ]
+        if not missing and self._repository_id:
+            return
+
+        labels, _ = self._query_labels(missing, "id")
+        for label_name, label in labels.items():
+            if label:
+                self._label_ids[label_name] = label["id"]
+
+    def _mutate(  # noqa: PLR0913
+        self,
+        mutation: str,
+        input_type: str,
+        payload: str,
+        inputs: list[dict[str, Any]],
+        action: str,
+        label_names: list[str],
+        deadline: float | None = None,
+    ) -> list[tuple[dict[str, Any] | None, StatusCode]]:
+        """
+        Sends one aliased mutation field per input in a single request.
+        NOTE: an alias listed in the GraphQL `errors` is reported as 422, unless
+        the request was retried and the error only says an earlier attempt
+        already went through (see `is_already_applied_error`).
+        """
+
+        variables: dict[str, Any] = {f"m{i}": _input for i, _input in enumerate(inputs)}
+        query: str = (
+            "mutation ("
+            + ", ".join(f"$m{i}: {input_type}!" for i in range(len(inputs)))
+            + ") {\n"
+            + "\n".join(
+                f"  m{i}: {mutation}(input: $m{i}) {{ {payload} }}"
+                for i in range(len(inputs))
+            )
+            + "\n}"
+        )
+
+        try:
+            data, errors, status_code, attempts = self._graphql_attempts(
+                query, variables, deadline
+            )
+        except (Timeout, HTTPConnectionError):
+            logger.error(
+                "The site can't be reached, `github.com` took to long to respond. Labels `%s` not %sd. Try checking the connection.",
+                ", ".join(label_names),
+                action,
+            )
+            return [(None, STATUS_FAILED) for _ in inputs]
+        except HTTPError as ex:
+            logger.error(
+                "Failed to %s labels `%s`. Check the label format.",
+                action,
+                ", ".join(label_names),
+            )
+            return [(None, ex.response.status_code) for _ in inputs]
+
+        failed_aliases: set[str] = {
+            str(error["path"][0]) for error in errors if error.get("path")
+        }
+        if errors and not failed_aliases:
+            failed_aliases = set(variables)
+        applied_aliases: set[str] = set()
+        if attempts > 1:
+            applied_aliases = {
+                str(error["path"][0])
+                for error in errors
+                if error.get("path") and is_already_applied_error(mutation, error)
+            }
+
+        results: list[tuple[dict[str, Any] | None, StatusCode]] = []
+        for i, label_name in enumerate(label_names):
+            if f"m{i}" in applied_aliases:
+                logger.info(
+                    "Label `%s` was already %sd by an earlier attempt.",
+                    label_name,
+                    action,
+                )
+                results.append(({}, status_code))
+                if mutation == "deleteLabel":
+                    self._label_ids.pop(label_name, None)
+            elif f"m{i}" in failed_aliases or data.get(f"m{i}") is None:
+                logger.error(
+                    "Failed to %s label `%s`. Check the label format.",
+                    action,
+                    label_name,
+                )
+                results.append((None, STATUS_UNPROCESSABLE))
+            else:
+                logger.info("Label `%s` %sd successfully.", label_name, action)
+                results.append((data[f"m{i}"], status_code))
+
+                label: dict[str, Any] | None = data[f"m{i}"].get("label")
+                self._label_ids.pop(label_name, None)
+                if label:
+                    self._label_ids[label["name"]] = label["id"]
+
+        return results
+
+    def create_labels(
+        self, labels: list[GithubLabel], deadline: float | None = None
+    ) -> list[tuple[GithubLabel, StatusCode]]:
+        if not labels:
+            return []
+        if not self._repository_id:
+            self._resolve_label_ids([])
+
+        results = self._mutate(
+            "createLabel",
+            "CreateLabelInput",
+            "label { id name }",
+            [
+                {
+                    "repositoryId": self._repository_id,
+                    "name": label["name"],
+                    "color": label["color"],
+                    "description": label["description"],
+                }
+                for label in labels
+            ],
+            "create",
+            [label["name"] for label in labels],
+            deadline=deadline,
+        )
+        return [
+            (label, status_code)
+            for label, (_, status_code) in zip(labels, results, strict=True)
+        ]
+
+    def update_labels(
+        self, labels: list[GithubLabel], deadline: float | None = None
+    ) -> list[tuple[GithubLabel, StatusCode]]:
+        if not labels:
+            return []
+        label_names: list[str] = [label["name"] for label in labels]
+        self._resolve_label_ids(label_names)
+
+        results = self._mutate(
+            "updateLabel",
+            "UpdateLabelInput",
+            "label { id name }",
+            [
+                {
+                    "id": self._label_ids.get(label["name"], ""),
+                    "name": label.get("new_name", label["name"]),
+                    "color": label["color"],
+                    "description": label["description"],
+                }
+                for label in labels
+            ],
+            "update",
+            label_names,
+            deadline=deadline,
+        )
+        return [
+            (label, status_code)
+            for label, (_, status_code) in zip(labels, results, strict=True)
+        ]
+
+    def delete_labels(
+        self, label_names: list[str], deadline: float | None = None
+    ) -> list[tuple[None, StatusCode]]:
+        if not label_names:
+            return []
+        self._resolve_label_ids(label_names)
+
+        results = self._mutate(
+            "deleteLabel",
+            "DeleteLabelInput",
+            "clientMutationId",
+            [{"id": self._label_ids.get(label_name, "")} for label_name in label_names],
+            "delete",
+            label_names,
+            deadline=deadline,
+        )
+        return [(None, status_code) for _, status_code in results]
+
+    def create_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
+        return self.create_labels([label], deadline=deadline)[0]
+
+    def update_label(
+        self, label: GithubLabel, deadline: float | None = None
+    ) -> tuple[GithubLabel, StatusCode]:
+        return self.update_labels([label], deadline=deadline)[0]
+
+    def delete_label(
+        self, label_name: str, deadline: float | None = None
+    ) -> tuple[None, StatusCode]:
+        return self.delete_labels([label_name], deadline=deadline)[0]
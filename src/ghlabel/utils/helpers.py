@@ -1,29 +1,37 @@
+import functools
 import os
 import platform
 import subprocess
 import sys
 
-from dotenv import find_dotenv, load_dotenv
-
 from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
-from ghlabel.config import is_ghlabel_debug_mode
+from ghlabel.config import is_ghlabel_debug_mode, is_ghlabel_headless
 
 logger: GhlabelLogger = ghlabel_logger.init(__name__)
-load_dotenv(find_dotenv(usecwd=True))
 
 STATUS_OK: int = 200
+STATUS_FAILED: int = 0
+
+
+@functools.cache
+def load_env() -> None:
+    """NOTE: walks up from cwd for a `.env` file, once, when an env var is first needed."""
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv(usecwd=True))
 
 
 def validate_env(env: str) -> str:
+    load_env()
     _env: str | None = os.getenv(env)
     if not _env:
-        logger.error(f"{env} environment variable not set.")
+        logger.error("%s environment variable not set.", env)
         sys.exit()
     return _env
 
 
 def clear_screen() -> None:
-    if not is_ghlabel_debug_mode():
+    if not is_ghlabel_debug_mode() and not is_ghlabel_headless():
         if platform.system() == "Windows":
             subprocess.run("cls", shell=True, check=False)  # noqa: S607, S602
         else:
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_NOT_MODIFIED: int = 304
+
+GHLABEL_CACHE_DIR: str = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "ghlabel",
+    "http",
+)
+
+# Only the headers needed to replay a cached listing are stored.
+CACHED_HEADERS: tuple[str, ...] = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    headers: dict[str, str]
+    body: str
+    stored_at: float
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if "ETag" in self.headers:
+            headers["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def replay(self, not_modified: Response) -> Response:
+        """
+        Rebuilds a 200 response from disk, keeping the fresh (e.g. rate limit)
+        headers of the 304 that validated it.
+        """
+
+        res: Response = Response()
+        res.status_code = 200
+        res.url = not_modified.url
+        res.request = not_modified.request
+        res.encoding = "utf-8"
+        res.headers = CaseInsensitiveDict({**self.headers, **not_modified.headers})
+        res._content = self.body.encode("utf-8")
+        return res
+
+
+class HttpCache:
+    """
+    On-disk store of GET response bodies with their `ETag`/`Last-Modified`.
+    Later requests are sent conditionally and a 304 (which GitHub does not
+    count against the rate limit) is served from disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = GHLABEL_CACHE_DIR,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_age: float = 7 * 24 * 60 * 60,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    def key(self, url: str, params: Any, token: str) -> str:
+        """NOTE: the token is part of the key, so users never share entries."""
+        return hashlib.sha256(
+            json.dumps(
+                [url, sorted(dict(params or {}).items()), token],
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, key: str) -> CachedResponse | None:
+        """NOTE: a malformed entry (truncated, older format, edited) is a miss and is dropped."""
+
+        try:
+            with open(self._path(key)) as f:
+                entry: Any = json.load(f)
+            cached = CachedResponse(**entry)
+            if not isinstance(cached.headers, dict) or not isinstance(cached.body, str):
+                raise TypeError
+            is_expired: bool = time.time() - cached.stored_at > self._max_age
+        except OSError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Dropping malformed http cache entry `%s`.", key)
+            self._remove(self._path(key))
+            return None
+
+        return None if is_expired else cached
+
+    def store(self, key: str, res: Response) -> None:
+        headers: dict[str, str] = {
+            header: res.headers[header]
+            for header in CACHED_HEADERS
+            if header in res.headers
+        }
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
+
+        entry = CachedResponse(
+            url=res.url, headers=headers, body=res.text, stored_at=time.time()
+        )
+        path: str = self._path(key)
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entry.__dict__, f)
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            logger.warning("Failed to write http cache entry. %s", ex)
+
+    def evict(self) -> None:
+        """
+        Drops entries older than `max_age`, then the least recently written
+        ones until the cache fits in `max_bytes`.
+        """
+
+        try:
+            entries: list[os.DirEntry[str]] = [
+                entry for entry in os.scandir(self.cache_dir) if entry.is_file()
+            ]
+        except OSError:
+            return
+
+        now: float = time.time()
+        kept: list[tuple[float, int, str]] = []
+        for entry in entries:
+            stat: os.stat_result = entry.stat()
+            if now - stat.st_mtime > self._max_age:
+                self._remove(entry.path)
+            else:
+                kept.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total: int = sum(size for _, size, _ in kept)
+        for _, size, path in sorted(kept):
+            if total <= self._max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,395 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import yaml
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.github_api_types import GithubLabel
+
+if TYPE_CHECKING:
+    from ghlabel.utils.api_metrics import ApiMetrics
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+# libyaml is ~10x faster than the pure Python loader; both are safe loaders.
+YAML_LOADER: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+GHLABEL_CONFIG_CACHE_DIR: str = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "ghlabel",
+    "config",
+)
+
+# Below this many files to parse, process start-up costs more than it saves.
+PARALLEL_MIN_FILES: int = 16
+
+YAML_EXTS: tuple[str, ...] = (".yaml", ".yml")
+JSON_EXTS: tuple[str, ...] = (".json",)
+REMOVE_PREFIX: str = "_remove"
+
+
+def format_github_label(github_label: GithubLabel) -> GithubLabel:
+    return {  # type: ignore[return-value]
+        key: val
+        for key, val in github_label.items()
+        if key not in ["id", "node_id", "url", "default"]
+    }
+
+
+def _parse_config_file(label_file: str) -> tuple[Any, float]:
+    """NOTE: module level so it can run in a worker process."""
+    start: float = time.perf_counter()
+    with open(label_file) as f:
+        if label_file.endswith(JSON_EXTS):
+            data: Any = json.load(f)
+        else:
+            data = yaml.load(f, Loader=YAML_LOADER)  # noqa: S506
+    return data, time.perf_counter() - start
+
+
+def _parse_aliases(
+    label: dict[str, Any], key: str, label_filename: str, i: int
+) -> list[str]:
+    """NOTE: `key` holds one earlier name of the label, or a list of them."""
+
+    aliases: Any = label.get(key) or []
+    if isinstance(aliases, str):
+        aliases = [aliases]
+    if not isinstance(aliases, list) or not all(
+        isinstance(alias, str) for alias in aliases
+    ):
+        logger.error(
+            "Error on %s. `%s` of `Label #%s` named `%s` must be a name or a list of names.",
+            label_filename,
+            key,
+            i,
+            label["name"],
+        )
+        sys.exit()
+    return aliases
+
+
+@dataclass(frozen=True)
+class ConfigFileTiming:
+    label_file: str
+    seconds: float
+    cached: bool
+
+
+class ConfigCache:
+    """
+    Parsed config files keyed by path, mtime and size, kept in memory and on
+    disk (as json, which loads much faster than yaml). A file is re-parsed
+    only when it changes.
+    """
+
+    def __init__(self, cache_dir: str | None = GHLABEL_CONFIG_CACHE_DIR) -> None:
+        """NOTE: pass `cache_dir=None` to only cache in memory."""
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[int, int, Any]] = {}
+
+    @property
+    def cache_dir(self) -> str | None:
+        return self._cache_dir
+
+    def _path(self, label_file: str) -> str:
+        key: str = hashlib.sha256(label_file.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir or "", f"{key}.json")
+
+    def load(self, label_file: str, stat: os.stat_result) -> tuple[bool, Any]:
+        """NOTE: returns whether `label_file` was cached, and its parsed data."""
+        with self._lock:
+            entry: tuple[int, int, Any] | None = self._entries.get(label_file)
+        if entry is None and self.cache_dir:
+            try:
+                with open(self._path(label_file)) as f:
+                    mtime_ns, size, data = json.load(f)
+                entry = (mtime_ns, size, data)
+            except (OSError, ValueError):
+                entry = None
+
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            return False, None
+        with self._lock:
+            self._entries[label_file] = entry
+        return True, entry[2]
+
+    def store(self, label_file: str, stat: os.stat_result, data: Any) -> None:
+        entry: tuple[int, int, Any] = (stat.st_mtime_ns, stat.st_size, data)
+        with self._lock:
+            self._entries[label_file] = entry
+        if not self.cache_dir:
+            return
+
+        path: str = self._path(label_file)
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as ex:
+            logger.warning("Failed to write config cache entry. %s", ex)
+
+
+config_cache = ConfigCache()
+
+
+class ConfigLoader:
+    """NOTE: pass `metrics` to have each file's load time reported by `--stats`."""
+
+    def __init__(
+        self,
+        labels_dir: str,
+        cache: ConfigCache | None = config_cache,
+        workers: int | None = None,
+        metrics: "ApiMetrics | None" = None,
+    ) -> None:
+        self._labels_dir = labels_dir
+        self._cache = cache
+        self._workers = workers
+        self._metrics = metrics
+        self._timings: list[ConfigFileTiming] = []
+
+    @property
+    def labels_dir(self) -> str:
+        return self._labels_dir
+
+    @property
+    def timings(self) -> list[ConfigFileTiming]:
+        return self._timings
+
+    def _list_config_files(self, remove: bool) -> tuple[list[str], str]:
+        """
+        NOTE: returns the sorted label (or `_remove`) filenames of the first
+        ext found, yaml before json, and that ext.
+        """
+
+        try:
+            filenames: list[str] = sorted(os.listdir(self.labels_dir))
+        except FileNotFoundError:
+            logger.error(
+                "No %s dir found. To solve this issue, first run `ghlabel dump`.",
+                self.labels_dir,
+            )
+            sys.exit()
+
+        yaml_filenames: list[str] = []
+        json_filenames: list[str] = []
+        for filename in filenames:
+            if filename.startswith(REMOVE_PREFIX) != remove:
+                continue
+            if filename.endswith(YAML_EXTS):
+                yaml_filenames.append(filename)
+            elif filename.endswith(JSON_EXTS):
+                json_filenames.append(filename)
+
+        if yaml_filenames:
+            return yaml_filenames, "yaml"
+        if json_filenames:
+            return json_filenames, "json"
+        return [], ""
+
+    def has_labels(self) -> bool:
+        """NOTE: whether `labels_dir` exists and holds label config files."""
+        return os.path.isdir(self.labels_dir) and bool(
+            self._list_config_files(remove=False)[0]
+        )
+
+    def _load_files(self, filenames: list[str]) -> list[Any]:
+        label_files: list[str] = [
+            os.path.abspath(os.path.join(self.labels_dir, filename))
+            for filename in filenames
+        ]
+        stats: list[os.stat_result] = [os.stat(f) for f in label_files]
+        results: list[Any] = [None] * len(label_files)
+        timings: list[ConfigFileTiming | None] = [None] * len(label_files)
+        to_parse: list[int] = []
+
+        for i, (label_file, stat) in enumerate(zip(label_files, stats, strict=True)):
+            start: float = time.perf_counter()
+            cached, data = (
+                self._cache.load(label_file, stat) if self._cache else (False, None)
+            )
+            if not cached:
+                to_parse.append(i)
+                continue
+            results[i] = data
+            timings[i] = ConfigFileTiming(label_file, time.perf_counter() - start, True)
+
+        for i, (data, seconds) in zip(
+            to_parse, self._parse_files([label_files[i] for i in to_parse]), strict=True
+        ):
+            results[i] = data
+            timings[i] = ConfigFileTiming(label_files[i], seconds, False)
+            if self._cache:
+                self._cache.store(label_files[i], stats[i], data)
+
+        loaded: list[ConfigFileTiming] = [
+            timing for timing in timings if timing is not None
+        ]
+        self._timings.extend(loaded)
+        if self._metrics:
+            self._metrics.record_config(loaded)
+        for timing in loaded:
+            logger.info(
+                "Loaded %s in %.2fms%s.",
+                os.path.basename(timing.label_file),
+                timing.seconds * 1000,
+                " (cached)" if timing.cached else "",
+            )
+        return results
+
+    def _parse_files(self, label_files: list[str]) -> list[tuple[Any, float]]:
+        if len(label_files) < PARALLEL_MIN_FILES or self._workers == 1:
+            return [_parse_config_file(label_file) for label_file in label_files]
+
+        workers: int = self._workers or os.cpu_count() or 1
+        # NOTE: spawn, not fork: the loader runs in threaded processes (multi-repo
+        # setup, watch, asyncio.to_thread), and a forked child can inherit a lock
+        # some other thread held mid-fork.
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            return list(
+                executor.map(
+                    _parse_config_file,
+                    label_files,
+                    chunksize=max(1, len(label_files) // (4 * workers)),
+                )
+            )
+
+    def load_labels(self) -> list[GithubLabel]:
+        labels: list[GithubLabel] = []
+        label_filenames, label_ext = self._list_config_files(remove=False)
+
+        if not label_filenames:
+            logger.error(
+                "No Yaml or JSON config file found for labels. To solve this issue, first run `ghlabel dump`."
+            )
+            sys.exit()
+        logger.info(
+            "Found %s files. Loading labels from %s config.",
+            label_ext.upper(),
+            label_ext.upper(),
+        )
+
+        for label_filename, use_labels in zip(
+            label_filenames, self._load_files(label_filenames), strict=True
+        ):
+            for i, label in enumerate(use_labels or [], start=1):
+                if not label.get("name"):
+                    logger.error(
+                        "Error on %s. Name not found on `Label #%s` with color `%s` and description `%s`.",
+                        label_filename,
+                        i,
+                        label.get("color"),
+                        label.get("description"),
+                    )
+                    sys.exit()
+
+                config_label: GithubLabel = {
+                    "name": label["name"],
+                    "color": label.get("color", "").replace("#", ""),
+                    "description": label.get("description", ""),
+                }
+                aliases: list[str] = [
+                    *_parse_aliases(label, "aliases", label_filename, i),
+                    *_parse_aliases(label, "renamed_from", label_filename, i),
+                ]
+                if aliases:
+                    config_label["aliases"] = aliases
+                labels.append(config_label)
+
+        return labels
+
+    def load_labels_to_remove(self) -> set[str]:
+        label_to_remove_filenames, _ = self._list_config_files(remove=True)
+        if not label_to_remove_filenames:
+            return set()
+
+        logger.info("Deleting labels from %s", label_to_remove_filenames[0])
+        labels_to_remove: list[str] | None = self._load_files(
+            label_to_remove_filenames[:1]
+        )[0]
+        return set(labels_to_remove or [])
+
+
+def load_labels_from_config(
+    labels_dir: str, metrics: "ApiMetrics | None" = None
+) -> list[GithubLabel]:
+    return ConfigLoader(labels_dir, metrics=metrics).load_labels()
+
+
+def load_labels_to_remove_from_config(
+    labels_dir: str, metrics: "ApiMetrics | None" = None
+) -> set[str]:
+    return ConfigLoader(labels_dir, metrics=metrics).load_labels_to_remove()
+
+
+def repo_overlay_dir(labels_dir: str, repo: str) -> str:
+    """NOTE: where `dump --from-repo` writes a repo's own labels, `<labels_dir>/<repo_owner>/<repo_name>`."""
+    return os.path.join(labels_dir, *repo.strip().split("/"))
+
+
+def overlay_labels(
+    labels: list[GithubLabel], overlay: list[GithubLabel]
+) -> list[GithubLabel]:
+    """NOTE: overlay labels replace the template labels of the same name; the rest are added."""
+    overlay_names: set[str] = {label["name"].lower() for label in overlay}
+    return [
+        *(label for label in labels if label["name"].lower() not in overlay_names),
+        *overlay,
+    ]
+
+
+def load_repo_labels_from_config(
+    labels_dir: str,
+    repo: str,
+    metrics: "ApiMetrics | None" = None,
+    template: list[GithubLabel] | None = None,
+) -> list[GithubLabel]:
+    """
+    The shared template in `labels_dir`, with the repo's overlay layered over
+    it if there is one. Either may be missing, but not both.
+    NOTE: pass an already parsed `template` to reuse it across repos.
+    """
+
+    overlay = ConfigLoader(repo_overlay_dir(labels_dir, repo), metrics=metrics)
+    if not overlay.has_labels():
+        if template is not None:
+            return template
+        return load_labels_from_config(labels_dir, metrics)
+
+    if template is None and ConfigLoader(labels_dir).has_labels():
+        template = load_labels_from_config(labels_dir, metrics)
+    logger.info("Layering labels of `%s` over the shared template.", repo)
+    return overlay_labels(template or [], overlay.load_labels())
+
+
+def load_repo_labels_to_remove_from_config(
+    labels_dir: str,
+    repo: str,
+    metrics: "ApiMetrics | None" = None,
+    template: set[str] | None = None,
+) -> set[str]:
+    """NOTE: the template's labels to remove, plus the repo overlay's."""
+
+    labels_to_remove: set[str] = (
+        set(template)
+        if template is not None
+        else load_labels_to_remove_from_config(labels_dir, metrics)
+    )
+    overlay_dir: str = repo_overlay_dir(labels_dir, repo)
+    if os.path.isdir(overlay_dir):
+        labels_to_remove |= load_labels_to_remove_from_config(overlay_dir, metrics)
+    return labels_to_remove
@@ -0,0 +1,183 @@
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from ghlabel.utils.github_api_types import GithubLabel
+
+
+class LabelIndex:
+    """
+    Name -> label hash index, so reconciling is O(n + m) instead of `list.index`
+    scans. A later label with the same name replaces an earlier one.
+    """
+
+    def __init__(self, labels: Iterable[GithubLabel] = ()) -> None:
+        self._labels: dict[str, GithubLabel] = {
+            label["name"]: label for label in labels
+        }
+
+    def __contains__(self, label_name: object) -> bool:
+        return label_name in self._labels
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._labels)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def get(self, label_name: str) -> GithubLabel | None:
+        return self._labels.get(label_name)
+
+    @property
+    def names(self) -> set[str]:
+        return set(self._labels)
+
+    @property
+    def labels(self) -> list[GithubLabel]:
+        return list(self._labels.values())
+
+
+@dataclass(frozen=True)
+class LabelPlan:
+    create: list[GithubLabel] = field(default_factory=list)
+    # (remote label, desired label)
+    update: list[tuple[GithubLabel, GithubLabel]] = field(default_factory=list)
+    delete: set[str] = field(default_factory=set)
+    noop: list[GithubLabel] = field(default_factory=list)
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.create or self.update or self.delete)
+
+    def to_dict(self) -> dict[str, Any]:
+        """NOTE: json-ready; `noop` is not kept."""
+        return {
+            "create": self.create,
+            "update": [
+                {"from": github_label, "to": label}
+                for github_label, label in self.update
+            ],
+            "delete": sorted(self.delete),
+        }
+
+    @classmethod
+    def from_dict(cls, plan: dict[str, Any]) -> "LabelPlan":
+        return cls(
+            create=plan["create"],
+            update=[(change["from"], change["to"]) for change in plan["update"]],
+            delete=set(plan["delete"]),
+        )
+
+
+def is_label_changed(remote: GithubLabel, desired: GithubLabel) -> bool:
+    return (
+        desired["color"] != remote["color"]
+        or desired["description"] != remote["description"]
+    )
+
+
+def is_label_renamed(remote: GithubLabel, desired: GithubLabel) -> bool:
+    return desired["name"] != remote["name"]
+
+
+def mutation_label(
+    desired: GithubLabel, remote: GithubLabel | None = None
+) -> GithubLabel:
+    """
+    NOTE: the label as sent to Github, without the config only `aliases`.
+    For an update, it's addressed by the `remote` name, which a rename
+    changes to `new_name`.
+    """
+
+    label: GithubLabel = {
+        "name": desired["name"],
+        "color": desired["color"],
+        "description": desired["description"],
+    }
+    if remote is not None and is_label_renamed(remote, desired):
+        label["name"] = remote["name"]
+        label["new_name"] = desired["name"]
+    return label
+
+
+def fingerprint_labels(labels: Iterable[GithubLabel]) -> str:
+    """
+    NOTE: order independent hash of the label names, colors and descriptions.
+    """
+
+    return hashlib.sha256(
+        json.dumps(
+            sorted(
+                (label["name"], label["color"], label["description"])
+                for label in labels
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def plan_labels(
+    desired: Iterable[GithubLabel],
+    remote: Iterable[GithubLabel] | LabelIndex,
+    strict: bool = False,
+    remove: Iterable[str] = (),
+) -> LabelPlan:
+    """
+    Pure diff of the desired labels against the remote ones; nothing is fetched
+    or sent. `delete` holds remote labels that are explicitly in `remove`, or,
+    with `strict`, missing from `desired`. Whether they are safe to delete
+    (i.e. unused) is left to the caller.
+    A desired label missing from the remote but with one of its `aliases`
+    there is an update that renames that label, which keeps it on its issues,
+    and the alias is never deleted.
+    """
+
+    desired_index: LabelIndex = LabelIndex(desired)
+    remote_index: LabelIndex = (
+        remote if isinstance(remote, LabelIndex) else LabelIndex(remote)
+    )
+
+    create: list[GithubLabel] = []
+    update: list[tuple[GithubLabel, GithubLabel]] = []
+    noop: list[GithubLabel] = []
+    renamed: set[str] = set()
+
+    for label in desired_index.labels:
+        remote_label: GithubLabel | None = remote_index.get(label["name"])
+        if remote_label is None:
+            # NOTE: an alias that is itself desired, or already renamed, is kept
+            alias: str | None = next(
+                (
+                    alias
+                    for alias in label.get("aliases", [])
+                    if alias in remote_index
+                    and alias not in desired_index
+                    and alias not in renamed
+                ),
+                None,
+            )
+            remote_label = remote_index.get(alias) if alias else None
+        if remote_label is None:
+            create.append(label)
+        elif is_label_renamed(remote_label, label):
+            renamed.add(remote_label["name"])
+            update.append((remote_label, label))
+        elif is_label_changed(remote_label, label):
+            update.append((remote_label, label))
+        else:
+            noop.append(label)
+
+    delete: set[str] = {
+        label_name
+        for label_name in remove
+        if label_name in remote_index and label_name not in renamed
+    }
+    if strict:
+        delete.update(
+            label_name
+            for label_name in remote_index
+            if label_name not in desired_index and label_name not in renamed
+        )
+
+    return LabelPlan(create=create, update=update, delete=delete, noop=noop)
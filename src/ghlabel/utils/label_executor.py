@@ -0,0 +1,125 @@
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from rich.progress import Progress, TaskID
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.github_api_types import StatusCode
+from ghlabel.utils.helpers import STATUS_FAILED
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+
+@dataclass(frozen=True)
+class LabelMutationResult:
+    action: str
+    label_name: str
+    status_code: StatusCode
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300  # noqa: PLR2004
+
+
+@dataclass
+class LabelMutationSummary:
+    results: list[LabelMutationResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> list[LabelMutationResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[LabelMutationResult]:
+        return [result for result in self.results if not result.ok]
+
+    def extend(self, results: Iterable[LabelMutationResult]) -> None:
+        self.results.extend(results)
+
+
+class LabelMutationExecutor:
+    """
+    Runs independent label mutations (create/patch/delete) on a bounded
+    worker pool. Workers only talk to the API; the progress bar is advanced
+    from the calling thread as each mutation completes.
+    """
+
+    def __init__(self, concurrency: int = 1) -> None:
+        self._concurrency = max(1, concurrency)
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    def _run_one(
+        self,
+        action: str,
+        label_names: list[str],
+        mutation: Callable[[], list[StatusCode]],
+    ) -> list[LabelMutationResult]:
+        try:
+            status_codes: list[StatusCode] = mutation()
+        except Exception as ex:
+            logger.error(
+                "Failed to %s labels `%s`. %s", action, ", ".join(label_names), ex
+            )
+            return [
+                LabelMutationResult(action, label_name, STATUS_FAILED, str(ex))
+                for label_name in label_names
+            ]
+        return [
+            LabelMutationResult(action, label_name, status_code)
+            for label_name, status_code in zip(label_names, status_codes, strict=True)
+        ]
+
+    def run(  # noqa: PLR0913
+        self,
+        action: str,
+        mutations: list[tuple[list[str], Callable[[], list[StatusCode]]]],
+        progress: Progress,
+        task_id: TaskID,
+        description: str,
+        on_results: Callable[[list[LabelMutationResult]], None] | None = None,
+    ) -> list[LabelMutationResult]:
+        """
+        NOTE: each mutation is a batch of label names and a zero-arg call returning
+        one status code per label (REST batches hold a single label).
+        `description` is formatted with `label_name` after every batch that
+        went through; a failed batch shows its failure and the failures so far
+        instead. `on_results` (e.g. a journal) is called with the batch's results.
+        """
+
+        results: list[LabelMutationResult] = []
+        failed: int = 0
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix=f"ghlabel-{action}"
+        ) as executor:
+            futures: list[Future[list[LabelMutationResult]]] = [
+                executor.submit(self._run_one, action, label_names, mutation)
+                for label_names, mutation in mutations
+            ]
+
+            for future in as_completed(futures):
+                batch_results: list[LabelMutationResult] = future.result()
+                results.extend(batch_results)
+                if on_results:
+                    on_results(batch_results)
+                batch_failed: list[LabelMutationResult] = [
+                    result for result in batch_results if not result.ok
+                ]
+                failed += len(batch_failed)
+                progress.update(
+                    task_id,
+                    advance=len(batch_results),
+                    description=(
+                        f"[red]Failed to {action}[/red] `{batch_failed[-1].label_name}` "
+                        f"({failed} failed so far)"
+                        if batch_failed
+                        else description.format(label_name=batch_results[-1].label_name)
+                    ),
+                )
+
+        return results
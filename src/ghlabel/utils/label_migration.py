@@ -0,0 +1,204 @@
+"""
+Moves every issue and PR from one label to another, then deletes the old
+label, so labels in use can be retired.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import sys
+from dataclasses import dataclass
+from functools import partial
+
+from rich.progress import Progress
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.github_api import GithubApi, IssueListingError
+from ghlabel.utils.github_api_types import GithubLabel, StatusCode
+from ghlabel.utils.helpers import STATUS_OK
+from ghlabel.utils.label_config import format_github_label
+from ghlabel.utils.label_diff import LabelIndex, mutation_label
+from ghlabel.utils.label_executor import (
+    LabelMutationExecutor,
+    LabelMutationResult,
+    LabelMutationSummary,
+)
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+
+@dataclass(frozen=True)
+class MigrationPreview:
+    from_label: str
+    to_label: str
+    issues: int
+    # NOTE: `to_label` doesn't exist yet, so `from_label` is renamed instead
+    rename: bool
+    from_label_exists: bool = True
+
+
+class LabelMigration:
+    """
+    Lists the issues carrying `from_label` with the label filter, then
+    relabels them on a bounded worker pool: `to_label` is added before
+    `from_label` is removed, so an issue never loses both. `from_label` is
+    deleted once every issue moved.
+    When `to_label` doesn't exist, `from_label` is renamed instead, one
+    request that keeps it on every issue.
+    NOTE: an interrupted migration is resumed by running it again, since
+    only issues still carrying `from_label` are listed.
+    """
+
+    def __init__(
+        self,
+        gh_api: GithubApi,
+        from_label: str,
+        to_label: str,
+        concurrency: int = 1,
+        show_progress: bool = True,
+    ) -> None:
+        self._gh_api = gh_api
+        self._from_label = from_label
+        self._to_label = to_label
+        self._show_progress = show_progress
+        self._executor = LabelMutationExecutor(concurrency=concurrency)
+        self._summary = LabelMutationSummary()
+
+    @property
+    def gh_api(self) -> GithubApi:
+        return self._gh_api
+
+    @property
+    def from_label(self) -> str:
+        return self._from_label
+
+    @property
+    def to_label(self) -> str:
+        return self._to_label
+
+    @property
+    def summary(self) -> LabelMutationSummary:
+        return self._summary
+
+    def _fetch_label_index(self) -> LabelIndex:
+        with self.gh_api.phase("fetch"):
+            github_labels, status_code = self.gh_api.list_labels()
+        if status_code != STATUS_OK:
+            logger.error(
+                "Failed to fetch list of github labels from `%s/%s`.",
+                self.gh_api.repo_owner,
+                self.gh_api.repo_name,
+            )
+            sys.exit()
+        return LabelIndex(map(format_github_label, github_labels))
+
+    def _list_issue_numbers(self) -> list[int]:
+        """
+        NOTE: listed in full before any issue is relabeled, since relabeling
+        shifts the pages of a label-filtered listing. Names with a comma
+        can't be expressed in the `labels` filter, so those scan every issue.
+        """
+
+        with self.gh_api.phase("scan"):
+            try:
+                if "," in self.from_label:
+                    return [
+                        issue["number"]
+                        for issue in self.gh_api.iter_issues()
+                        if self.from_label in issue["label_names"]
+                    ]
+                return [
+                    issue["number"]
+                    for issue in self.gh_api.iter_issues({self.from_label})
+                ]
+            except IssueListingError:
+                # the reason is already logged
+                sys.exit()
+
+    def preview(self) -> MigrationPreview:
+        """NOTE: counts the affected issues with one search request, none are listed."""
+
+        label_index: LabelIndex = self._fetch_label_index()
+        if self.from_label not in label_index:
+            return MigrationPreview(
+                self.from_label, self.to_label, 0, False, from_label_exists=False
+            )
+
+        with self.gh_api.phase("scan"):
+            issues, status_code = self.gh_api.count_issues(self.from_label)
+        if status_code != STATUS_OK:
+            sys.exit()
+        return MigrationPreview(
+            self.from_label,
+            self.to_label,
+            issues,
+            rename=self.to_label not in label_index,
+        )
+
+    def _migrate_issue(self, issue_number: int) -> list[StatusCode]:
+        _, status_code = self.gh_api.add_issue_labels(issue_number, [self.to_label])
+        if status_code != STATUS_OK:
+            return [status_code]
+        _, status_code = self.gh_api.remove_issue_label(issue_number, self.from_label)
+        return [status_code]
+
+    def _rename(self, github_label: GithubLabel) -> None:
+        with self.gh_api.phase("update"):
+            _, status_code = self.gh_api.update_label(
+                mutation_label({**github_label, "name": self.to_label}, github_label)
+            )
+        self.summary.extend([LabelMutationResult("update", self.to_label, status_code)])
+
+    def run(self, delete: bool = True) -> LabelMutationSummary:
+        """NOTE: with `delete=False`, `from_label` is kept once its issues moved."""
+
+        label_index: LabelIndex = self._fetch_label_index()
+        github_label: GithubLabel | None = label_index.get(self.from_label)
+        if github_label is None:
+            logger.info("Label `%s` not found. Nothing to migrate.", self.from_label)
+            return self.summary
+        if self.to_label not in label_index:
+            self._rename(github_label)
+            return self.summary
+
+        issue_numbers: list[int] = self._list_issue_numbers()
+        logger.info(
+            "Moving %s issues from `%s` to `%s`.",
+            len(issue_numbers),
+            self.from_label,
+            self.to_label,
+        )
+        with (
+            Progress(transient=True, disable=not self._show_progress) as progress,
+            self.gh_api.phase("migrate"),
+        ):
+            task_id = progress.add_task(
+                "[cyan]Moving...[/cyan]", total=len(issue_numbers)
+            )
+            self.summary.extend(
+                self._executor.run(
+                    "migrate",
+                    [
+                        (
+                            [f"#{issue_number}"],
+                            partial(self._migrate_issue, issue_number),
+                        )
+                        for issue_number in issue_numbers
+                    ],
+                    progress,
+                    task_id,
+                    "[cyan]Moved[/cyan] issue `{label_name}`",
+                )
+            )
+
+        if delete and not self.summary.failed:
+            with self.gh_api.phase("remove"):
+                _, status_code = self.gh_api.delete_label(self.from_label)
+            self.summary.extend(
+                [LabelMutationResult("remove", self.from_label, status_code)]
+            )
+        return self.summary
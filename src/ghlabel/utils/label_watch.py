@@ -0,0 +1,446 @@
+"""
+Long-running `ghlabel watch`: keeps an in-memory mirror of each repo's
+labels, fresh from Github `label` webhooks and from its own changes, and
+applies the labels config whenever it or a repo drifts, without refetching.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import rich
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.change_events import ChangeEvents
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.helpers import STATUS_OK
+from ghlabel.utils.label_config import (
+    JSON_EXTS,
+    YAML_EXTS,
+    ConfigLoader,
+    format_github_label,
+    load_labels_from_config,
+    load_labels_to_remove_from_config,
+    load_repo_labels_from_config,
+    load_repo_labels_to_remove_from_config,
+)
+from ghlabel.utils.label_diff import LabelPlan, mutation_label
+from ghlabel.utils.label_executor import LabelMutationResult, LabelMutationSummary
+from ghlabel.utils.multi_repo_setup import parse_repo
+from ghlabel.utils.setup_github_label import SetupGithubLabel
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_ACCEPTED: int = 202
+STATUS_NO_CONTENT: int = 204
+STATUS_BAD_REQUEST: int = 400
+STATUS_UNAUTHORIZED: int = 401
+
+
+def config_snapshot(labels_dir: str) -> tuple[tuple[str, int, int], ...]:
+    """NOTE: path, mtime and size of every config file, overlays included; polled to spot edits."""
+
+    snapshot: list[tuple[str, int, int]] = []
+    for dir_path, _, file_names in os.walk(labels_dir):
+        for file_name in file_names:
+            if not file_name.endswith(YAML_EXTS + JSON_EXTS):
+                continue
+            path: str = os.path.join(dir_path, file_name)
+            try:
+                stat: os.stat_result = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot.append(
+                (os.path.relpath(path, labels_dir), stat.st_mtime_ns, stat.st_size)
+            )
+    return tuple(sorted(snapshot))
+
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    """NOTE: checks Github's `X-Hub-Signature-256` header, `sha256=<hmac hexdigest>`."""
+    expected: str = (
+        "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    )
+    return hmac.compare_digest(expected, signature)
+
+
+class LabelMirror:
+    """
+    Thread-safe, in-memory copy of one repo's labels on Github, formatted
+    as `SetupGithubLabel` expects them.
+    """
+
+    def __init__(self, labels: Iterable[GithubLabel] = ()) -> None:
+        self._lock = threading.Lock()
+        self._labels: dict[str, GithubLabel] = {
+            label["name"]: label for label in labels
+        }
+
+    @property
+    def labels(self) -> list[GithubLabel]:
+        with self._lock:
+            return [label.copy() for label in self._labels.values()]
+
+    def reset(self, labels: Iterable[GithubLabel]) -> None:
+        with self._lock:
+            self._labels = {label["name"]: label for label in labels}
+
+    def apply_webhook(
+        self, action: str, label: GithubLabel, changes: dict[str, Any]
+    ) -> bool:
+        """
+        NOTE: applies a `label` webhook event; returns whether the mirror
+        changed, which it doesn't for the echo of a change made by `watch` itself.
+        """
+
+        label = format_github_label(label)
+        with self._lock:
+            if action == "deleted":
+                return self._labels.pop(label["name"], None) is not None
+            if action not in ("created", "edited"):
+                return False
+
+            old_name: str = changes.get("name", {}).get("from", label["name"])
+            changed: bool = (
+                old_name != label["name"] or self._labels.get(old_name) != label
+            )
+            self._labels.pop(old_name, None)
+            self._labels[label["name"]] = label
+            return changed
+
+    def apply_results(
+        self, plan: LabelPlan, results: Iterable[LabelMutationResult]
+    ) -> None:
+        """NOTE: applies the changes of `plan` that went through, so nothing is refetched."""
+
+        succeeded: set[tuple[str, str]] = {
+            (result.action, result.label_name) for result in results if result.ok
+        }
+        with self._lock:
+            for label_name in plan.delete:
+                if ("remove", label_name) in succeeded:
+                    self._labels.pop(label_name, None)
+            for label in plan.create:
+                if ("add", label["name"]) in succeeded:
+                    self._labels[label["name"]] = mutation_label(label)
+            for github_label, label in plan.update:
+                if ("update", label["name"]) in succeeded:
+                    self._labels.pop(github_label["name"], None)
+                    self._labels[label["name"]] = mutation_label(label)
+
+
+class LabelWatcher:
+    """
+    Fetches each repo's labels once, then waits for work: an edit of the
+    labels config (polled every `interval` seconds) or a `label` webhook
+    that changes a mirror. Repos are reconciled against their mirror,
+    `debounce` seconds after the first change, so a burst of events is
+    applied together.
+    NOTE: a change that fails resyncs that repo's mirror with one fetch,
+    as it may have missed a webhook.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        gh_api_factory: Callable[[str, str], GithubApi],
+        repos: list[str],
+        labels_dir: str = "labels",
+        strict: bool = False,
+        force: bool = False,
+        concurrency: int = 1,
+        interval: float = 1,
+        debounce: float = 0.2,
+        events: ChangeEvents | None = None,
+    ) -> None:
+        self._gh_api_factory = gh_api_factory
+        # NOTE: Github repo names are case-insensitive, so are the mirror keys
+        self._repo_names: dict[str, str] = {}
+        for repo in repos:
+            self._repo_names.setdefault(repo.strip().lower(), repo.strip())
+        self._repos: list[str] = list(self._repo_names.values())
+        self._labels_dir = labels_dir
+        self._strict = strict
+        self._force = force
+        self._concurrency = concurrency
+        self._interval = interval
+        self._debounce = debounce
+        self._events = events
+
+        self._gh_apis: dict[str, GithubApi] = {}
+        self._mirrors: dict[str, LabelMirror] = {}
+        self._labels: dict[str, list[GithubLabel]] = {}
+        self._labels_to_remove: dict[str, set[str]] = {}
+        self._config_snapshot: tuple[tuple[str, int, int], ...] = ()
+        self._dirty: queue.SimpleQueue[tuple[str, str]] = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._httpd: ThreadingHTTPServer | None = None
+
+    @property
+    def repos(self) -> list[str]:
+        return self._repos
+
+    @property
+    def mirrors(self) -> dict[str, LabelMirror]:
+        return self._mirrors
+
+    @property
+    def labels_dir(self) -> str:
+        return self._labels_dir
+
+    def _load_config(self) -> bool:
+        """NOTE: keeps the last good config if the new one doesn't load, e.g. mid-save."""
+
+        try:
+            template: list[GithubLabel] | None = (
+                load_labels_from_config(self.labels_dir)
+                if ConfigLoader(self.labels_dir).has_labels()
+                else None
+            )
+            template_to_remove: set[str] = load_labels_to_remove_from_config(
+                self.labels_dir
+            )
+            labels: dict[str, list[GithubLabel]] = {
+                repo: load_repo_labels_from_config(
+                    self.labels_dir, repo, template=template
+                )
+                for repo in self.repos
+            }
+            labels_to_remove: dict[str, set[str]] = {
+                repo: load_repo_labels_to_remove_from_config(
+                    self.labels_dir, repo, template=template_to_remove
+                )
+                for repo in self.repos
+            }
+        except SystemExit:
+            # the reason is already logged
+            return False
+        except Exception as ex:
+            logger.error(
+                "Failed to load labels config from `%s`. %s", self.labels_dir, ex
+            )
+            return False
+
+        self._labels = labels
+        self._labels_to_remove = labels_to_remove
+        return True
+
+    def _fetch_labels(self, repo: str) -> list[GithubLabel]:
+        with self._gh_apis[repo].phase("fetch"):
+            github_labels, status_code = self._gh_apis[repo].list_labels()
+        if status_code != STATUS_OK:
+            sys.exit()
+        return list(map(format_github_label, github_labels))
+
+    def start(self) -> None:
+        """NOTE: loads the config and fetches every repo's labels, once."""
+
+        self._config_snapshot = config_snapshot(self.labels_dir)
+        if not self._load_config():
+            sys.exit()
+
+        for repo in self.repos:
+            self._gh_apis[repo] = self._gh_api_factory(*parse_repo(repo))
+            self._mirrors[repo.lower()] = LabelMirror(self._fetch_labels(repo))
+            self._dirty.put((repo, "start"))
+
+    def handle_webhook(self, event: str, payload: dict[str, Any]) -> int:
+        """NOTE: returns the status code to answer the delivery with."""
+
+        if event == "ping":
+            return STATUS_NO_CONTENT
+        full_name: str = payload.get("repository", {}).get("full_name", "")
+        repo: str | None = self._repo_names.get(full_name.lower())
+        if repo is None:
+            logger.debug("Ignoring `%s` delivery for unwatched `%s`.", event, full_name)
+            return STATUS_ACCEPTED
+        mirror: LabelMirror | None = self._mirrors.get(repo.lower())
+        if event != "label" or mirror is None or "label" not in payload:
+            return STATUS_ACCEPTED
+
+        if mirror.apply_webhook(
+            payload.get("action", ""), payload["label"], payload.get("changes") or {}
+        ):
+            logger.info(
+                "Label `%s` %s on `%s`.",
+                payload["label"]["name"],
+                payload.get("action"),
+                repo,
+            )
+            self._dirty.put((repo, "webhook"))
+        return STATUS_NO_CONTENT
+
+    def _handler_cls(self, secret: str) -> type[BaseHTTPRequestHandler]:
+        watcher: LabelWatcher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+            def _send(self, status_code: int) -> None:
+                self.send_response(status_code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                body: bytes = self.rfile.read(
+                    int(self.headers.get("Content-Length") or 0)
+                )
+                if secret and not verify_signature(
+                    secret, body, self.headers.get("X-Hub-Signature-256", "")
+                ):
+                    logger.warning("Rejected a webhook delivery with a bad signature.")
+                    self._send(STATUS_UNAUTHORIZED)
+                    return
+                try:
+                    payload: Any = json.loads(body)
+                except ValueError:
+                    self._send(STATUS_BAD_REQUEST)
+                    return
+                if not isinstance(payload, dict):
+                    self._send(STATUS_BAD_REQUEST)
+                    return
+                self._send(
+                    watcher.handle_webhook(
+                        self.headers.get("X-GitHub-Event", ""), payload
+                    )
+                )
+
+        return Handler
+
+    def serve_webhooks(
+        self, host: str = "127.0.0.1", port: int = 0, secret: str = ""
+    ) -> str:
+        """NOTE: serves webhook deliveries on a background thread; returns the url to point them at."""
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_cls(secret))
+        self._httpd.daemon_threads = True
+        threading.Thread(
+            target=self._httpd.serve_forever, name="ghlabel-webhooks", daemon=True
+        ).start()
+        server_host, server_port = self._httpd.server_address[:2]
+        return f"http://{server_host!s}:{server_port}"
+
+    def reconcile(self, repo: str, reason: str = "") -> LabelMutationSummary:
+        mirror: LabelMirror = self._mirrors[repo.lower()]
+        gh_label = SetupGithubLabel(
+            self._gh_apis[repo],
+            labels_dir=self.labels_dir,
+            concurrency=self._concurrency,
+            labels=self._labels[repo],
+            labels_to_remove=self._labels_to_remove[repo],
+            show_progress=False,
+            events=self._events,
+            github_labels=mirror.labels,
+        )
+        plan: LabelPlan = gh_label.build_plan(strict=self._strict, force=self._force)
+        if plan.is_noop:
+            return gh_label.summary
+
+        gh_label.apply_plan(plan)
+        mirror.apply_results(plan, gh_label.summary.results)
+        if gh_label.summary.failed:
+            mirror.reset(self._fetch_labels(repo))
+        self._report(repo, gh_label, reason)
+        return gh_label.summary
+
+    def _report(self, repo: str, gh_label: SetupGithubLabel, reason: str) -> None:
+        summary: LabelMutationSummary = gh_label.summary
+        if self._events:
+            self._events.skipped(
+                repo, gh_label.labels_unsafe_to_remove, gh_label.label_name_urls_map
+            )
+            self._events.done(repo, summary, 1 if summary.failed else 0, reason=reason)
+            return
+
+        message: str = (
+            f"[{'red' if summary.failed else 'green'}]{time.strftime('%H:%M:%S')}[/] "
+            f"`{repo}` ({reason}): {len(summary.succeeded)} label changes applied"
+        )
+        if summary.failed:
+            message += f", [red]{len(summary.failed)} failed[/red]"
+        if gh_label.labels_unsafe_to_remove:
+            message += f", not removed as still in use: {', '.join(sorted(gh_label.labels_unsafe_to_remove))}"
+        rich.print(message + ".")
+
+    def _poll_config(self) -> None:
+        snapshot: tuple[tuple[str, int, int], ...] = config_snapshot(self.labels_dir)
+        if snapshot == self._config_snapshot:
+            return
+        self._config_snapshot = snapshot
+        if self._load_config():
+            for repo in self.repos:
+                self._dirty.put((repo, "config"))
+
+    def _take_dirty(self, timeout: float) -> dict[str, str]:
+        """NOTE: waits up to `timeout` for a dirty repo, then `debounce` for more."""
+
+        try:
+            repo, reason = self._dirty.get(timeout=timeout)
+        except queue.Empty:
+            return {}
+
+        dirty: dict[str, str] = {repo: reason}
+        time.sleep(self._debounce)
+        while True:
+            try:
+                repo, reason = self._dirty.get_nowait()
+            except queue.Empty:
+                return dirty
+            dirty.setdefault(repo, reason)
+
+    def run(self) -> None:
+        """NOTE: blocks until `stop()` (e.g. from another thread) or Ctrl+C."""
+
+        next_poll_at: float = time.monotonic() + self._interval
+        try:
+            while not self._stop_event.is_set():
+                if time.monotonic() >= next_poll_at:
+                    self._poll_config()
+                    next_poll_at = time.monotonic() + self._interval
+
+                for repo, reason in self._take_dirty(
+                    max(0, next_poll_at - time.monotonic())
+                ).items():
+                    try:
+                        self.reconcile(repo, reason)
+                    except SystemExit:
+                        # the reason is already logged; keep watching the other repos
+                        pass
+                    except Exception as ex:
+                        logger.error(
+                            "Failed to reconcile github labels on `%s`. %s", repo, ex
+                        )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def close(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        for gh_api in self._gh_apis.values():
+            gh_api.close()
+        self._gh_apis.clear()
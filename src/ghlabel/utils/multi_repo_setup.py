@@ -0,0 +1,341 @@
+"""
+Fan `SetupGithubLabel` out over many repos, parsing the labels config once.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import rich
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.api_metrics import ApiMetrics
+from ghlabel.utils.change_events import ChangeEvents
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.github_api_types import GithubLabel
+from ghlabel.utils.label_config import (
+    ConfigLoader,
+    load_labels_from_config,
+    load_labels_to_remove_from_config,
+    load_repo_labels_from_config,
+    load_repo_labels_to_remove_from_config,
+)
+from ghlabel.utils.label_diff import LabelPlan
+from ghlabel.utils.label_executor import LabelMutationSummary
+from ghlabel.utils.run_journal import JournalState, RunJournal, run_key
+from ghlabel.utils.setup_github_label import SetupGithubLabel
+from ghlabel.utils.sync_state import SyncStateStore, hash_desired_state
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+
+@dataclass
+class RepoSetupResult:
+    repo: str
+    summary: LabelMutationSummary = field(default_factory=LabelMutationSummary)
+    labels_unsafe_to_remove: set[str] = field(default_factory=set)
+    error: str = ""
+    in_sync: bool = False
+    # finished by an earlier, interrupted run
+    resumed: bool = False
+
+    @property
+    def exit_code(self) -> int:
+        return 1 if self.error or self.summary.failed else 0
+
+    def count(self, action: str) -> int:
+        return sum(1 for result in self.summary.succeeded if result.action == action)
+
+
+def parse_repo(repo: str) -> tuple[str, str]:
+    repo_owner, _, repo_name = repo.strip().partition("/")
+    if not repo_owner or not repo_name or "/" in repo_name:
+        logger.error("Invalid repo `%s`. Expected `<repo_owner>/<repo_name>`.", repo)
+        sys.exit()
+    return repo_owner, repo_name
+
+
+def load_repos_file(repos_file: str) -> list[str]:
+    """
+    NOTE: one `<repo_owner>/<repo_name>` per line; blank lines and `#` comments are skipped.
+    """
+
+    try:
+        with open(repos_file) as f:
+            lines: list[str] = f.read().splitlines()
+    except FileNotFoundError:
+        logger.error("No %s file found.", repos_file)
+        sys.exit()
+
+    return [
+        line.split("#", 1)[0].strip() for line in lines if line.split("#", 1)[0].strip()
+    ]
+
+
+class MultiRepoSetup:
+    def __init__(  # noqa: PLR0913
+        self,
+        gh_api_factory: Callable[[str, str], GithubApi],
+        labels_dir: str = "labels",
+        workers: int = 4,
+        concurrency: int = 1,
+        sync_state: SyncStateStore | None = None,
+        journal: bool = True,
+        events: ChangeEvents | None = None,
+        metrics: ApiMetrics | None = None,
+    ) -> None:
+        """
+        NOTE: `journal` records each run so `run(resume=True)` can pick it up.
+        With `events`, previews and results are written there instead of printed.
+        The config load is recorded into `metrics`, if given.
+        """
+
+        self._gh_api_factory = gh_api_factory
+        self._labels_dir = labels_dir
+        self._workers = max(1, workers)
+        self._concurrency = concurrency
+        self._sync_state = sync_state
+        self._journal = journal
+        self._events = events
+
+        self._metrics = metrics
+        # NOTE: no shared template is fine as long as every repo has an overlay
+        self._labels: list[GithubLabel] | None = (
+            load_labels_from_config(labels_dir, metrics)
+            if ConfigLoader(labels_dir).has_labels()
+            else None
+        )
+        self._labels_to_remove: set[str] = load_labels_to_remove_from_config(
+            labels_dir, metrics
+        )
+
+    @property
+    def labels_dir(self) -> str:
+        return self._labels_dir
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def _setup_repo(  # noqa: PLR0912, PLR0913
+        self,
+        repo: str,
+        strict: bool,
+        label_names: set[str] | None,
+        labels: list[GithubLabel] | None,
+        remove_all: bool,
+        force: bool,
+        preview: bool,
+        config_hash: str,
+        journal: RunJournal | None,
+        journal_state: JournalState | None,
+    ) -> RepoSetupResult:
+        result = RepoSetupResult(repo)
+        repo_owner, repo_name = parse_repo(repo)
+        sync_state: SyncStateStore | None = None if preview else self._sync_state
+        pending_plan: LabelPlan | None = None
+        if journal_state:
+            if repo in journal_state.finished_repos:
+                result.resumed = True
+                return result
+            pending_plan = journal_state.pending_plan(repo)
+
+        try:
+            with self._gh_api_factory(repo_owner, repo_name) as gh_api:
+                if sync_state and sync_state.is_in_sync(gh_api, config_hash):
+                    result.in_sync = True
+                    if journal:
+                        journal.record_repo(repo)
+                    return result
+
+                gh_label = SetupGithubLabel(
+                    gh_api,
+                    labels_dir=self.labels_dir,
+                    concurrency=self._concurrency,
+                    labels=[]
+                    if pending_plan
+                    else load_repo_labels_from_config(
+                        self.labels_dir, repo, self._metrics, self._labels
+                    ),
+                    labels_to_remove=set()
+                    if pending_plan
+                    else load_repo_labels_to_remove_from_config(
+                        self.labels_dir, repo, self._metrics, self._labels_to_remove
+                    ),
+                    show_progress=False,
+                    journal=journal,
+                    events=self._events,
+                )
+                result.summary = gh_label.summary
+
+                if pending_plan:
+                    # NOTE: issues are not scanned again, the plan already holds only safe removals.
+                    gh_label.apply_plan(gh_label.rebase_plan(pending_plan))
+                elif preview and self._events:
+                    self._events.plan(
+                        repo,
+                        gh_label.build_plan(
+                            label_names=label_names,
+                            labels=[label.copy() for label in labels or []],
+                            strict=strict,
+                            remove_all=remove_all,
+                            force=force,
+                        ),
+                    )
+                elif preview:
+                    rich.print(
+                        f"\n  [bold green]Preview [[/bold green]{repo}[bold green]][/bold green]"
+                    )
+                    rich.print()
+
+                    if remove_all:
+                        gh_label.remove_all_labels(
+                            silent=True, preview=True, force=force
+                        )
+                    else:
+                        gh_label.remove_labels(
+                            strict=strict,
+                            label_names=label_names,
+                            preview=True,
+                            force=force,
+                        )
+                    gh_label.add_labels(
+                        labels=[label.copy() for label in labels or []], preview=True
+                    )
+                else:
+                    plan: LabelPlan = gh_label.build_plan(
+                        label_names=label_names,
+                        labels=[label.copy() for label in labels or []],
+                        strict=strict,
+                        remove_all=remove_all,
+                        force=force,
+                    )
+                    if journal:
+                        journal.record_plan(repo, plan)
+                    gh_label.apply_plan(plan)
+                result.labels_unsafe_to_remove = gh_label.labels_unsafe_to_remove
+                if self._events:
+                    self._events.skipped(
+                        repo,
+                        result.labels_unsafe_to_remove,
+                        gh_label.label_name_urls_map,
+                    )
+
+                if sync_state:
+                    # a resumed repo's unsafe labels are unknown, as issues are not scanned again
+                    if (
+                        result.exit_code
+                        or result.labels_unsafe_to_remove
+                        or pending_plan
+                    ):
+                        sync_state.clear(gh_api)
+                    else:
+                        sync_state.record(gh_api, config_hash)
+                if journal and not result.exit_code:
+                    journal.record_repo(repo)
+        except SystemExit:
+            # fatal errors `sys.exit()` with the reason already logged; keep the other repos going
+            result.error = "Aborted. See logs for more details."
+        except Exception as ex:
+            logger.error("Failed to setup github labels on `%s`. %s", repo, ex)
+            result.error = str(ex)
+
+        return result
+
+    def _report(self, result: RepoSetupResult) -> RepoSetupResult:
+        if self._events:
+            self._events.done(
+                result.repo,
+                result.summary,
+                result.exit_code,
+                in_sync=result.in_sync,
+                resumed=result.resumed,
+                error=result.error,
+            )
+        return result
+
+    def run(  # noqa: PLR0913
+        self,
+        repos: list[str],
+        strict: bool = False,
+        label_names: set[str] | None = None,
+        labels: list[GithubLabel] | None = None,
+        remove_all: bool = False,
+        force: bool = False,
+        preview: bool = False,
+        resume: bool = False,
+    ) -> list[RepoSetupResult]:
+        """
+        NOTE: results keep the order of `repos`. Printed previews run one repo
+        at a time so their output doesn't interleave. With `resume`, the journal
+        of an interrupted run with the same config, options and repos is picked
+        up: finished repos are skipped and the rest apply their saved plan.
+        """
+
+        unique_repos: list[str] = list(dict.fromkeys(repos))
+        for repo in unique_repos:
+            parse_repo(repo)
+
+        config_hash: str = hash_desired_state(
+            self.labels_dir,
+            strict=strict,
+            label_names=sorted(label_names or []),
+            labels=labels,
+            remove_all=remove_all,
+            force=force,
+        )
+
+        journal: RunJournal | None = (
+            RunJournal(run_key(config_hash, unique_repos))
+            if self._journal and not preview
+            else None
+        )
+        journal_state: JournalState | None = (
+            journal.load() if journal and resume else None
+        )
+        if resume and journal_state is None:
+            logger.warning(
+                "No interrupted run to resume. Running setup from the start."
+            )
+        if journal:
+            journal.start(resume=journal_state is not None)
+
+        with ThreadPoolExecutor(
+            # NOTE: events are written a line at a time, so they can't interleave
+            max_workers=1 if preview and not self._events else self.workers,
+            thread_name_prefix="ghlabel-repo",
+        ) as executor:
+            results: list[RepoSetupResult] = list(
+                executor.map(
+                    lambda repo: self._report(
+                        self._setup_repo(
+                            repo,
+                            strict,
+                            label_names,
+                            labels,
+                            remove_all,
+                            force,
+                            preview,
+                            config_hash,
+                            journal,
+                            journal_state,
+                        )
+                    ),
+                    unique_repos,
+                )
+            )
+
+        if journal:
+            if any(result.exit_code for result in results):
+                journal.close()
+            else:
+                journal.remove()
+        return results
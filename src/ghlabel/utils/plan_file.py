@@ -0,0 +1,86 @@
+"""
+Persist a computed `LabelPlan` so it can be reviewed, then applied later
+without re-fetching issues.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.label_diff import LabelPlan
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+PLAN_FILE_VERSION: int = 1
+
+
+@dataclass(frozen=True)
+class PlanFile:
+    repo: str
+    backend: str
+    fingerprint: str
+    plan: LabelPlan
+    labels_unsafe_to_remove: list[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": PLAN_FILE_VERSION,
+            "repo": self.repo,
+            "backend": self.backend,
+            "fingerprint": self.fingerprint,
+            "created_at": self.created_at,
+            **self.plan.to_dict(),
+            "labels_unsafe_to_remove": sorted(self.labels_unsafe_to_remove),
+        }
+
+    @classmethod
+    def from_dict(cls, plan: dict[str, Any]) -> "PlanFile":
+        return cls(
+            repo=plan["repo"],
+            backend=plan["backend"],
+            fingerprint=plan["fingerprint"],
+            plan=LabelPlan.from_dict(plan),
+            labels_unsafe_to_remove=plan["labels_unsafe_to_remove"],
+            created_at=plan["created_at"],
+        )
+
+    def write(self, plan_file: str) -> None:
+        tmp_plan_file: str = f"{plan_file}.{os.getpid()}.tmp"
+        with open(tmp_plan_file, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_plan_file, plan_file)
+
+    @classmethod
+    def load(cls, plan_file: str) -> "PlanFile":
+        try:
+            with open(plan_file) as f:
+                plan: dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            logger.error(
+                "No %s file found. To solve this issue, first run `ghlabel plan`.",
+                plan_file,
+            )
+            sys.exit()
+        except ValueError as ex:
+            logger.error("Invalid plan file `%s`. %s", plan_file, ex)
+            sys.exit()
+
+        if plan.get("version") != PLAN_FILE_VERSION:
+            logger.error(
+                "Unsupported plan file version `%s`. Re-run `ghlabel plan`.",
+                plan.get("version"),
+            )
+            sys.exit()
+        return cls.from_dict(plan)
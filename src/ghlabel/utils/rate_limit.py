@@ -0,0 +1,257 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Protocol, TypeVar
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_FORBIDDEN: int = 403
+STATUS_TOO_MANY_REQUESTS: int = 429
+
+WRITE_METHODS: frozenset[str] = frozenset({"POST", "PATCH", "PUT", "DELETE"})
+
+
+class RateLimitedResponse(Protocol):
+    """NOTE: satisfied by both `requests.Response` and `httpx.Response`."""
+
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+    @property
+    def text(self) -> str: ...
+
+
+R = TypeVar("R", bound=RateLimitedResponse)
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    resource: str
+    limit: int
+    remaining: int
+    used: int
+    reset_at: float
+
+
+def rate_limit_resource(url: str) -> str:
+    if url.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+def retry_after_delay(retry_after: str) -> float:
+    """NOTE: `Retry-After` is either a number of seconds or an HTTP date."""
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at: datetime = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        logger.warning("Unparsable `Retry-After: %s`. Waiting 60s.", retry_after)
+        return 60
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+class RateLimitScheduler:
+    """
+    Central gate every API request goes through. It tracks the primary budget
+    per resource from `X-RateLimit-*` headers, spaces writes so they stay under
+    the secondary content-creation limit, and sleeps until `Retry-After` or the
+    reset time instead of letting a rate-limited request fail.
+    NOTE: `max_wait` caps the rate limit sleeps of each request, not of the
+    scheduler, so a long multi-repo run or `watch` keeps waiting them out.
+    One scheduler should be shared by every client using the same token.
+    """
+
+    def __init__(
+        self,
+        writes_per_minute: int = 80,
+        max_wait: float = 15 * 60,
+        max_retries: int = 5,
+    ) -> None:
+        self._write_interval: float = 60 / writes_per_minute if writes_per_minute else 0
+        self._max_wait = max_wait
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        self._next_write_at: float = 0
+        self._budgets: dict[str, RateLimitBudget] = {}
+        self._waited: float = 0
+
+    @property
+    def budgets(self) -> dict[str, RateLimitBudget]:
+        with self._lock:
+            return dict(self._budgets)
+
+    @property
+    def budget(self) -> RateLimitBudget | None:
+        """NOTE: the `core` (REST) budget, once a response has reported it."""
+        return self.budgets.get("core")
+
+    @property
+    def waited(self) -> float:
+        """NOTE: total seconds spent sleeping on rate limits, across all requests."""
+        return self._waited
+
+    def _reset_delay(self, resource: str, url: str, waited: float) -> float:
+        """
+        NOTE: how long to wait for a used up primary budget to reset. Past
+        `max_wait` the request is sent anyway, so it fails instead of hanging.
+        """
+
+        now: float = time.time()
+        with self._lock:
+            budget: RateLimitBudget | None = self._budgets.get(resource)
+        if not budget or budget.remaining > 0 or budget.reset_at <= now:
+            return 0
+
+        delay: float = budget.reset_at - now + 1
+        if waited + delay > self._max_wait:
+            logger.error(
+                "Rate limit for `%s` resets in %.0fs, past the max wait. Not waiting.",
+                url,
+                delay,
+            )
+            return 0
+
+        logger.warning(
+            "Rate limit for `%s` used up. Waiting %.0fs for it to reset.", url, delay
+        )
+        with self._lock:
+            self._waited += delay
+        return delay
+
+    def _delay_before(self, write: bool, delay: float) -> float:
+        """NOTE: spaces writes out, counting from after the `delay` already due."""
+
+        if not write or not self._write_interval:
+            return delay
+
+        now: float = time.time()
+        with self._lock:
+            start: float = max(now + delay, self._next_write_at)
+            self._next_write_at = start + self._write_interval
+        return start - now
+
+    def _update(self, res: RateLimitedResponse) -> None:
+        headers: Mapping[str, str] = res.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+
+        resource: str = headers.get("X-RateLimit-Resource", "core")
+        budget = RateLimitBudget(
+            resource=resource,
+            limit=int(headers.get("X-RateLimit-Limit", 0)),
+            remaining=int(headers["X-RateLimit-Remaining"]),
+            used=int(headers.get("X-RateLimit-Used", 0)),
+            reset_at=float(headers.get("X-RateLimit-Reset", 0)),
+        )
+        with self._lock:
+            self._budgets[resource] = budget
+
+    def _delay_after(self, res: RateLimitedResponse) -> float | None:
+        """
+        NOTE: returns how long to wait before retrying, or None if `res` is not rate limited.
+        """
+
+        self._update(res)
+        if res.status_code not in (STATUS_FORBIDDEN, STATUS_TOO_MANY_REQUESTS):
+            return None
+
+        headers: Mapping[str, str] = res.headers
+        if "Retry-After" in headers:
+            return retry_after_delay(headers["Retry-After"])
+        if headers.get("X-RateLimit-Remaining") == "0":
+            return max(float(headers.get("X-RateLimit-Reset", 0)) - time.time(), 0) + 1
+        text: str = res.text.lower()
+        if "rate limit" in text or "abuse" in text:
+            # secondary (abuse) limit without headers: GitHub asks to wait at least a minute
+            return 60
+        return None
+
+    def _should_retry(
+        self, delay: float | None, attempt: int, waited: float, url: str
+    ) -> bool:
+        """NOTE: `waited` is what this request already slept on rate limits."""
+
+        if delay is None:
+            return False
+        if attempt >= self._max_retries or waited + delay > self._max_wait:
+            logger.error("Rate limit for `%s` not lifted in time. Giving up.", url)
+            return False
+
+        logger.warning(
+            "Rate limited on `%s`. Waiting %.0fs before retrying.", url, delay
+        )
+        with self._lock:
+            self._waited += delay
+        return True
+
+    def send(
+        self, method: str, url: str, send: Callable[[], R], write: bool | None = None
+    ) -> R:
+        """
+        NOTE: `write` defaults to whether `method` is mutative; GraphQL callers
+        pass it explicitly since queries and mutations are both POSTs.
+        """
+
+        resource: str = rate_limit_resource(url)
+        is_write: bool = method.upper() in WRITE_METHODS if write is None else write
+        attempt: int = 0
+        waited: float = 0
+
+        while True:
+            reset_delay: float = self._reset_delay(resource, url, waited)
+            waited += reset_delay
+            delay: float = self._delay_before(is_write, reset_delay)
+            if delay > 0:
+                time.sleep(delay)
+
+            res: R = send()
+            retry_delay: float | None = self._delay_after(res)
+            attempt += 1
+            if not self._should_retry(retry_delay, attempt, waited, url):
+                return res
+            waited += retry_delay or 0
+            time.sleep(retry_delay or 0)
+
+    async def asend(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[], Awaitable[R]],
+        write: bool | None = None,
+    ) -> R:
+        resource: str = rate_limit_resource(url)
+        is_write: bool = method.upper() in WRITE_METHODS if write is None else write
+        attempt: int = 0
+        waited: float = 0
+
+        while True:
+            reset_delay: float = self._reset_delay(resource, url, waited)
+            waited += reset_delay
+            delay: float = self._delay_before(is_write, reset_delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            res: R = await send()
+            retry_delay: float | None = self._delay_after(res)
+            attempt += 1
+            if not self._should_retry(retry_delay, attempt, waited, url):
+                return res
+            waited += retry_delay or 0
+            await asyncio.sleep(retry_delay or 0)
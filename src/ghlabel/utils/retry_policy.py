@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.rate_limit import RateLimitedResponse
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+STATUS_SERVER_ERROR: int = 500
+STATUS_UNPROCESSABLE: int = 422
+STATUS_NOT_FOUND: int = 404
+
+R = TypeVar("R", bound=RateLimitedResponse)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries transient failures, i.e. transport errors (`retry_exceptions`,
+    e.g. timeouts and connection resets) and 5xx responses, with capped
+    exponential backoff and full jitter.
+    Rate limited responses (including secondary/abuse 403s) are already
+    retried by `RateLimitScheduler`, below this layer.
+    NOTE: `max_attempts=1` disables retries. The clients fill in their own
+    transport errors when `retry_exceptions` is left empty.
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30
+    retry_exceptions: tuple[type[BaseException], ...] = ()
+
+    def backoff(self, attempt: int) -> float:
+        """NOTE: full jitter, a random delay up to the capped `base_delay * 2^(attempt - 1)`."""
+        return random.uniform(  # noqa: S311
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def is_retryable(self, res: RateLimitedResponse) -> bool:
+        return res.status_code >= STATUS_SERVER_ERROR
+
+    def _delay(
+        self, attempt: int, deadline_at: float | None, description: str, reason: str
+    ) -> float | None:
+        """NOTE: returns how long to wait before the next attempt, or None to give up."""
+
+        if attempt >= self.max_attempts:
+            logger.error(
+                "%s failed after %s attempts. %s", description, attempt, reason
+            )
+            return None
+
+        delay: float = self.backoff(attempt)
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            logger.error(
+                "%s ran out of time after %s attempts. %s", description, attempt, reason
+            )
+            return None
+
+        logger.warning(
+            "%s failed (%s). Retrying in %.1fs (attempt %s of %s).",
+            description,
+            reason,
+            delay,
+            attempt + 1,
+            self.max_attempts,
+        )
+        return delay
+
+    def call(
+        self,
+        send: Callable[[int], R],
+        deadline_at: float | None = None,
+        description: str = "Request",
+    ) -> tuple[R, int]:
+        """
+        NOTE: `send` is called with the attempt number (from 1). Returns the
+        last response and the number of attempts; once out of attempts (or
+        past `deadline_at`, a `time.monotonic()` value) the last error is raised.
+        """
+
+        attempt: int = 0
+        while True:
+            attempt += 1
+            try:
+                res: R = send(attempt)
+            except self.retry_exceptions as ex:
+                delay: float | None = self._delay(
+                    attempt, deadline_at, description, type(ex).__name__
+                )
+                if delay is None:
+                    raise
+            else:
+                if not self.is_retryable(res):
+                    return res, attempt
+                delay = self._delay(
+                    attempt, deadline_at, description, f"status {res.status_code}"
+                )
+                if delay is None:
+                    return res, attempt
+            time.sleep(delay)
+
+    async def acall(
+        self,
+        send: Callable[[int], Awaitable[R]],
+        deadline_at: float | None = None,
+        description: str = "Request",
+    ) -> tuple[R, int]:
+        attempt: int = 0
+        while True:
+            attempt += 1
+            try:
+                res: R = await send(attempt)
+            except self.retry_exceptions as ex:
+                delay: float | None = self._delay(
+                    attempt, deadline_at, description, type(ex).__name__
+                )
+                if delay is None:
+                    raise
+            else:
+                if not self.is_retryable(res):
+                    return res, attempt
+                delay = self._delay(
+                    attempt, deadline_at, description, f"status {res.status_code}"
+                )
+                if delay is None:
+                    return res, attempt
+            await asyncio.sleep(delay)
+
+
+def is_already_applied(method: str, res: RateLimitedResponse) -> bool:
+    """
+    NOTE: for a retried mutation, whether the response only says an earlier
+    attempt (whose response was lost) already went through: a 422
+    `already_exists` on create, or a 404 on delete.
+    """
+
+    if method == "POST":
+        return res.status_code == STATUS_UNPROCESSABLE and "already_exists" in res.text
+    if method == "DELETE":
+        return res.status_code == STATUS_NOT_FOUND
+    return False
@@ -0,0 +1,186 @@
+"""
+Append-only journal of a `setup` run, so an interrupted run can be resumed
+with only the work that was left.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.label_diff import LabelPlan
+from ghlabel.utils.label_executor import LabelMutationResult
+from ghlabel.utils.sync_state import GHLABEL_STATE_DIR
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+JOURNAL_VERSION: int = 1
+
+
+def run_key(config_hash: str, repos: list[str]) -> str:
+    """NOTE: a run is resumable only by a run with the same config, options and repos."""
+    return hashlib.sha256(
+        json.dumps([config_hash, sorted(repos)]).encode("utf-8")
+    ).hexdigest()
+
+
+@dataclass
+class JournalState:
+    """NOTE: what an earlier run with the same `run_key` got done."""
+
+    plans: dict[str, LabelPlan] = field(default_factory=dict)
+    done: dict[str, set[tuple[str, str]]] = field(default_factory=dict)
+    finished_repos: set[str] = field(default_factory=set)
+
+    def pending_plan(self, repo: str) -> LabelPlan | None:
+        """NOTE: the journaled plan of `repo` minus its completed mutations."""
+
+        plan: LabelPlan | None = self.plans.get(repo)
+        if plan is None:
+            return None
+
+        done: set[tuple[str, str]] = self.done.get(repo, set())
+        return LabelPlan(
+            create=[
+                label for label in plan.create if ("add", label["name"]) not in done
+            ],
+            update=[
+                (github_label, label)
+                for github_label, label in plan.update
+                if ("update", label["name"]) not in done
+            ],
+            delete={
+                label_name
+                for label_name in plan.delete
+                if ("remove", label_name) not in done
+            },
+        )
+
+
+class RunJournal:
+    """
+    JSON lines: a `run` header, then a `plan` per repo once it is computed,
+    a `mutation` per successful label change and a `repo` line once a repo
+    is done. Lines are flushed as they are written, so a crash loses at most
+    the mutations that were in flight.
+    """
+
+    def __init__(self, key: str, state_dir: str = GHLABEL_STATE_DIR) -> None:
+        self._key = key
+        self._path: str = os.path.join(state_dir, "journal", f"{key[:32]}.jsonl")
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def load(self) -> JournalState | None:
+        """NOTE: None if there is no journal for this run, or it's unreadable."""
+
+        state = JournalState()
+        try:
+            with open(self.path) as f:
+                lines: list[str] = f.readlines()
+        except OSError:
+            return None
+
+        for i, line in enumerate(lines):
+            try:
+                entry: dict[str, Any] = json.loads(line)
+            except ValueError:
+                # a torn last line from a crash mid-write
+                logger.warning("Skipping unreadable line %s of %s.", i + 1, self.path)
+                continue
+
+            if i == 0:
+                if (
+                    entry.get("type") != "run"
+                    or entry.get("version") != JOURNAL_VERSION
+                ):
+                    return None
+                continue
+
+            repo: str = entry.get("repo", "")
+            if entry["type"] == "plan":
+                state.plans[repo] = LabelPlan.from_dict(entry["plan"])
+            elif entry["type"] == "mutation":
+                state.done.setdefault(repo, set()).add(
+                    (entry["action"], entry["label_name"])
+                )
+            elif entry["type"] == "repo":
+                state.finished_repos.add(repo)
+
+        return state if lines else None
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        line: str = json.dumps(entry) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+
+    def start(self, resume: bool = False) -> None:
+        """NOTE: unless resuming, any earlier journal of this run is discarded."""
+        if resume and os.path.exists(self.path):
+            return
+        self.remove()
+        self._write(
+            {
+                "type": "run",
+                "version": JOURNAL_VERSION,
+                "key": self._key,
+                "started_at": time.time(),
+            }
+        )
+
+    def record_plan(self, repo: str, plan: LabelPlan) -> None:
+        self._write({"type": "plan", "repo": repo, "plan": plan.to_dict()})
+
+    def record_results(self, repo: str, results: list[LabelMutationResult]) -> None:
+        for result in results:
+            if result.ok:
+                self._write(
+                    {
+                        "type": "mutation",
+                        "repo": repo,
+                        "action": result.action,
+                        "label_name": result.label_name,
+                    }
+                )
+
+    def record_repo(self, repo: str) -> None:
+        self._write({"type": "repo", "repo": repo})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """NOTE: called once a run completes, since there is nothing left to resume."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
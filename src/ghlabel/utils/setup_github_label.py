@@ -12,45 +12,87 @@ __licence__ = "MIT"
 __maintainer__ = "seyLu"
 __status__ = "Prototype"
 
-import json
-import os
 import sys
+from functools import partial
+from typing import TypeVar
 
 import rich
-import yaml
-from dotenv import find_dotenv, load_dotenv
 from rich.progress import Progress
 from rich.prompt import Confirm
 
 from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.change_events import ChangeEvents
 from ghlabel.utils.github_api import GithubApi
-from ghlabel.utils.github_api_types import GithubIssue, GithubLabel
+from ghlabel.utils.github_api_types import GithubLabel, StatusCode
 from ghlabel.utils.helpers import (
     STATUS_OK,
     clear_screen,
     validate_env,
 )
+from ghlabel.utils.label_config import (
+    format_github_label,
+    load_repo_labels_from_config,
+    load_repo_labels_to_remove_from_config,
+)
+from ghlabel.utils.label_diff import (
+    LabelIndex,
+    LabelPlan,
+    mutation_label,
+    plan_labels,
+)
+from ghlabel.utils.label_executor import (
+    LabelMutationExecutor,
+    LabelMutationResult,
+    LabelMutationSummary,
+)
+from ghlabel.utils.run_journal import RunJournal
 
 logger: GhlabelLogger = ghlabel_logger.init(__name__)
-load_dotenv(find_dotenv(usecwd=True))
+
+T = TypeVar("T")
 
 
 class SetupGithubLabel:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         gh_api: GithubApi,
         labels_dir: str = "labels",
+        concurrency: int = 1,
+        labels: list[GithubLabel] | None = None,
+        labels_to_remove: set[str] | None = None,
+        show_progress: bool = True,
+        journal: RunJournal | None = None,
+        events: ChangeEvents | None = None,
+        github_labels: list[GithubLabel] | None = None,
     ) -> None:
+        """
+        NOTE: pass `labels`/`labels_to_remove` to reuse an already parsed config
+        (e.g. across many repos); labels are copied since updates mutate them.
+        Pass `github_labels` (e.g. from a `LabelMirror`) to skip fetching them.
+        Every successful label change is appended to `journal`, if given, and
+        every planned and sent change is written to `events`.
+        """
+
         self._labels_dir = labels_dir
         self._gh_api = gh_api
-
-        self._github_labels: list[GithubLabel] = self._fetch_formatted_github_labels()
-        self._github_label_names: list[str] = [
-            # requires index, so using list instead of set
-            github_label["name"]
-            for github_label in self.github_labels
-        ]
-        self._labels: list[GithubLabel] = self._load_labels_from_config() or []
+        self._show_progress = show_progress
+        self._journal = journal
+        self._events = events
+        self._config_labels_to_remove = labels_to_remove
+        self._executor = LabelMutationExecutor(concurrency=concurrency)
+        self._summary = LabelMutationSummary()
+
+        self._github_labels: list[GithubLabel] = (
+            github_labels
+            if github_labels is not None
+            else self._fetch_formatted_github_labels()
+        )
+        self._github_label_index = LabelIndex(self.github_labels)
+        self._labels: list[GithubLabel] = (
+            [label.copy() for label in labels]
+            if labels is not None
+            else self._load_labels_from_config() or []
+        )
         self._label_name_urls_map: dict[str, set[str]] = {}
         self._labels_unsafe_to_remove: set[str] = set()
         self._labels_force_remove: set[str] = set()
@@ -64,9 +106,12 @@ class SetupGithubLabel:
         return self._github_labels
 
     @property
-    def github_label_names(self) -> list[str]:
-        # requires index, so using list instead of set
-        return self._github_label_names
+    def github_label_names(self) -> set[str]:
+        return self._github_label_index.names
+
+    @property
+    def github_label_index(self) -> LabelIndex:
+        return self._github_label_index
 
     @property
     def labels(self) -> list[GithubLabel]:
@@ -88,161 +133,248 @@ class SetupGithubLabel:
     def gh_api(self) -> GithubApi:
         return self._gh_api
 
+    @property
+    def repo(self) -> str:
+        return f"{self.gh_api.repo_owner}/{self.gh_api.repo_name}"
+
+    @property
+    def summary(self) -> LabelMutationSummary:
+        return self._summary
+
     def set_labels_force_remove(self, label_names: set[str]) -> None:
         return self._labels_force_remove.update(label_names)
 
     def _fetch_formatted_github_labels(self) -> list[GithubLabel]:
-        github_labels, status_code = self.gh_api.list_labels()
+        with self.gh_api.phase("fetch"):
+            github_labels, status_code = self.gh_api.list_labels()
         if status_code != STATUS_OK:
             sys.exit()
-        return list(map(self._format_github_label, github_labels))
-
-    def _format_github_label(self, github_label: GithubLabel) -> GithubLabel:
-        return {  # type: ignore[return-value]
-            key: val
-            for key, val in github_label.items()
-            if key not in ["id", "node_id", "url", "default"]
-        }
-
-    def _list_labels_safe_to_remove(
-        self, label_names: set[str] | None = None
-    ) -> set[str]:
-        all_labels_to_remove: set[str] = self._load_labels_to_remove_from_config()
-        if label_names:
-            all_labels_to_remove.update(label_names)
-        labels_unsafe_to_remove: set[str] = set()
-
-        gh_issues: list[GithubIssue]
-        gh_issues, status_code = self.gh_api.list_issues()
+        return list(map(format_github_label, github_labels))
+
+    def _list_labels_safe_to_remove(self, label_names: set[str]) -> set[str]:
+        label_name_urls_map: dict[str, list[str]]
+        with self.gh_api.phase("scan"):
+            label_name_urls_map, status_code = self.gh_api.probe_label_usage(
+                label_names & self.github_label_names
+            )
         if status_code != STATUS_OK:
             sys.exit()
-        for issue in gh_issues:
-            url = issue["html_url"]
-            if "pull_request" in issue:
-                url = issue["pull_request"]["html_url"]
-
-            for label in issue["labels"]:
-                labels_unsafe_to_remove.add(label["name"])
-                if label["name"] not in self._label_name_urls_map:
-                    self._label_name_urls_map[label["name"]] = set([url])
-                else:
-                    self._label_name_urls_map[label["name"]].add(url)
+        for label_name, urls in label_name_urls_map.items():
+            self._label_name_urls_map.setdefault(label_name, set()).update(urls)
 
+        labels_unsafe_to_remove: set[str] = set(label_name_urls_map)
         self._labels_unsafe_to_remove = labels_unsafe_to_remove
-        return all_labels_to_remove - labels_unsafe_to_remove
+        return label_names - labels_unsafe_to_remove
 
     def _load_labels_from_config(self) -> list[GithubLabel]:
-        use_labels: list[GithubLabel] = []
-        labels: list[GithubLabel] = []
-        files_in_labels_dir: list[str] = []
-
-        try:
-            files_in_labels_dir = os.listdir(self.labels_dir)
-        except FileNotFoundError:
-            logger.error(
-                f"No {self.labels_dir} dir found. To solve this issue, first run `ghlabel dump`."
-            )
-            sys.exit()
-
-        yaml_filenames: list[str] = list(
-            filter(
-                lambda f: (f.endswith(".yaml") or f.endswith(".yml"))
-                and not f.startswith("_remove"),
-                files_in_labels_dir,
-            )
+        return load_repo_labels_from_config(
+            self.labels_dir, self.repo, self.gh_api.metrics
         )
-        json_filenames: list[str] = list(
-            filter(
-                lambda f: f.endswith(".json") and not f.startswith("_remove"),
-                files_in_labels_dir,
-            )
+
+    def _load_labels_to_remove_from_config(self) -> set[str]:
+        if self._config_labels_to_remove is not None:
+            return set(self._config_labels_to_remove)
+        return load_repo_labels_to_remove_from_config(
+            self.labels_dir, self.repo, self.gh_api.metrics
         )
 
-        label_filenames: list[str] = []
-        label_ext: str = ""
-
-        if yaml_filenames:
-            logger.info("Found YAML files. Loading labels from YAML config.")
-            label_filenames.extend(yaml_filenames)
-            label_ext = "yaml"
-        elif json_filenames:
-            logger.info("Found JSON files. Loading labels from JSON config.")
-            label_filenames.extend(json_filenames)
-            label_ext = "json"
-        else:
-            logger.error(
-                "No Yaml or JSON config file found for labels. To solve this issue, first run `ghlabel dump`."
-            )
-            sys.exit()
+    def _progress(self) -> Progress:
+        return Progress(transient=True, disable=not self._show_progress)
 
-        for label_filename in label_filenames:
-            logger.info(f"Loading labels from {label_filename}.")
-            label_file: str = os.path.join(self.labels_dir, label_filename)
+    def _clear_screen(self) -> None:
+        if self._show_progress:
+            clear_screen()
 
-            with open(label_file, "r") as f:
-                if label_ext == "yaml":
-                    use_labels = yaml.safe_load(f)
-                elif label_ext == "json":
-                    use_labels = json.load(f)
+    def _batched(self, items: list[T]) -> list[list[T]]:
+        batch_size: int = self.gh_api.MUTATION_BATCH_SIZE
+        return [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
 
-                for i, label in enumerate(use_labels, start=1):
-                    if not label.get("name"):
-                        logger.error(
-                            f"Error on {label_filename}. Name not found on `Label #{i}` with color `{label.get('color')}` and description `{label.get('description')}`."
-                        )
-                        sys.exit()
-
-                    labels.append(
-                        {
-                            "name": label["name"],
-                            "color": label.get("color", "").replace("#", ""),
-                            "description": label.get("description", ""),
-                        }
-                    )
+    def _create_labels(self, labels: list[GithubLabel]) -> list[StatusCode]:
+        return [status_code for _, status_code in self.gh_api.create_labels(labels)]
 
-        return labels
+    def _update_labels(self, labels: list[GithubLabel]) -> list[StatusCode]:
+        return [status_code for _, status_code in self.gh_api.update_labels(labels)]
 
-    def _load_labels_to_remove_from_config(self) -> set[str]:
-        labels_to_remove: list[str] = []
+    def _delete_labels(self, label_names: list[str]) -> list[StatusCode]:
+        return [
+            status_code for _, status_code in self.gh_api.delete_labels(label_names)
+        ]
 
-        files_in_labels_dir: list[str] = os.listdir(self.labels_dir)
+    def _plan_removals(
+        self,
+        label_names: set[str] | None = None,
+        strict: bool = False,
+        force: bool = False,
+    ) -> tuple[set[str], set[str]]:
+        """
+        NOTE: returns the labels to remove and, of those, the ones safe to remove.
+        """
+
+        labels_to_remove: set[str] = plan_labels(
+            self.labels,
+            self.github_label_index,
+            strict=strict,
+            remove=(label_names or set()) | self._load_labels_to_remove_from_config(),
+        ).delete
+        if force:
+            return labels_to_remove, labels_to_remove
+        return labels_to_remove, self._list_labels_safe_to_remove(labels_to_remove)
+
+    def _plan_additions(self, labels: list[GithubLabel] | None = None) -> LabelPlan:
+        pre_labels_to_add: list[GithubLabel] = self.labels
 
-        label_to_remove_yaml: list[str] = list(
-            filter(
-                lambda f: (f.endswith(".yaml") or f.endswith("yml"))
-                and f.startswith("_remove"),
-                files_in_labels_dir,
-            )
+        if labels:
+            for _i, label in enumerate(labels, start=1):
+                if not label.get("name"):
+                    logger.error(
+                        "Error on argument label. Name not found on `Label #%s` with color `%s` and description `%s`.",
+                        _i,
+                        label.get("color"),
+                        label.get("description"),
+                    )
+                    sys.exit()
+
+                pre_labels_to_add.append(
+                    {
+                        "name": label["name"],
+                        "color": label.get("color", "").replace("#", ""),
+                        "description": label.get("description", ""),
+                    }
+                )
+
+        # NOTE: a label defined twice (e.g. in config and as an argument) is
+        # planned once, with the last definition winning.
+        return plan_labels(pre_labels_to_add, self.github_label_index)
+
+    def build_plan(
+        self,
+        label_names: set[str] | None = None,
+        labels: list[GithubLabel] | None = None,
+        strict: bool = False,
+        remove_all: bool = False,
+        force: bool = False,
+    ) -> LabelPlan:
+        """
+        NOTE: computes every change `setup` would make without sending any;
+        `delete` only holds the labels safe to remove.
+        """
+
+        if remove_all:
+            label_names = self.github_label_names
+        _, labels_safe_to_remove = self._plan_removals(
+            label_names=label_names, strict=strict and not remove_all, force=force
         )
-        label_to_remove_json: list[str] = list(
-            filter(
-                lambda f: f.endswith(".json") and f.startswith("_remove"),
-                files_in_labels_dir,
-            )
+        plan: LabelPlan = self._plan_additions(labels)
+        return LabelPlan(
+            create=plan.create,
+            update=plan.update,
+            delete=labels_safe_to_remove,
+            noop=plan.noop,
         )
 
-        label_to_remove_file: str = ""
-        label_to_remove_ext: str = ""
+    def rebase_plan(self, plan: LabelPlan) -> LabelPlan:
+        """
+        NOTE: drops the changes the repo already has, e.g. ones an interrupted
+        run made without getting to journal them.
+        """
 
-        if label_to_remove_yaml:
-            label_to_remove_file = os.path.join(
-                self.labels_dir, label_to_remove_yaml[0]
+        rebased: LabelPlan = plan_labels(
+            [*plan.create, *(label for _, label in plan.update)],
+            self.github_label_index,
+        )
+        return LabelPlan(
+            create=rebased.create,
+            update=rebased.update,
+            delete=plan.delete & self.github_label_names,
+            noop=rebased.noop,
+        )
+
+    def apply_plan(self, plan: LabelPlan) -> None:
+        if self._events:
+            self._events.plan(self.repo, plan)
+        self._run_remove(sorted(plan.delete))
+        self._run_add(plan.create)
+        self._run_update(plan.update)
+        logger.info("Label plan applied.")
+
+    def _record_results(self, results: list[LabelMutationResult]) -> None:
+        if self._journal:
+            self._journal.record_results(self.repo, results)
+        if self._events:
+            self._events.results(self.repo, results)
+
+    def _run_remove(self, label_names: list[str]) -> None:
+        self._clear_screen()
+        with self._progress() as progress, self.gh_api.phase("remove"):
+            task_id = progress.add_task(
+                "[red]Removing...[/red]", total=len(label_names)
             )
-            label_to_remove_ext = "yaml"
-        elif label_to_remove_json:
-            label_to_remove_file = os.path.join(
-                self.labels_dir, label_to_remove_json[0]
+            self.summary.extend(
+                self._executor.run(
+                    "remove",
+                    [
+                        (batch, partial(self._delete_labels, batch))
+                        for batch in self._batched(label_names)
+                    ],
+                    progress,
+                    task_id,
+                    "[red]Removed[/red] Label `{label_name}`",
+                    self._record_results,
+                )
             )
-            label_to_remove_ext = "json"
 
-        logger.info(f"Deleting labels from {label_to_remove_file}")
-        with open(label_to_remove_file) as f:
-            if label_to_remove_ext == "yaml":
-                labels_to_remove = yaml.safe_load(f)
-            elif label_to_remove_ext == "json":
-                labels_to_remove = json.load(f)
+    def _run_update(self, changes: list[tuple[GithubLabel, GithubLabel]]) -> None:
+        """NOTE: `changes` are (remote label, desired label) pairs, as in `LabelPlan.update`."""
+        with self._progress() as progress, self.gh_api.phase("update"):
+            task_id = progress.add_task(
+                "[yellow]Updating...[/yellow]", total=len(changes)
+            )
+            self.summary.extend(
+                self._executor.run(
+                    "update",
+                    [
+                        (
+                            [label["name"] for _, label in batch],
+                            partial(
+                                self._update_labels,
+                                [
+                                    mutation_label(label, github_label)
+                                    for github_label, label in batch
+                                ],
+                            ),
+                        )
+                        for batch in self._batched(changes)
+                    ],
+                    progress,
+                    task_id,
+                    "[yellow]Updated[/yellow] Label `{label_name}`",
+                    self._record_results,
+                )
+            )
 
-        return set(labels_to_remove)
+    def _run_add(self, labels: list[GithubLabel]) -> None:
+        self._clear_screen()
+        with self._progress() as progress, self.gh_api.phase("add"):
+            task_id = progress.add_task("[cyan]Adding...[/cyan]", total=len(labels))
+            self.summary.extend(
+                self._executor.run(
+                    "add",
+                    [
+                        (
+                            [label["name"] for label in batch],
+                            partial(
+                                self._create_labels,
+                                [mutation_label(label) for label in batch],
+                            ),
+                        )
+                        for batch in self._batched(labels)
+                    ],
+                    progress,
+                    task_id,
+                    "[cyan]Added[/cyan] Label `{label_name}`",
+                    self._record_results,
+                )
+            )
 
     def remove_all_labels(
         self, silent: bool = False, preview: bool = False, force: bool = False
@@ -259,7 +391,7 @@ class SetupGithubLabel:
 
         if confirmation:
             self.remove_labels(
-                label_names=set(self.github_label_names), preview=preview, force=force
+                label_names=self.github_label_names, preview=preview, force=force
             )
 
     def remove_labels(
@@ -269,124 +401,53 @@ class SetupGithubLabel:
         preview: bool = False,
         force: bool = False,
     ) -> None:
-        labels_to_remove: set[str] = set()
-        labels_safe_to_remove: set[str]
-
-        if strict:
-            labels_to_remove.update(
-                set(self.github_label_names)
-                - set([label["name"] for label in self.labels])
-            )
-
-        if label_names:
-            labels_to_remove.update(label_names)
-
-        if not force:
-            labels_safe_to_remove = self._list_labels_safe_to_remove(
-                label_names=labels_to_remove
-            )
-        else:
-            labels_to_remove.update(self._load_labels_to_remove_from_config())
-            labels_safe_to_remove = labels_to_remove
+        labels_to_remove, labels_safe_to_remove = self._plan_removals(
+            label_names=label_names, strict=strict, force=force
+        )
 
         if preview:
             rich.print("  will [red]remove[/red] the following labels:")
-            is_remove_label: bool = False
 
-            for label in labels_to_remove:
-                if label in self.github_label_names:
-                    is_remove_label = True
-                    rich.print(f"    - {label}")
+            for label_name in labels_to_remove:
+                rich.print(f"    - {label_name}")
 
-            if not is_remove_label:
+            if not labels_to_remove:
                 rich.print("    None")
 
             rich.print()
             return
 
-        clear_screen()
-        with Progress(transient=True) as progress:
-            task_id = progress.add_task(
-                "[red]Removing...[/red]", total=len(labels_safe_to_remove)
-            )
-
-            for label_name in labels_safe_to_remove:
-                if label_name in self.github_label_names:
-                    self.gh_api.delete_label(label_name)
-                    progress.update(
-                        task_id,
-                        advance=1,
-                        description=f"[red]Removed[/red] Label `{label_name}`",
-                    )
+        self._run_remove(list(labels_safe_to_remove))
 
     def update_labels(self, labels: list[GithubLabel], preview: bool = False) -> None:
+        # NOTE: matched to the remote labels by name, or by alias for a rename
+        changes: list[tuple[GithubLabel, GithubLabel]] = plan_labels(
+            labels, self.github_label_index
+        ).update
+
         if preview and labels:
             rich.print("  will [yellow]update[/yellow] the following labels:")
-            is_update_label: bool = False
 
-            for label in labels:
-                if label["name"] in self.github_label_names:
-                    i: int = self.github_label_names.index(label["name"])
+            for github_label, label in changes:
+                rich.print(f"    [red]- {github_label}[/red]")
+                rich.print(f"    [green]+ {mutation_label(label)}[/green]")
 
-                    is_update_label = True
-                    rich.print(f"    [red]- {self.github_labels[i]}[/red]")
-                    rich.print(f"    [green]+ {label}[/green]")
-
-            if not is_update_label:
+            if not changes:
                 rich.print("    None")
 
             rich.print()
             return
 
         if preview and labels:
-            clear_screen()
-        with Progress(transient=True) as progress:
-            task_id = progress.add_task(
-                "[yellow]Updating...[/yellow]", total=len(labels)
-            )
-
-            for label in labels:
-                self.gh_api.update_label(label)
-                progress.update(
-                    task_id,
-                    advance=1,
-                    description=f'[yellow]Updated[/yellow] Label `{label["new_name"]}`',
-                )
+            self._clear_screen()
+        self._run_update(changes)
 
     def add_labels(
         self, labels: list[GithubLabel] | None = None, preview: bool = False
     ) -> None:
-        pre_labels_to_add: list[GithubLabel] = self.labels
-        labels_to_add: list[GithubLabel] = []
-        labels_to_update: list[GithubLabel] = []
-
-        if labels:
-            for _i, label in enumerate(labels, start=1):
-                if not label.get("name"):
-                    logger.error(
-                        f"Error on argument label. Name not found on `Label #{_i}` with color `{label.get('color')}` and description `{label.get('description')}`."
-                    )
-                    sys.exit()
-
-                pre_labels_to_add.append(
-                    {
-                        "name": label["name"],
-                        "color": label.get("color", "").replace("#", ""),
-                        "description": label.get("description", ""),
-                    }
-                )
-
-        for label in pre_labels_to_add:
-            if label["name"] in self.github_label_names:
-                i: int = self.github_label_names.index(label["name"])
-
-                if (
-                    label["color"] != self.github_labels[i]["color"]
-                    or label["description"] != self.github_labels[i]["description"]
-                ):
-                    labels_to_update.append(label)
-            else:
-                labels_to_add.append(label)
+        plan: LabelPlan = self._plan_additions(labels)
+        labels_to_add: list[GithubLabel] = plan.create
+        labels_to_update: list[GithubLabel] = [label for _, label in plan.update]
 
         if preview:
             rich.print("  will [cyan]add[/cyan] the following labels:")
@@ -403,30 +464,17 @@ class SetupGithubLabel:
             self.update_labels(labels_to_update, preview=preview)
             return
 
-        clear_screen()
-        with Progress(transient=True) as progress:
-            task_id = progress.add_task(
-                "[cyan]Adding...[/cyan]", total=len(labels_to_add)
-            )
-
-            for label in labels_to_add:
-                self.gh_api.create_label(label)
-                progress.update(
-                    task_id,
-                    advance=1,
-                    description=f'[cyan]Added[/cyan] Label `{label["name"]}`',
-                )
-
+        self._run_add(labels_to_add)
         self.update_labels(labels_to_update, preview=preview)
         logger.info("Label creation process completed.")
 
 
 if __name__ == "__main__":
-    gh_api = GithubApi(
+    with GithubApi(
         validate_env("GITHUB_TOKEN"),
         validate_env("GITHUB_REPO_OWNER"),
         validate_env("GITHUB_REPO_NAME"),
-    )
-    gh_label = SetupGithubLabel(gh_api)
-    gh_label.remove_labels()
-    gh_label.add_labels()
+    ) as gh_api:
+        gh_label = SetupGithubLabel(gh_api)
+        gh_label.remove_labels()
+        gh_label.add_labels()
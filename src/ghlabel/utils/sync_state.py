@@ -0,0 +1,155 @@
+"""
+Remember the last applied label state per repo, so a `setup` run that would
+change nothing is answered with one conditional request.
+"""
+
+__author__ = "seyLu"
+__github__ = "github.com/seyLu"
+
+__licence__ = "MIT"
+__maintainer__ = "seyLu"
+__status__ = "Prototype"
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from ghlabel.__logger__ import GhlabelLogger, ghlabel_logger
+from ghlabel.utils.github_api import GithubApi
+from ghlabel.utils.helpers import STATUS_OK
+from ghlabel.utils.http_cache import STATUS_NOT_MODIFIED
+from ghlabel.utils.label_config import format_github_label
+from ghlabel.utils.label_diff import fingerprint_labels
+
+logger: GhlabelLogger = ghlabel_logger.init(__name__)
+
+GHLABEL_STATE_DIR: str = os.path.join(
+    os.getenv("XDG_STATE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".local", "state"),
+    "ghlabel",
+)
+
+
+def hash_desired_state(labels_dir: str, **options: Any) -> str:
+    """
+    NOTE: hashes the raw files in `labels_dir` and its per-repo overlays (no yaml
+    parsing) together with the options that change the outcome of a run
+    (e.g. `strict`, `-a`, `-r`).
+    """
+
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8"))
+    file_names: list[str] = []
+    for dir_path, dir_names, dir_file_names in os.walk(labels_dir):
+        dir_names.sort()
+        file_names.extend(
+            os.path.relpath(os.path.join(dir_path, file_name), labels_dir)
+            for file_name in dir_file_names
+        )
+
+    for file_name in sorted(file_names):
+        digest.update(file_name.encode("utf-8"))
+        with open(os.path.join(labels_dir, file_name), "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class SyncState:
+    config_hash: str
+    fingerprint: str
+    etag: str
+    stored_at: float
+
+
+class SyncStateStore:
+    def __init__(self, state_dir: str = GHLABEL_STATE_DIR) -> None:
+        self._state_dir = state_dir
+
+    @property
+    def state_dir(self) -> str:
+        return self._state_dir
+
+    def _path(self, gh_api: GithubApi) -> str:
+        """NOTE: the token is part of the key, like the http cache."""
+        key: str = hashlib.sha256(
+            f"{gh_api.base_url}\n{gh_api.token}".encode()
+        ).hexdigest()
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    def load(self, gh_api: GithubApi) -> SyncState | None:
+        try:
+            with open(self._path(gh_api)) as f:
+                return SyncState(**json.load(f))
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def _write(self, gh_api: GithubApi, state: SyncState) -> None:
+        path: str = self._path(gh_api)
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(state), f)
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            logger.warning("Failed to write sync state. %s", ex)
+
+    def clear(self, gh_api: GithubApi) -> None:
+        try:
+            os.remove(self._path(gh_api))
+        except OSError:
+            pass
+
+    def is_in_sync(self, gh_api: GithubApi, config_hash: str) -> bool:
+        """
+        NOTE: no request is sent if the config changed since the last applied
+        run, otherwise exactly one conditional request for the labels.
+        """
+
+        state: SyncState | None = self.load(gh_api)
+        if state is None or state.config_hash != config_hash:
+            return False
+
+        with gh_api.phase("sync-state"):
+            github_labels, etag, status_code = gh_api.list_labels_if_modified(
+                state.etag
+            )
+        if status_code == STATUS_NOT_MODIFIED:
+            return True
+        if status_code != STATUS_OK or github_labels is None:
+            return False
+
+        # ETag changed, but the labels may not have (e.g. only `updated_at` did)
+        if fingerprint_labels(map(format_github_label, github_labels)) != (
+            state.fingerprint
+        ):
+            return False
+        self._write(
+            gh_api, SyncState(config_hash, state.fingerprint, etag, time.time())
+        )
+        return True
+
+    def record(self, gh_api: GithubApi, config_hash: str) -> None:
+        """
+        NOTE: call after a run that applied every change; costs one request
+        for the resulting labels. Repos with more than one page of labels are
+        never recorded, since one request can't vouch for all of them.
+        """
+
+        github_labels, etag, status_code = gh_api.list_labels_if_modified()
+        if status_code != STATUS_OK or github_labels is None or not etag:
+            self.clear(gh_api)
+            return
+
+        self._write(
+            gh_api,
+            SyncState(
+                config_hash=config_hash,
+                fingerprint=fingerprint_labels(map(format_github_label, github_labels)),
+                etag=etag,
+                stored_at=time.time(),
+            ),
+        )